@@ -17,6 +17,10 @@ def get_current_user(request: Request) -> CurrentUserInfo:
             headers={"WWW-Authenticate" : "Bearer"}
         )
 
+    if isinstance(current_user, CurrentUserInfo):
+        # Claims verified by the auth middleware are reused as-is.
+        return current_user
+
     if isinstance(current_user, Mapping):
         current_user_data = dict(current_user)
     elif hasattr(current_user, "model_dump"):
@@ -40,3 +40,20 @@ class RateLimitExceededError(BaseAPIException):
             detail=detail,
             headers=headers
         )
+
+
+#------Upstream Service Errors------
+
+class ServiceUnavailableError(BaseAPIException):
+    """Raised when the gateway fast-fails a request (open circuit breakers, full bulkhead)"""
+    def __init__(self, service_name: str, reason: str, retry_after: int, status_code: int = 503):
+        detail = {
+            "message": f"{service_name} is temporarily unavailable: {reason}",
+            "retry_after": retry_after
+        }
+        headers = {"Retry-After": str(retry_after)}
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers=headers
+        )
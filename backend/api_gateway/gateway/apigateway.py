@@ -1,23 +1,29 @@
-import random
+from functools import partial
 from types import TracebackType
 from typing import Any, Self
 from urllib.parse import urlparse, urlunparse
 from logging import Logger
+from time import perf_counter
 
-import orjson
-from fastapi import HTTPException, Request
+from fastapi import HTTPException, Request, Response
 from httpx import AsyncClient, HTTPStatusError, RequestError, Timeout, Limits
-from shared.utils.customized_json_response import JSONResponse
+from httpx import Request as HttpxRequest, Response as HttpxResponse
 
 from shared.settings import Settings
 from schemas.gateway_schemas import GatewayConfig, ServiceConfig
+from gateway.bulkhead import Bulkhead
+from gateway.connection_pool import UpstreamPool
+from gateway.load_balancer import LoadBalancer, UpstreamInstance
+from gateway.service_discovery import ServiceDiscovery
+from gateway.streaming import ClosingStreamingResponse
 
 
 class UrlManager:
     """Url Manager for handling service-specific URL manipulations."""
-    def __init__(self, config: GatewayConfig, logger: Logger):
+    def __init__(self, config: GatewayConfig, logger: Logger, load_balancer: LoadBalancer | None = None):
         self.config: GatewayConfig = config
         self.logger: Logger = logger
+        self.load_balancer: LoadBalancer = load_balancer or LoadBalancer(config=config, logger=logger)
 
     def extract_service_path(self, path: str, service_name: str) -> str:
         """
@@ -52,10 +58,14 @@ class UrlManager:
         self.logger.debug(f"Extracted service-specific path for {service_name}: {service_specific_path}")
         return service_specific_path
 
-    def build_url(self, service_name: str, path: str) -> str:
+    def pick_instance(self, service_name: str) -> UpstreamInstance:
+        """Choose the upstream instance for the next request (see LoadBalancer.pick)."""
+        return self.load_balancer.pick(service_name)
+
+    def build_url(self, service_name: str, path: str, instance: UpstreamInstance | None = None) -> str:
         """
-        Build the complete URL for a given microservice,
-        randomly choosing one instance for load balancing.
+        Build the complete URL for a given microservice on *instance*,
+        or on one picked by the load balancer when no instance is given.
 
         Example:
         - Request path: http://127.0.0.1:8000/api/v1/login?token=abc
@@ -63,11 +73,8 @@ class UrlManager:
         - Service instances: ["http://user-service-1:8001", "http://user-service-2:8001"]
         - Returns: http://user-service-2:8001/api/v1/login?token=abc
         """
-        service_instances = self.config.services[service_name].instances # List of instance URLs
         api_version = self.config.services[service_name].api_version  # e.g. "/api/v1"
-
-        # Pick a random instance for load balancing
-        service_instance = random.choice(service_instances)
+        service_instance = (instance or self.pick_instance(service_name)).url
 
         parsed_base = urlparse(service_instance)
         parsed_path = urlparse(path)
@@ -92,16 +99,29 @@ class UrlManager:
 class ApiGateway:
     """
     A class representing the API Gateway that forwards requests to microservices.
-    Uses one lifespan-owned AsyncClient with connection pooling for upstream calls.
+    Upstream calls go through a lifespan-owned connection pool per service (see
+    UpstreamPool); one shared AsyncClient serves health checks and the media proxy.
     """
 
     # Upstream timeout configuration (seconds).
     _TIMEOUT: Timeout = Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
     _IMAGE_GENERATION_TIMEOUT: Timeout = Timeout(connect=5.0, read=120.0, write=10.0, pool=5.0)
 
-    # Connection pool limits.
+    # Connection pool limits of the shared client.
     _LIMITS: Limits = Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
 
+    # Hop-by-hop headers are never passed from an upstream response to the client.
+    _HOP_BY_HOP_HEADERS: frozenset[str] = frozenset({
+        "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+        "te", "trailer", "transfer-encoding", "upgrade",
+    })
+    # Service paths whose request body the gateway rewrites, and therefore has to parse.
+    # Every other body is streamed upstream as-is.
+    _BODY_REWRITE_PATHS: frozenset[str] = frozenset({"/login"})
+
+    # When httpx has decoded the body, the upstream encoding and length no longer describe it.
+    _DECODED_BODY_HEADERS: frozenset[str] = _HOP_BY_HOP_HEADERS | {"content-encoding", "content-length"}
+
     def __init__(self, settings: Settings, logger: Logger):
         self.settings: Settings = settings
         self.logger: Logger = logger
@@ -158,7 +178,61 @@ class ApiGateway:
                 ),
             }
         )
-        self.url_manager: UrlManager = UrlManager(config=self.config, logger=self.logger)
+        self.load_balancer: LoadBalancer = LoadBalancer(
+            config=self.config,
+            logger=self.logger,
+            discovery=self._create_service_discovery(),
+            health_check_interval_seconds=self.settings.API_GATEWAY_HEALTH_CHECK_INTERVAL_SECONDS,
+            health_check_timeout_seconds=self.settings.API_GATEWAY_HEALTH_CHECK_TIMEOUT_SECONDS,
+            failure_threshold=self.settings.API_GATEWAY_OUTLIER_FAILURE_THRESHOLD,
+            ejection_seconds=self.settings.API_GATEWAY_OUTLIER_EJECTION_SECONDS,
+            max_ejection_ratio=self.settings.API_GATEWAY_OUTLIER_MAX_EJECTION_RATIO,
+            breaker_failure_threshold=self.settings.API_GATEWAY_CIRCUIT_FAILURE_THRESHOLD,
+            breaker_recovery_seconds=self.settings.API_GATEWAY_CIRCUIT_RECOVERY_SECONDS,
+            breaker_half_open_probes=self.settings.API_GATEWAY_CIRCUIT_HALF_OPEN_PROBES,
+        )
+        self.url_manager: UrlManager = UrlManager(
+            config=self.config, logger=self.logger, load_balancer=self.load_balancer,
+        )
+        self.bulkheads: dict[str, Bulkhead] = {
+            service_name: Bulkhead(
+                service_name=service_name,
+                max_concurrency=self.settings.API_GATEWAY_BULKHEAD_SERVICE_LIMITS.get(
+                    service_name, self.settings.API_GATEWAY_BULKHEAD_MAX_CONCURRENCY
+                ),
+                queue_timeout_seconds=self.settings.API_GATEWAY_BULKHEAD_QUEUE_TIMEOUT_SECONDS,
+            )
+            for service_name in self.config.services
+        }
+        # The bulkhead caps a service's concurrent requests, so a pool of that size never makes one wait.
+        self.pools: dict[str, UpstreamPool] = {
+            service_name: UpstreamPool(
+                service_name=service_name,
+                size=self.settings.API_GATEWAY_UPSTREAM_POOL_SIZES.get(
+                    service_name, self.bulkheads[service_name].max_concurrency
+                ),
+                keepalive_expiry=self.settings.API_GATEWAY_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS,
+                timeout=self._TIMEOUT,
+                logger=self.logger,
+                http2=service_name in self.settings.API_GATEWAY_UPSTREAM_H2C_SERVICES,
+            )
+            for service_name in self.config.services
+        }
+
+    def _create_service_discovery(self) -> ServiceDiscovery | None:
+        """Discovery is only enabled when a discovery file or SRV records are configured."""
+        for service_name, record in self.settings.API_GATEWAY_SERVICE_SRV_RECORDS.items():
+            if service_name in self.config.services:
+                self.config.services[service_name].srv_record = record
+            else:
+                self.logger.warning(f"SRV record configured for unknown service {service_name}")
+        if not self.settings.API_GATEWAY_SERVICE_DISCOVERY_FILE and not self.settings.API_GATEWAY_SERVICE_SRV_RECORDS:
+            return None
+        return ServiceDiscovery(
+            logger=self.logger,
+            file_path=self.settings.API_GATEWAY_SERVICE_DISCOVERY_FILE,
+            refresh_seconds=self.settings.API_GATEWAY_SERVICE_DISCOVERY_REFRESH_SECONDS,
+        )
 
     async def __aenter__(self) -> Self:
         """Start the owned HTTP client and clean up if startup fails."""
@@ -179,21 +253,27 @@ class ApiGateway:
         await self.shutdown()
 
     async def startup(self) -> None:
-        """Create this gateway instance's HTTP client during lifespan startup."""
+        """Create this gateway instance's HTTP clients during lifespan startup."""
         if self._http_client is not None:
             return
         self._http_client = AsyncClient(
             timeout=self._TIMEOUT,
             limits=self._LIMITS,
         )
-        self.logger.info("ApiGateway HTTP client initialised.")
+        for pool in self.pools.values():
+            pool.open()
+        self.logger.info("ApiGateway HTTP clients initialised.")
+        await self.load_balancer.start(self._http_client)
 
     async def shutdown(self) -> None:
-        """Close this gateway instance's client during lifespan shutdown."""
+        """Stop load-balancer background tasks and close this gateway instance's clients during lifespan shutdown."""
+        await self.load_balancer.stop()
+        for pool in self.pools.values():
+            await pool.close()
         if self._http_client is not None:
             await self._http_client.aclose()
             self._http_client = None
-            self.logger.info("ApiGateway HTTP client closed.")
+            self.logger.info("ApiGateway HTTP clients closed.")
 
     @property
     def client(self) -> AsyncClient:
@@ -201,6 +281,10 @@ class ApiGateway:
             raise RuntimeError("ApiGateway HTTP client is not initialised — call startup() first.")
         return self._http_client
 
+    def client_for(self, service_name: str) -> AsyncClient:
+        """The client of *service_name*'s connection pool (the shared client until the pool is open)."""
+        return self.pools[service_name].client or self.client
+
     async def request_service(
         self,
         service_name: str,
@@ -208,17 +292,62 @@ class ApiGateway:
         *,
         method: str = "GET",
         json: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
     ):
         """Make a service-to-service request without deriving the path from a client request."""
         if service_name not in self.config.services:
             raise HTTPException(status_code=404, detail="Service not found")
-        url = self.url_manager.build_url(service_name, path)
-        return await self.client.request(
-            method=method,
-            url=url,
-            json=json,
-            timeout=self._resolve_timeout(service_name, path),
-        )
+        instance = await self._acquire_upstream(service_name)
+        url = self.url_manager.build_url(service_name, path, instance=instance)
+        started = perf_counter()
+        try:
+            response = await self.client_for(service_name).request(
+                method=method,
+                url=url,
+                json=json,
+                headers=headers,
+                timeout=self._resolve_timeout(service_name, path),
+                extensions=self.pools[service_name].extensions(),
+            )
+        except RequestError:
+            self._observe_upstream(service_name, instance, started, failed=True)
+            raise
+        finally:
+            self._release_upstream(service_name, instance)
+        self._observe_upstream(service_name, instance, started, failed=response.status_code >= 500)
+        return response
+
+    async def _acquire_upstream(self, service_name: str) -> UpstreamInstance:
+        """
+        Take a slot in the service's bulkhead and pick an instance for one upstream request.
+        Raises ServiceUnavailableError (503) when the bulkhead is full or all breakers are open.
+        """
+        bulkhead = self.bulkheads[service_name]
+        await bulkhead.acquire()
+        try:
+            instance = self.url_manager.pick_instance(service_name)
+        except BaseException:
+            bulkhead.release()
+            raise
+        self.load_balancer.acquire(instance)
+        self.pools[service_name].acquire()
+        return instance
+
+    def _release_upstream(self, service_name: str, instance: UpstreamInstance) -> None:
+        self.pools[service_name].release()
+        self.load_balancer.release(instance)
+        self.bulkheads[service_name].release()
+
+    def _observe_upstream(self, service_name: str, instance: UpstreamInstance, started: float, failed: bool) -> None:
+        """Feed one upstream outcome (latency, 5xx / connect error) back to the load balancer."""
+        self.load_balancer.observe(service_name, instance, perf_counter() - started, failed=failed)
+
+    async def _close_upstream(self, response: HttpxResponse, service_name: str, instance: UpstreamInstance) -> None:
+        """Close a streamed upstream response and free its instance and bulkhead slots."""
+        try:
+            await response.aclose()
+        finally:
+            self._release_upstream(service_name, instance)
 
     async def _detect_and_prepare_body(self, request: Request, path: str):
         """
@@ -301,15 +430,74 @@ class ApiGateway:
         """
         return self._TIMEOUT
 
-    # Circuit breaker is intentionally disabled: the per-service decorator caused
-    # all services to trip when a single downstream service failed.
-    # Re-enable once isolated per-service breakers are implemented.
-    # @circuit(failure_threshold=5, recovery_timeout=30)
-    async def forward_request(self, request: Request, service_name: str, override_body: dict[str, Any] | None = None) -> JSONResponse:
+    def _prepare_response_headers(self, upstream: HttpxResponse, decoded: bool = False) -> dict[str, str]:
+        """
+        Upstream response headers to pass to the client, minus hop-by-hop headers.
+        When the body was *decoded* by httpx, its original encoding/length no longer apply.
+        """
+        excluded = self._DECODED_BODY_HEADERS if decoded else self._HOP_BY_HOP_HEADERS
+        return {k: v for k, v in upstream.headers.items() if k.lower() not in excluded}
+
+    def _build_upstream_request(
+        self,
+        service_name: str,
+        request: Request,
+        url: str,
+        prepared_body: Any,
+        content_type: str | None,
+        headers: dict[str, str],
+        timeout: Timeout,
+    ) -> HttpxRequest:
+        """Build the upstream request, encoding the prepared body the way its content type needs."""
+        client = self.client_for(service_name)
+        extensions = self.pools[service_name].extensions()
+        headers_without_content_type = {k: v for k, v in headers.items() if k.lower() != "content-type"}
+        if prepared_body is None:
+            return client.build_request(
+                method=request.method, url=url, headers=headers, timeout=timeout, extensions=extensions,
+            )
+        if content_type == "application/json":
+            return client.build_request(
+                method=request.method, url=url, json=prepared_body,
+                headers=headers_without_content_type, timeout=timeout, extensions=extensions,
+            )
+        if content_type == "application/x-www-form-urlencoded":
+            return client.build_request(
+                method=request.method, url=url, data=prepared_body,
+                headers=headers_without_content_type, timeout=timeout, extensions=extensions,
+            )
+        if content_type == "multipart/form-data":
+            return client.build_request(
+                method=request.method, url=url, files=prepared_body,
+                headers=headers_without_content_type, timeout=timeout, extensions=extensions,
+            )
+        return client.build_request(
+            method=request.method, url=url, content=prepared_body, headers=headers,
+            timeout=timeout, extensions=extensions,
+        )
+
+    async def forward_request(
+        self,
+        request: Request,
+        service_name: str,
+        override_body: dict[str, Any] | None = None,
+        stream: bool = True,
+    ) -> Response:
         """
-        Forward request to microservice using the shared HTTP client.
+        Forward request to microservice using the service's connection pool.
         Now automatically extracts the correct path based on service mapping.
         If override_body is provided it replaces the request body (sent as JSON).
+        Other request bodies are streamed upstream with their original content type,
+        unless the path is in _BODY_REWRITE_PATHS (see _detect_and_prepare_body).
+
+        By default the upstream body is streamed to the client as raw bytes, with
+        upstream headers passed through. Routes that need to inspect the body
+        (e.g. login, to move tokens into cookies) pass stream=False to get a
+        buffered Response instead.
+
+        Each upstream instance has its own circuit breaker and each service its own
+        bulkhead (see _acquire_upstream), so a failing or slow service fast-fails with
+        503 + Retry-After instead of starving the others.
         """
 
         if service_name not in self.config.services:
@@ -319,13 +507,19 @@ class ApiGateway:
         # Extract the path to forward to the microservice
         service_path = self.url_manager.extract_service_path(str(request.url), service_name)
 
-        # Build the full URL to the microservice
-        url = self.url_manager.build_url(service_name, service_path)
-
-        # Detect and prepare body
+        # Detect and prepare body: only bodies the gateway rewrites are parsed,
+        # everything else is streamed upstream untouched.
+        passthrough = (
+            override_body is None
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and urlparse(service_path).path not in self._BODY_REWRITE_PATHS
+        )
         if override_body is not None:
             prepared_body = override_body
             content_type = "application/json"
+        elif passthrough:
+            prepared_body = None
+            content_type = request.headers.get("content-type")
         else:
             prepared_body, content_type = await self._detect_and_prepare_body(request, service_path)
 
@@ -336,65 +530,58 @@ class ApiGateway:
         headers = self._prepare_headers(request_headers=request.headers, new_content_type=content_type)
         timeout = self._resolve_timeout(service_name=service_name, service_path=service_path)
 
+        # Build the full URL to the microservice on the instance picked by the load balancer
+        instance = await self._acquire_upstream(service_name)
+        url = self.url_manager.build_url(service_name, service_path, instance=instance)
+
         self.logger.info(
             f"Forwarding request to: {url} with method: {request.method}, "
-            f"Service path: {service_path}, Body type: {type(prepared_body)}, "
+            f"Service path: {service_path}, Body type: {'stream' if passthrough else type(prepared_body)}, "
             f"Content-Type: {content_type}, Headers: {headers}"
         )
 
+        client = self.client_for(service_name)
+        released = False
+        started = perf_counter()
         try:
-            if prepared_body is None:
-                response = await self.client.request(
-                    method=request.method,
-                    url=url,
-                    headers=headers,
-                    timeout=timeout,
-                )
-            elif content_type == "application/json":
-                response = await self.client.request(
-                    method=request.method,
-                    url=url,
-                    json=prepared_body,
-                    headers={k: v for k, v in headers.items() if k.lower() != "content-type"},
-                    timeout=timeout,
-                )
-            elif content_type == "application/x-www-form-urlencoded":
-                response = await self.client.request(
-                    method=request.method,
-                    url=url,
-                    data=prepared_body,
-                    headers={k: v for k, v in headers.items() if k.lower() != "content-type"},
-                    timeout=timeout,
-                )
-            elif content_type == "multipart/form-data":
-                response = await self.client.request(
-                    method=request.method,
-                    url=url,
-                    files=prepared_body,
-                    headers={k: v for k, v in headers.items() if k.lower() != "content-type"},
-                    timeout=timeout,
+            if passthrough:
+                content_length = request.headers.get("content-length")
+                if content_length is not None:
+                    headers["Content-Length"] = content_length
+                upstream_request = client.build_request(
+                    method=request.method, url=url, content=request.stream(), headers=headers,
+                    timeout=timeout, extensions=self.pools[service_name].extensions(),
                 )
             else:
-                response = await self.client.request(
-                    method=request.method,
-                    url=url,
-                    content=prepared_body,
-                    headers=headers,
-                    timeout=timeout,
+                upstream_request = self._build_upstream_request(
+                    service_name, request, url, prepared_body, content_type, headers, timeout,
                 )
-
-            # Parse response
             try:
-                content = response.json()
-            except orjson.JSONEncodeError:
-                content = {"message": response.text, "status_code": response.status_code}
-
+                response = await client.send(upstream_request, stream=True)
+            except RequestError:
+                self._observe_upstream(service_name, instance, started, failed=True)
+                raise
+            self._observe_upstream(service_name, instance, started, failed=response.status_code >= 500)
             self.logger.debug(f"Response from {service_name}: status={response.status_code}")
 
-            return JSONResponse(
-                content=content,
+            if not stream:
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+                return Response(
+                    content=response.content,
+                    status_code=response.status_code,
+                    headers=self._prepare_response_headers(response, decoded=True),
+                )
+
+            # The instance, pool and bulkhead slots stay taken until the body stream ends, however it ends.
+            released = True
+            return ClosingStreamingResponse(
+                response.aiter_raw(),
+                on_close=partial(self._close_upstream, response, service_name, instance),
                 status_code=response.status_code,
-                headers=dict(response.headers)
+                headers=self._prepare_response_headers(response),
             )
 
         except HTTPStatusError as e:
@@ -409,3 +596,6 @@ class ApiGateway:
         except Exception as e:
             self.logger.error(f"Unexpected error: {e}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
+        finally:
+            if not released:
+                self._release_upstream(service_name, instance)
@@ -0,0 +1,271 @@
+import asyncio
+from dataclasses import dataclass
+from logging import Logger
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response
+from httpx import RequestError
+from orjson import Fragment, dumps
+
+from gateway.apigateway import ApiGateway
+from helpers.cache_helper import cache_metrics_helper
+from middleware.auth_middleware import AuthMiddleware
+from schemas.batch_schemas import BatchSubRequest
+from shared.enums.services_enums import Services
+from shared.managers.cache_manager import CacheManager
+from shared.managers.ratelimit_manager import RateLimitManager
+from shared.utils.cache_entry import CachedResponse
+
+
+# Path segment matching any value that must be the caller's own user id (or the caller is an admin).
+OWNER_SEGMENT: str = "{user_id}"
+
+
+@dataclass(frozen=True, slots=True)
+class BatchRoute:
+    """A GET route a batch may contain: the service it proxies and its per-route rate limit."""
+    # Relative to the API version; "*" matches any one segment.
+    pattern: str
+    service_name: str
+    # (times, seconds), the same limit the route's @rate_limited applies.
+    rate_limit: tuple[int, int] | None = None
+
+    @property
+    def segments(self) -> list[str]:
+        return [segment for segment in self.pattern.split("/") if segment]
+
+
+# Read-only routes a storefront page loads together. Admin-only routes are deliberately absent,
+# and routes scoped to a user carry OWNER_SEGMENT so each sub-request gets the same check as
+# require_user_or_admin. The first matching route wins, so literal routes come first.
+BATCH_ROUTES: tuple[BatchRoute, ...] = (
+    BatchRoute("/products", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/detailed", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/detailed/page", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/*", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/*/detailed", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/*/reviews", Services.PRODUCT_SERVICE),
+    BatchRoute("/products/*/users/*/reviews", Services.PRODUCT_SERVICE),
+    BatchRoute("/categories", Services.PRODUCT_SERVICE),
+    BatchRoute("/categories/*", Services.PRODUCT_SERVICE),
+    BatchRoute("/customization/pricing", Services.PRODUCT_SERVICE),
+    BatchRoute("/images", Services.PRODUCT_SERVICE),
+    BatchRoute("/images/*", Services.PRODUCT_SERVICE),
+    BatchRoute("/*/images", Services.PRODUCT_SERVICE),
+    BatchRoute("/reviews", Services.PRODUCT_SERVICE),
+    BatchRoute("/reviews/*", Services.PRODUCT_SERVICE),
+    BatchRoute("/users/*/reviews", Services.PRODUCT_SERVICE),
+    BatchRoute("/shipping/methods", Services.SHIPPING_SERVICE, rate_limit=(30, 60)),
+    BatchRoute("/me", Services.USER_SERVICE, rate_limit=(3, 3600)),
+    BatchRoute(f"/users/{OWNER_SEGMENT}", Services.USER_SERVICE, rate_limit=(10, 60)),
+    BatchRoute(f"/users/{OWNER_SEGMENT}/cart", Services.CART_SERVICE, rate_limit=(10, 60)),
+    BatchRoute(f"/users/{OWNER_SEGMENT}/cart/summary", Services.CART_SERVICE, rate_limit=(10, 60)),
+    BatchRoute("/wishlists/me", Services.WISHLIST_SERVICE, rate_limit=(10, 60)),
+    BatchRoute(f"/orders/user/{OWNER_SEGMENT}", Services.ORDER_SERVICE),
+    BatchRoute(f"/notifications/users/{OWNER_SEGMENT}", Services.NOTIFICATION_SERVICE),
+    BatchRoute(f"/notifications/users/{OWNER_SEGMENT}/unread-count", Services.NOTIFICATION_SERVICE),
+)
+
+
+@dataclass(slots=True)
+class BatchSubResponse:
+    id: str
+    status: int
+    body: bytes
+    content_type: str | None
+    cached: bool = False
+
+    def to_json(self) -> dict:
+        """Embed a JSON body as-is (no decode / re-encode); anything else as text."""
+        if not self.body:
+            body = None
+        elif self.content_type and "json" in self.content_type:
+            body = Fragment(self.body)
+        else:
+            body = self.body.decode("utf-8", errors="replace")
+        return {"id": self.id, "status": self.status, "cached": self.cached, "body": body}
+
+    @classmethod
+    def from_entry(cls, id: str, entry: CachedResponse) -> "BatchSubResponse":
+        return cls(id=id, status=entry.status_code, body=entry.body, content_type=entry.content_type, cached=True)
+
+    @classmethod
+    def error(cls, id: str, status: int, detail: object) -> "BatchSubResponse":
+        return cls(id=id, status=status, body=dumps({"detail": detail}), content_type="application/json")
+
+
+class BatchDispatcher:
+    """
+    Answers several GET sub-requests from one client round trip, so a page load costs
+    the slowest sub-request instead of the sum of all of them.
+
+    Each sub-request is authorized with AuthMiddleware against the batch caller, served
+    from the CacheManager when a fresh entry exists, and otherwise sent upstream through
+    ApiGateway.request_service under its own timeout. All of them run concurrently; a
+    failed or timed-out sub-request only fails its own slot (falling back to a stale
+    cache entry when there is one).
+    """
+
+    # Client headers never forwarded upstream with a sub-request.
+    _DROPPED_UPSTREAM_HEADERS: frozenset[str] = frozenset({"accept-encoding", "if-none-match", "if-modified-since"})
+    # Outer-request headers that do not describe a GET sub-request.
+    _DROPPED_SCOPE_HEADERS: frozenset[bytes] = frozenset({b"content-type", b"content-length", b"transfer-encoding"})
+
+    def __init__(
+        self,
+        gateway: ApiGateway,
+        cache_manager: CacheManager,
+        auth: AuthMiddleware,
+        rate_limiter: RateLimitManager,
+        logger: Logger,
+        api_version: str,
+        max_requests: int = 20,
+        timeout_seconds: float = 5.0,
+        routes: tuple[BatchRoute, ...] = BATCH_ROUTES,
+    ) -> None:
+        self.gateway: ApiGateway = gateway
+        self.cache_manager: CacheManager = cache_manager
+        self.auth: AuthMiddleware = auth
+        self.rate_limiter: RateLimitManager = rate_limiter
+        self.logger: Logger = logger
+        self.api_version: str = api_version.rstrip("/")
+        self.max_requests: int = max_requests
+        self.timeout_seconds: float = timeout_seconds
+        self.routes: tuple[BatchRoute, ...] = routes
+
+    async def dispatch(self, request: Request, sub_requests: list[BatchSubRequest]) -> Response:
+        """Run *sub_requests* concurrently and answer with one multiplexed JSON response."""
+        if len(sub_requests) > self.max_requests:
+            raise HTTPException(
+                status_code=422,
+                detail=f"A batch may contain at most {self.max_requests} requests",
+            )
+        responses = await asyncio.gather(*(self._run(request, sub_request) for sub_request in sub_requests))
+        return Response(
+            content=dumps({"responses": [response.to_json() for response in responses]}),
+            media_type="application/json",
+        )
+
+    def match_route(self, path: str) -> tuple[BatchRoute, str | None] | None:
+        """The batch route serving *path* (a gateway path) and the owner id it is scoped to, if any."""
+        prefix = f"{self.api_version}/"
+        if not path.startswith(prefix):
+            return None
+        segments = [segment for segment in path[len(prefix):].split("/") if segment]
+        for route in self.routes:
+            pattern = route.segments
+            if len(pattern) != len(segments):
+                continue
+            owner_id = None
+            for expected, segment in zip(pattern, segments):
+                if expected == OWNER_SEGMENT:
+                    owner_id = segment
+                elif expected != "*" and expected != segment:
+                    break
+            else:
+                return route, owner_id
+        return None
+
+    async def _run(self, request: Request, sub_request: BatchSubRequest) -> BatchSubResponse:
+        path, _, query = sub_request.path.partition("?")
+        matched = self.match_route(path)
+        if matched is None:
+            return BatchSubResponse.error(sub_request.id, 404, "Route is not available in a batch")
+        route, owner_id = matched
+
+        scoped_request = self._scoped_request(request, path, query)
+        try:
+            if owner_id is not None:
+                owner_id = str(UUID(owner_id))
+        except ValueError:
+            return BatchSubResponse.error(sub_request.id, 422, "Invalid user id")
+
+        policy = self.auth.route_policy(scoped_request)
+        is_public = policy.is_public(scoped_request.method)
+        entry: CachedResponse | None = None
+        try:
+            self.auth.authorize(scoped_request, getattr(request.state, "current_user", None), owner_id=owner_id)
+            if route.rate_limit is not None:
+                times, seconds = route.rate_limit
+                await self.rate_limiter.is_rate_limited(request=scoped_request, times=times, seconds=seconds)
+
+            entry = await self.cache_manager.get_cached_entry(scoped_request, is_public=is_public)
+            if entry is not None and self.cache_manager.is_fresh(entry, path, policy):
+                cache_metrics_helper.record_lookup("hit", self.cache_manager.namespace_for(path))
+                return BatchSubResponse.from_entry(sub_request.id, entry)
+
+            if route.service_name not in self.gateway.config.services:
+                raise HTTPException(status_code=404, detail="Service not found")
+            async with asyncio.timeout(sub_request.timeout or self.timeout_seconds):
+                upstream = await self.gateway.request_service(
+                    route.service_name,
+                    self.gateway.url_manager.extract_service_path(sub_request.path, route.service_name),
+                    headers=self._upstream_headers(request),
+                )
+        except HTTPException as exc:
+            if exc.status_code >= 500 and entry is not None:
+                return BatchSubResponse.from_entry(sub_request.id, entry)
+            return BatchSubResponse.error(sub_request.id, exc.status_code, exc.detail)
+        except TimeoutError:
+            self.logger.warning(f"Batch sub-request {sub_request.path} timed out")
+            if entry is not None:
+                return BatchSubResponse.from_entry(sub_request.id, entry)
+            return BatchSubResponse.error(sub_request.id, 504, "Upstream request timed out")
+        except RequestError as exc:
+            self.logger.error(f"Batch sub-request {sub_request.path} failed: {exc!r}")
+            if entry is not None:
+                return BatchSubResponse.from_entry(sub_request.id, entry)
+            return BatchSubResponse.error(sub_request.id, 502, "Upstream request failed")
+
+        if upstream.status_code >= 500 and entry is not None:
+            return BatchSubResponse.from_entry(sub_request.id, entry)
+
+        content_type = upstream.headers.get("content-type")
+        cache_metrics_helper.record_lookup(
+            "stale" if entry is not None else "miss", self.cache_manager.namespace_for(path),
+        )
+        # Same rule as the gateway middleware: cache only responses that are identical for every caller.
+        is_authenticated = (
+            "authorization" in request.headers
+            or request.cookies.get("access_token") is not None
+        )
+        if 200 <= upstream.status_code < 300 and (is_public or not is_authenticated):
+            await self.cache_manager.cache_response(
+                scoped_request,
+                upstream.content,
+                upstream.status_code,
+                ttl=policy.ttl,
+                content_type=content_type,
+                stale_ttl=policy.stale_ttl,
+            )
+        return BatchSubResponse(
+            id=sub_request.id,
+            status=upstream.status_code,
+            body=upstream.content,
+            content_type=content_type,
+        )
+
+    def _scoped_request(self, request: Request, path: str, query: str) -> Request:
+        """A GET request for one sub-request, carrying the batch caller's headers and client address."""
+        scope = {
+            "type": "http",
+            "http_version": request.scope.get("http_version", "1.1"),
+            "method": "GET",
+            "scheme": request.scope.get("scheme", "http"),
+            "server": request.scope.get("server"),
+            "client": request.scope.get("client"),
+            "root_path": request.scope.get("root_path", ""),
+            "path": path,
+            "raw_path": path.encode("latin-1"),
+            "query_string": query.encode("latin-1"),
+            "headers": [
+                (name, value) for name, value in request.scope.get("headers", [])
+                if name not in self._DROPPED_SCOPE_HEADERS
+            ],
+            "state": {},
+        }
+        return Request(scope)
+
+    def _upstream_headers(self, request: Request) -> dict[str, str]:
+        headers = self.gateway._prepare_headers(request_headers=request.headers)
+        return {name: value for name, value in headers.items() if name.lower() not in self._DROPPED_UPSTREAM_HEADERS}
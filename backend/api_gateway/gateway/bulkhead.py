@@ -0,0 +1,50 @@
+import asyncio
+from math import ceil
+
+from exceptions.exceptions import ServiceUnavailableError
+from helpers.upstream_helper import upstream_metrics_helper
+
+
+class Bulkhead:
+    """
+    Caps the number of concurrent upstream requests to one service, so a slow
+    service cannot tie up every in-flight gateway request. The service's
+    connection pool (UpstreamPool) is sized to the same limit by default.
+
+    A request waits up to queue_timeout_seconds for a free slot and is then
+    rejected with 503 + Retry-After instead of queueing behind the slow service.
+    """
+
+    def __init__(self, service_name: str, max_concurrency: int, queue_timeout_seconds: float) -> None:
+        self.service_name: str = service_name
+        self.max_concurrency: int = max_concurrency
+        self.queue_timeout_seconds: float = queue_timeout_seconds
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_use: int = 0
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    async def acquire(self) -> None:
+        """Take a slot, or raise ServiceUnavailableError when none frees up in time."""
+        try:
+            if not self._semaphore.locked():
+                # A free slot is taken without suspending; wait_for(timeout=0) would time out on it.
+                await self._semaphore.acquire()
+            elif self.queue_timeout_seconds <= 0:
+                raise TimeoutError
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_seconds)
+        except TimeoutError:
+            upstream_metrics_helper.record_rejection(self.service_name, "bulkhead_full")
+            raise ServiceUnavailableError(
+                service_name=self.service_name,
+                reason="too many concurrent requests",
+                retry_after=max(1, ceil(self.queue_timeout_seconds)),
+            )
+        self._in_use += 1
+
+    def release(self) -> None:
+        self._in_use -= 1
+        self._semaphore.release()
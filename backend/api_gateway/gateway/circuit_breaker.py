@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from enum import IntEnum
+
+
+class BreakerState(IntEnum):
+    """Circuit-breaker states; the values are what the state gauge on /metrics reports."""
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+@dataclass(slots=True)
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream instance.
+
+    - CLOSED: requests flow; consecutive failures (5xx / connect errors) are counted.
+    - OPEN: after failure_threshold consecutive failures no request is sent for
+      recovery_seconds.
+    - HALF_OPEN: once recovery_seconds have passed, up to half_open_max_probes probe
+      requests are let through. A successful probe closes the breaker, a failed one
+      opens it again. A probe that never reports back frees its slot after
+      recovery_seconds, so the breaker cannot get stuck half-open.
+    """
+    failure_threshold: int
+    recovery_seconds: float
+    half_open_max_probes: int = 1
+    state: BreakerState = BreakerState.CLOSED
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    probes: int = 0
+    last_probe_at: float = 0.0
+
+    def can_attempt(self, now: float) -> bool:
+        """Whether allow_request() would let a request through, without claiming a probe."""
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.state == BreakerState.OPEN:
+            return now - self.opened_at >= self.recovery_seconds
+        return self.probes < self.half_open_max_probes or now - self.last_probe_at >= self.recovery_seconds
+
+    def allow_request(self, now: float) -> bool:
+        """Let a request through if the state allows it; in HALF_OPEN this claims a probe slot."""
+        if not self.can_attempt(now):
+            return False
+        if self.state == BreakerState.OPEN:
+            self.state = BreakerState.HALF_OPEN
+            self.probes = 0
+        if self.state == BreakerState.HALF_OPEN:
+            if now - self.last_probe_at >= self.recovery_seconds:
+                self.probes = 0
+            self.probes += 1
+            self.last_probe_at = now
+        return True
+
+    def record_success(self) -> None:
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.probes = 0
+
+    def record_failure(self, now: float) -> None:
+        self.consecutive_failures += 1
+        if self.state == BreakerState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = BreakerState.OPEN
+            self.opened_at = now
+            self.probes = 0
+
+    def retry_after(self, now: float) -> float:
+        """Seconds until the breaker lets a request through again (0 when it already does)."""
+        if self.can_attempt(now):
+            return 0.0
+        if self.state == BreakerState.OPEN:
+            return self.recovery_seconds - (now - self.opened_at)
+        return self.recovery_seconds - (now - self.last_probe_at)
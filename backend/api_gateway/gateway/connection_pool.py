@@ -0,0 +1,123 @@
+from logging import Logger
+from time import perf_counter
+from typing import Any
+
+from httpx import AsyncClient, Limits, Timeout
+
+from helpers.upstream_helper import upstream_metrics_helper
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # h2 (httpx[http2]) is optional; h2c upstreams fall back to HTTP/1.1 without it
+    h2 = None
+
+
+class UpstreamPool:
+    """
+    The connection pool of one upstream service: its own AsyncClient, sized to the
+    concurrency the service's bulkhead lets through, so one busy service never waits
+    on connections held by another and idle connections are kept instead of churned.
+
+    With http2 the client speaks h2c (HTTP/2 over cleartext, prior knowledge) and
+    multiplexes concurrent requests over a few connections; the upstream has to
+    accept h2c.
+
+    Exported gauges (see UpstreamMetricsHelper): requests in flight vs. pool size
+    and the peak seen, the wait for a pooled connection, and new connections opened
+    (churn). A peak well below the size, or a steady rate of new connections, is the
+    signal to resize the pool or raise the keep-alive expiry.
+    """
+
+    # httpcore trace events: a new connection is being opened, or a request is being written
+    # on a connection it got from the pool. Either one ends the wait for a pool slot.
+    _CONNECT_EVENT: str = "connection.connect_tcp.started"
+    _CONNECTED_EVENT: str = "connection.connect_tcp.complete"
+    _SEND_EVENTS: frozenset[str] = frozenset({
+        "http11.send_request_headers.started", "http2.send_request_headers.started",
+    })
+
+    def __init__(
+        self,
+        service_name: str,
+        size: int,
+        keepalive_expiry: float,
+        timeout: Timeout,
+        logger: Logger,
+        http2: bool = False,
+    ) -> None:
+        self.service_name: str = service_name
+        self.size: int = size
+        self.keepalive_expiry: float = keepalive_expiry
+        self.timeout: Timeout = timeout
+        self.logger: Logger = logger
+        if http2 and h2 is None:
+            logger.warning(f"h2c requested for {service_name} but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2: bool = http2
+        self._client: AsyncClient | None = None
+        self._in_use: int = 0
+        self._peak_in_use: int = 0
+
+    @property
+    def client(self) -> AsyncClient | None:
+        return self._client
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    @property
+    def peak_in_use(self) -> int:
+        return self._peak_in_use
+
+    def open(self) -> None:
+        if self._client is not None:
+            return
+        self._client = AsyncClient(
+            timeout=self.timeout,
+            # Every connection the pool may open is also kept alive, so a burst doesn't churn them.
+            limits=Limits(
+                max_connections=self.size,
+                max_keepalive_connections=self.size,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            http1=not self.http2,
+            http2=self.http2,
+        )
+        upstream_metrics_helper.record_pool_size(self.service_name, self.size)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def acquire(self) -> None:
+        """Count one upstream request in flight on this pool."""
+        self._in_use += 1
+        if self._in_use > self._peak_in_use:
+            self._peak_in_use = self._in_use
+        self._record_usage()
+
+    def release(self) -> None:
+        self._in_use -= 1
+        self._record_usage()
+
+    def extensions(self) -> dict[str, Any]:
+        """Request extensions that trace one request's wait for a connection and any connection it opens."""
+        started = perf_counter()
+        waited = False
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal waited
+            if not waited and (event_name == self._CONNECT_EVENT or event_name in self._SEND_EVENTS):
+                waited = True
+                upstream_metrics_helper.record_pool_wait(self.service_name, perf_counter() - started)
+            if event_name == self._CONNECTED_EVENT:
+                upstream_metrics_helper.record_connection_opened(self.service_name)
+
+        return {"trace": trace}
+
+    def _record_usage(self) -> None:
+        upstream_metrics_helper.record_pool_usage(
+            self.service_name, self._in_use, self._peak_in_use, self._in_use / self.size,
+        )
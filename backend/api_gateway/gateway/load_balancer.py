@@ -0,0 +1,266 @@
+import asyncio
+import random
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from logging import Logger
+from math import ceil
+from time import monotonic
+
+from httpx import AsyncClient, Timeout
+
+from exceptions.exceptions import ServiceUnavailableError
+from helpers.upstream_helper import upstream_metrics_helper
+from schemas.gateway_schemas import GatewayConfig, ServiceConfig
+from gateway.circuit_breaker import BreakerState, CircuitBreaker
+from gateway.service_discovery import ServiceDiscovery
+
+
+@dataclass(slots=True)
+class UpstreamInstance:
+    """Load-balancing state of one upstream instance (base URL)."""
+    url: str
+    healthy: bool = True
+    inflight: int = 0
+    ewma_latency: float = 0.0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+    breaker: CircuitBreaker = field(
+        default_factory=lambda: CircuitBreaker(failure_threshold=5, recovery_seconds=30.0)
+    )
+
+    def is_available(self, now: float) -> bool:
+        return self.healthy and self.ejected_until <= now and self.breaker.can_attempt(now)
+
+    def is_ejected(self, now: float) -> bool:
+        return self.ejected_until > now
+
+
+class LoadBalancer:
+    """
+    Health-aware load balancer for the gateway's upstream services.
+
+    - Picks instances by power-of-two-choices: two random available instances are
+      compared on (in-flight requests + 1) × EWMA latency and the cheaper one wins.
+    - Active health checks call each instance's ServiceConfig.health_check_path in
+      the background and take failing instances out of rotation.
+    - Passive outlier ejection removes an instance for a growing period after
+      consecutive 5xx responses / connect errors, never ejecting more than
+      max_ejection_ratio of a service's instances.
+    - Instance lists are refreshed from ServiceDiscovery (config file or DNS SRV).
+
+    - Each instance has its own CircuitBreaker, so one failing upstream never trips
+      the breakers of other services or instances.
+
+    When no instance is available the balancer picks from all instances whose
+    breaker still lets requests through (panic mode). Only when every breaker of the
+    service is open does pick() fast-fail with 503 + Retry-After.
+    """
+
+    # Weight of the newest sample in the latency EWMA.
+    _EWMA_ALPHA: float = 0.3
+    # Latency assumed for instances without samples yet, so they get tried.
+    _DEFAULT_LATENCY_SECONDS: float = 0.05
+    # Cap on the ejection multiplier for repeatedly ejected instances.
+    _MAX_EJECTION_MULTIPLIER: int = 10
+
+    def __init__(
+        self,
+        config: GatewayConfig,
+        logger: Logger,
+        discovery: ServiceDiscovery | None = None,
+        health_check_interval_seconds: float = 10.0,
+        health_check_timeout_seconds: float = 2.0,
+        failure_threshold: int = 5,
+        ejection_seconds: float = 30.0,
+        max_ejection_ratio: float = 0.5,
+        breaker_failure_threshold: int = 5,
+        breaker_recovery_seconds: float = 30.0,
+        breaker_half_open_probes: int = 1,
+    ) -> None:
+        self.config: GatewayConfig = config
+        self.logger: Logger = logger
+        self.discovery: ServiceDiscovery | None = discovery
+        self.health_check_interval_seconds: float = health_check_interval_seconds
+        self.health_check_timeout: Timeout = Timeout(health_check_timeout_seconds)
+        self.failure_threshold: int = failure_threshold
+        self.ejection_seconds: float = ejection_seconds
+        self.max_ejection_ratio: float = max_ejection_ratio
+        self.breaker_failure_threshold: int = breaker_failure_threshold
+        self.breaker_recovery_seconds: float = breaker_recovery_seconds
+        self.breaker_half_open_probes: int = breaker_half_open_probes
+        self._pools: dict[str, dict[str, UpstreamInstance]] = {}
+        self._tasks: list[asyncio.Task[None]] = []
+        for service in self.config.services.values():
+            self.set_instances(service.name, service.instances)
+
+    # ---- lifecycle ----
+
+    async def start(self, client: AsyncClient) -> None:
+        """Resolve instances once, then start background health checks and discovery refreshes."""
+        if self._tasks:
+            return
+        if self.discovery is not None:
+            await self.refresh_instances()
+            self._tasks.append(asyncio.create_task(self._discovery_loop()))
+        self._tasks.append(asyncio.create_task(self._health_check_loop(client)))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    # ---- instance pool ----
+
+    def instances(self, service_name: str) -> list[UpstreamInstance]:
+        return list(self._pools.get(service_name, {}).values())
+
+    def set_instances(self, service_name: str, urls: list[str]) -> None:
+        """Replace a service's instance list, keeping the state of instances that remain."""
+        if not urls:
+            self.logger.warning(f"Ignoring empty instance list for {service_name}")
+            return
+        current = self._pools.get(service_name, {})
+        self._pools[service_name] = {url: current.get(url) or self._new_instance(url) for url in urls}
+        self.config.services[service_name].instances = list(urls)
+
+    def _new_instance(self, url: str) -> UpstreamInstance:
+        return UpstreamInstance(
+            url=url,
+            breaker=CircuitBreaker(
+                failure_threshold=self.breaker_failure_threshold,
+                recovery_seconds=self.breaker_recovery_seconds,
+                half_open_max_probes=self.breaker_half_open_probes,
+            ),
+        )
+
+    async def refresh_instances(self) -> None:
+        """Re-resolve every service through ServiceDiscovery; services it has no entry for keep their list."""
+        if self.discovery is None:
+            return
+        for service in self.config.services.values():
+            try:
+                urls = await self.discovery.resolve(service)
+            except Exception as e:
+                self.logger.error(f"Service discovery failed for {service.name}: {str(e)}")
+                continue
+            if urls and set(urls) != set(self._pools.get(service.name, {})):
+                self.logger.info(f"Discovered instances for {service.name}: {urls}")
+                self.set_instances(service.name, urls)
+
+    # ---- selection ----
+
+    def pick(self, service_name: str) -> UpstreamInstance:
+        """
+        Power-of-two-choices over available instances, on in-flight requests × EWMA latency.
+        Raises ServiceUnavailableError when the circuit breakers of all instances are open.
+        """
+        pool = self.instances(service_name)
+        now = monotonic()
+        candidates = [instance for instance in pool if instance.is_available(now)]
+        if not candidates:
+            candidates = [instance for instance in pool if instance.breaker.can_attempt(now)]
+            if not candidates:
+                retry_after = min(instance.breaker.retry_after(now) for instance in pool)
+                upstream_metrics_helper.record_rejection(service_name, "circuit_open")
+                raise ServiceUnavailableError(
+                    service_name=service_name,
+                    reason="circuit breaker open",
+                    retry_after=max(1, ceil(retry_after)),
+                )
+            self.logger.warning(f"No healthy instances for {service_name}; picking from {len(candidates)} of {len(pool)}")
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        else:
+            first, second = random.sample(candidates, 2)
+            chosen = first if self._cost(first) <= self._cost(second) else second
+        self._update_breaker(service_name, chosen, lambda: chosen.breaker.allow_request(now))
+        return chosen
+
+    def _cost(self, instance: UpstreamInstance) -> float:
+        return (instance.inflight + 1) * (instance.ewma_latency or self._DEFAULT_LATENCY_SECONDS)
+
+    # ---- request accounting ----
+
+    def acquire(self, instance: UpstreamInstance) -> None:
+        instance.inflight += 1
+
+    def release(self, instance: UpstreamInstance) -> None:
+        instance.inflight = max(0, instance.inflight - 1)
+
+    def observe(self, service_name: str, instance: UpstreamInstance, latency: float, failed: bool) -> None:
+        """Record one upstream outcome: update latency EWMA and passive outlier detection."""
+        if instance.ewma_latency:
+            instance.ewma_latency += self._EWMA_ALPHA * (latency - instance.ewma_latency)
+        else:
+            instance.ewma_latency = latency
+
+        if not failed:
+            self._update_breaker(service_name, instance, instance.breaker.record_success)
+            instance.consecutive_failures = 0
+            instance.ejections = max(0, instance.ejections - 1)
+            return
+
+        self._update_breaker(service_name, instance, lambda: instance.breaker.record_failure(monotonic()))
+        instance.consecutive_failures += 1
+        if instance.consecutive_failures >= self.failure_threshold:
+            self._eject(service_name, instance)
+
+    def _update_breaker(self, service_name: str, instance: UpstreamInstance, update: Callable[[], object]) -> None:
+        """Apply *update* to the instance's breaker and log / export any state change."""
+        before = instance.breaker.state
+        update()
+        after = instance.breaker.state
+        if after == before:
+            return
+        upstream_metrics_helper.record_breaker_state(service_name, instance.url, after)
+        if after == BreakerState.OPEN:
+            self.logger.warning(f"Circuit breaker for {instance.url} ({service_name}) opened")
+        else:
+            self.logger.info(f"Circuit breaker for {instance.url} ({service_name}) is now {after.name.lower()}")
+
+    def _eject(self, service_name: str, instance: UpstreamInstance) -> None:
+        now = monotonic()
+        pool = self.instances(service_name)
+        ejected = sum(1 for other in pool if other.is_ejected(now))
+        if instance.is_ejected(now) or ejected + 1 > len(pool) * self.max_ejection_ratio:
+            return
+        instance.ejections += 1
+        instance.consecutive_failures = 0
+        duration = self.ejection_seconds * min(instance.ejections, self._MAX_EJECTION_MULTIPLIER)
+        instance.ejected_until = now + duration
+        self.logger.warning(f"Ejected {instance.url} ({service_name}) for {duration:.0f}s after repeated failures")
+
+    # ---- background loops ----
+
+    async def _discovery_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.discovery.refresh_seconds)
+            await self.refresh_instances()
+
+    async def _health_check_loop(self, client: AsyncClient) -> None:
+        while True:
+            await self.check_health(client)
+            await asyncio.sleep(self.health_check_interval_seconds)
+
+    async def check_health(self, client: AsyncClient) -> None:
+        """Run one round of active health checks against every instance."""
+        checks = [
+            self._check_instance(client, service, instance)
+            for service in self.config.services.values()
+            for instance in self.instances(service.name)
+        ]
+        await asyncio.gather(*checks)
+
+    async def _check_instance(self, client: AsyncClient, service: ServiceConfig, instance: UpstreamInstance) -> None:
+        url = f"{instance.url.rstrip('/')}/{service.health_check_path.lstrip('/')}"
+        try:
+            response = await client.get(url, timeout=self.health_check_timeout)
+            healthy = 200 <= response.status_code < 300
+        except Exception:
+            healthy = False
+
+        if healthy != instance.healthy:
+            self.logger.warning(f"{service.name} instance {instance.url} is now {'healthy' if healthy else 'unhealthy'}")
+        instance.healthy = healthy
@@ -0,0 +1,385 @@
+import os
+import shutil
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from hashlib import sha256
+from logging import Logger
+from pathlib import Path
+from time import monotonic
+from types import TracebackType
+from typing import Self
+from uuid import uuid4
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from httpx import RequestError, Response as HttpxResponse
+
+from gateway.apigateway import ApiGateway
+from gateway.streaming import ClosingStreamingResponse
+from helpers.cache_helper import cache_metrics_helper
+from shared.utils.cache_entry import etag_matches
+
+
+@dataclass(slots=True)
+class MediaEntry:
+    file: Path
+    etag: str
+    last_modified: str | None
+    content_type: str | None
+    cache_control: str | None
+    size: int
+    fresh_until: float
+
+
+class MediaFill:
+    """One upstream media body being written to a temporary file; added to the cache on commit()."""
+
+    def __init__(
+        self,
+        cache: "MediaDiskCache",
+        path: str,
+        etag: str,
+        last_modified: str | None,
+        content_type: str | None,
+        cache_control: str | None,
+        size: int,
+    ) -> None:
+        self.cache: MediaDiskCache = cache
+        self.path: str = path
+        self.etag: str = etag
+        self.last_modified: str | None = last_modified
+        self.content_type: str | None = content_type
+        self.cache_control: str | None = cache_control
+        self.size: int = size
+        file = cache.file_for(path, etag)
+        self._temp_file: Path = file.with_name(f"{file.name}.{uuid4().hex}.part")
+        self._file: anyio.AsyncFile[bytes] | None = None
+        self._written: int = 0
+
+    async def write(self, chunk: bytes) -> None:
+        if self._file is None:
+            self._file = await anyio.open_file(self._temp_file, mode="wb")
+        await self._file.write(chunk)
+        self._written += len(chunk)
+
+    async def commit(self) -> None:
+        """Move the complete body into place; a short (truncated) body is discarded instead."""
+        await self._close()
+        if self._written != self.size:
+            self.discard()
+            return
+        file = self.cache.file_for(self.path, self.etag)
+        os.replace(self._temp_file, file)
+        self.cache.add(self.path, MediaEntry(
+            file=file,
+            etag=self.etag,
+            last_modified=self.last_modified,
+            content_type=self.content_type,
+            cache_control=self.cache_control,
+            size=self.size,
+            fresh_until=self.cache.fresh_until(),
+        ))
+
+    async def abort(self) -> None:
+        await self._close()
+        self.discard()
+
+    def discard(self) -> None:
+        self._temp_file.unlink(missing_ok=True)
+
+    async def _close(self) -> None:
+        if self._file is not None:
+            with anyio.CancelScope(shield=True):
+                await self._file.aclose()
+            self._file = None
+
+
+class MediaDiskCache:
+    """
+    Per-worker, byte-bounded LRU of media files on local disk, keyed by media path + ETag.
+
+    Each worker keeps its files in its own directory under *directory*, created on
+    open() and removed on close(), so the index never points at a file another worker
+    evicted. An entry is served without asking upstream until revalidate_seconds have
+    passed; after that it is revalidated with If-None-Match. max_bytes=0 disables it.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_entry_bytes: int, revalidate_seconds: float) -> None:
+        self.root: Path = Path(directory)
+        self.max_bytes: int = max_bytes
+        self.max_entry_bytes: int = max_entry_bytes
+        self.revalidate_seconds: float = revalidate_seconds
+        self.directory: Path = self.root / f"worker-{os.getpid()}"
+        self._entries: OrderedDict[str, MediaEntry] = OrderedDict()
+        self._current_bytes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def open(self) -> None:
+        if not self.enabled:
+            return
+        # A directory left behind by a crashed worker with the same pid holds nothing we index.
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def close(self) -> None:
+        self._entries.clear()
+        self._current_bytes = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def file_for(self, path: str, etag: str) -> Path:
+        return self.directory / sha256(f"{path}\0{etag}".encode()).hexdigest()
+
+    def fresh_until(self) -> float:
+        return monotonic() + self.revalidate_seconds
+
+    def get(self, path: str) -> MediaEntry | None:
+        """Return the entry for *path* and mark it most-recently-used, or None."""
+        entry = self._entries.get(path)
+        if entry is not None:
+            self._entries.move_to_end(path)
+        return entry
+
+    def can_store(self, size: int | None) -> bool:
+        return self.enabled and size is not None and size <= min(self.max_entry_bytes, self.max_bytes)
+
+    def start_fill(
+        self,
+        path: str,
+        etag: str,
+        last_modified: str | None,
+        content_type: str | None,
+        cache_control: str | None,
+        size: int,
+    ) -> MediaFill:
+        return MediaFill(self, path, etag, last_modified, content_type, cache_control, size)
+
+    def add(self, path: str, entry: MediaEntry) -> None:
+        """Index a committed file, evicting least-recently-used files to fit."""
+        if path in self._entries:
+            self._remove(path, keep_file=self._entries[path].file == entry.file)
+        self._entries[path] = entry
+        self._current_bytes += entry.size
+
+        while self._current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def refresh(self, path: str) -> None:
+        """Mark *path* as just revalidated (upstream answered 304)."""
+        entry = self._entries.get(path)
+        if entry is not None:
+            entry.fresh_until = self.fresh_until()
+
+    def delete(self, path: str) -> None:
+        if path in self._entries:
+            self._remove(path)
+
+    def _remove(self, path: str, keep_file: bool = False) -> None:
+        entry = self._entries.pop(path)
+        self._current_bytes -= entry.size
+        if not keep_file:
+            # A response still reading the file keeps its open descriptor.
+            entry.file.unlink(missing_ok=True)
+
+
+class MediaProxy:
+    """
+    Serves product-service static media (/media/...) through the gateway, so the
+    frontend uses a single API origin for JSON APIs and image files.
+
+    Upstream bodies are streamed to the client (never buffered whole) while being
+    written to the MediaDiskCache. Cached files are answered from disk with a
+    FileResponse, which honours Range / If-Range and hands the file to the server by
+    path (sendfile) when the server supports the ASGI pathsend extension.
+    If-None-Match / If-Modified-Since are answered with 304 from the entry; on a miss
+    they, and Range, are forwarded upstream and its 206 / 304 passed through.
+    """
+
+    # Client request headers forwarded upstream on a miss.
+    _FORWARDED_HEADERS: tuple[str, ...] = ("range", "if-range", "if-none-match", "if-modified-since")
+    # Upstream response headers passed through to the client.
+    _PASSTHROUGH_HEADERS: tuple[str, ...] = (
+        "cache-control", "etag", "last-modified", "accept-ranges", "content-range",
+        "content-length", "content-encoding",
+    )
+
+    def __init__(self, gateway: ApiGateway, cache: MediaDiskCache, logger: Logger, upstream_url: str) -> None:
+        self.gateway: ApiGateway = gateway
+        self.cache: MediaDiskCache = cache
+        self.logger: Logger = logger
+        self.upstream_url: str = upstream_url.rstrip("/")
+
+    async def __aenter__(self) -> Self:
+        self.cache.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.cache.close()
+
+    async def serve(self, request: Request, file_path: str) -> Response:
+        path = file_path.lstrip("/")
+        if not path:
+            raise HTTPException(status_code=404, detail="Media file not found")
+
+        entry = self.cache.get(path)
+        if entry is not None and entry.fresh_until > monotonic():
+            response = self._from_disk(request, path, entry)
+            if response is not None:
+                cache_metrics_helper.record_media_lookup("hit")
+                return response
+            entry = None
+
+        if entry is not None:
+            # Revalidate the copy; the client's own validators are checked against it afterwards.
+            upstream = await self._fetch(path, {"if-none-match": entry.etag}, stale=entry)
+            if upstream is None or upstream.status_code >= 500:
+                # Upstream unreachable or failing: the stale copy is better than an error.
+                if upstream is not None:
+                    await upstream.aclose()
+                cache_metrics_helper.record_media_lookup("stale")
+                return self._serve_stale(request, path, entry)
+            if upstream.status_code == 304:
+                await upstream.aclose()
+                self.cache.refresh(path)
+                response = self._from_disk(request, path, entry)
+                if response is not None:
+                    cache_metrics_helper.record_media_lookup("revalidated")
+                    return response
+            elif upstream.status_code == 200 and not self._client_headers(request):
+                return self._miss(request, path, upstream)
+            else:
+                # Changed (or gone) upstream. A changed body is fetched again with the client's
+                # Range / validators; anything else (e.g. 404) is passed through.
+                self.cache.delete(path)
+                if upstream.status_code != 200:
+                    return self._miss(request, path, upstream)
+                await upstream.aclose()
+
+        upstream = await self._fetch(path, self._client_headers(request), stale=None)
+        return self._miss(request, path, upstream)
+
+    def _miss(self, request: Request, path: str, upstream: HttpxResponse) -> StreamingResponse:
+        cache_metrics_helper.record_media_lookup("miss")
+        return self._stream(upstream, fill=self._start_fill(request, path, upstream))
+
+    def _client_headers(self, request: Request) -> dict[str, str]:
+        return {name: value for name in self._FORWARDED_HEADERS if (value := request.headers.get(name))}
+
+    async def _fetch(self, path: str, headers: dict[str, str], stale: MediaEntry | None) -> HttpxResponse | None:
+        """Open the upstream body as a stream. A connection failure is a 502, or None when a *stale* copy can answer."""
+        upstream_url = f"{self.upstream_url}/media/{path}"
+        client = self.gateway.client
+        try:
+            return await client.send(
+                client.build_request("GET", upstream_url, headers=headers, timeout=self.gateway._TIMEOUT),
+                stream=True,
+            )
+        except RequestError as exc:
+            self.logger.error(f"Failed to fetch media from product-service ({upstream_url}): {exc!r}")
+            if stale is None:
+                raise HTTPException(status_code=502, detail="Failed to fetch media file")
+            return None
+
+    def _serve_stale(self, request: Request, path: str, entry: MediaEntry) -> Response:
+        response = self._from_disk(request, path, entry)
+        if response is None:
+            raise HTTPException(status_code=502, detail="Failed to fetch media file")
+        return response
+
+    def _from_disk(self, request: Request, path: str, entry: MediaEntry) -> Response | None:
+        """Answer from the cached file, or None when the file has gone missing."""
+        headers = {"etag": entry.etag}
+        if entry.last_modified:
+            headers["last-modified"] = entry.last_modified
+        if entry.cache_control:
+            headers["cache-control"] = entry.cache_control
+        if self._is_not_modified(request, entry):
+            return Response(status_code=304, headers=headers)
+        try:
+            stat_result = os.stat(entry.file)
+        except FileNotFoundError:
+            self.cache.delete(path)
+            return None
+        return FileResponse(entry.file, headers=headers, media_type=entry.content_type, stat_result=stat_result)
+
+    def _is_not_modified(self, request: Request, entry: MediaEntry) -> bool:
+        """If-None-Match takes precedence over If-Modified-Since (RFC 9110 §13.2.2)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, entry.etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or entry.last_modified is None:
+            return False
+        try:
+            return parsedate_to_datetime(entry.last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    def _start_fill(self, request: Request, path: str, upstream: HttpxResponse) -> MediaFill | None:
+        """A fill for a full, identity-encoded 200 body with an ETag that fits the cache; otherwise None."""
+        headers = upstream.headers
+        content_length = headers.get("content-length")
+        etag = headers.get("etag")
+        if (
+            upstream.status_code != 200
+            or "range" in request.headers
+            or etag is None
+            or headers.get("content-encoding")
+            or "no-store" in headers.get("cache-control", "")
+            or content_length is None
+            or not content_length.isdigit()
+            or not self.cache.can_store(int(content_length))
+        ):
+            return None
+        return self.cache.start_fill(
+            path,
+            etag=etag,
+            last_modified=headers.get("last-modified"),
+            content_type=headers.get("content-type"),
+            cache_control=headers.get("cache-control"),
+            size=int(content_length),
+        )
+
+    def _stream(self, upstream: HttpxResponse, fill: MediaFill | None) -> StreamingResponse:
+        passthrough_headers = {
+            header: value for header in self._PASSTHROUGH_HEADERS if (value := upstream.headers.get(header))
+        }
+        body = upstream.aiter_raw() if fill is None else self._tee(upstream, fill)
+        # Closes the tee (aborting an unfinished fill) and then the upstream as soon as the stream ends or breaks.
+        return ClosingStreamingResponse(
+            body,
+            on_close=upstream.aclose,
+            status_code=upstream.status_code,
+            media_type=upstream.headers.get("content-type"),
+            headers=passthrough_headers,
+        )
+
+    async def _tee(self, upstream: HttpxResponse, fill: MediaFill) -> AsyncIterator[bytes]:
+        """Stream the upstream body to the client while writing it to the cache."""
+        committed = False
+        try:
+            async for chunk in upstream.aiter_raw():
+                await fill.write(chunk)
+                yield chunk
+            await fill.commit()
+            committed = True
+        finally:
+            if not committed:
+                await fill.abort()
@@ -0,0 +1,81 @@
+import os
+from logging import Logger
+
+from orjson import loads
+
+from schemas.gateway_schemas import ServiceConfig
+
+
+class ServiceDiscovery:
+    """
+    Resolves the instance URLs of upstream services from, in order of precedence:
+
+    1. A local JSON file mapping service name → list of base URLs, e.g.
+       {"product-service": ["http://product-service-1:8002", "http://product-service-2:8002"]}.
+       The file is re-read whenever its modification time changes.
+    2. DNS SRV records (ServiceConfig.srv_record), resolved with dnspython if installed.
+
+    resolve() returns None when neither source knows the service, so the statically
+    configured instances stay in place.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        file_path: str | None = None,
+        refresh_seconds: float = 30.0,
+        scheme: str = "http",
+    ) -> None:
+        self.logger: Logger = logger
+        self.file_path: str | None = file_path
+        self.refresh_seconds: float = refresh_seconds
+        self.scheme: str = scheme
+        self._file_mtime: float | None = None
+        self._file_instances: dict[str, list[str]] = {}
+
+    async def resolve(self, service: ServiceConfig) -> list[str] | None:
+        file_instances = self._read_file().get(service.name)
+        if file_instances:
+            return file_instances
+        if service.srv_record:
+            return await self._resolve_srv(service.srv_record)
+        return None
+
+    def _read_file(self) -> dict[str, list[str]]:
+        if not self.file_path:
+            return {}
+        try:
+            mtime = os.stat(self.file_path).st_mtime
+        except OSError as e:
+            self.logger.error(f"Cannot read service discovery file {self.file_path}: {str(e)}")
+            return self._file_instances
+
+        if mtime != self._file_mtime:
+            with open(self.file_path, "rb") as f:
+                data = loads(f.read())
+            self._file_instances = {
+                name: [str(url) for url in urls]
+                for name, urls in data.items()
+                if isinstance(urls, list)
+            }
+            self._file_mtime = mtime
+        return self._file_instances
+
+    async def _resolve_srv(self, record: str) -> list[str] | None:
+        try:
+            from dns import asyncresolver
+        except ImportError:
+            self.logger.warning(f"dnspython is not installed; cannot resolve SRV record {record}")
+            return None
+
+        answers = await asyncresolver.resolve(record, "SRV")
+        # Lowest priority value wins; within it, higher weights first.
+        ordered = sorted(answers, key=lambda answer: (answer.priority, -answer.weight))
+        if not ordered:
+            return None
+        best_priority = ordered[0].priority
+        return [
+            f"{self.scheme}://{str(answer.target).rstrip('.')}:{answer.port}"
+            for answer in ordered
+            if answer.priority == best_priority
+        ]
@@ -0,0 +1,46 @@
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse that awaits *on_close* exactly once, however the body ends:
+    fully sent, upstream read error mid-body, client disconnect, or never started.
+
+    Starlette skips the response's BackgroundTask when streaming raises, so a
+    background task cannot be what frees an upstream connection or slot.
+    """
+
+    def __init__(self, content: AsyncIterable[bytes], on_close: Callable[[], Awaitable[Any]], **kwargs: Any) -> None:
+        self._on_close = on_close
+        self._closed: bool = False
+        super().__init__(self._closing(content), **kwargs)
+
+    async def _closing(self, content: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            try:
+                # An abandoned inner generator (e.g. a cache tee) runs its own cleanup now, not at GC.
+                aclose = getattr(content, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                await self.close()
+
+    async def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            await self._on_close()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Runs the body's finally when streaming stopped mid-way; close() covers a body never started.
+            await self.body_iterator.aclose()
+            await self.close()
@@ -0,0 +1,65 @@
+from prometheus_client import Counter, Gauge
+
+
+class CacheMetricsHelper:
+    """Encapsulates gateway response-cache and media-cache metric setup and recording."""
+    def __init__(self) -> None:
+        self._cache_lookups: Counter | None = None
+        self._cache_revalidations: Counter | None = None
+        self._media_lookups: Counter | None = None
+        self._key_cardinality: Gauge | None = None
+        self._param_cardinality: Gauge | None = None
+
+    def initialize(self) -> None:
+        self._cache_lookups = Counter(
+            "gateway_cache_lookups_total",
+            "Gateway response-cache lookups by outcome (hit, stale, miss) and cache namespace",
+            ["result", "namespace"],
+        )
+        self._cache_revalidations = Counter(
+            "gateway_cache_revalidations_total",
+            "Background refreshes of stale gateway cache entries by outcome",
+            ["result"],
+        )
+        self._media_lookups = Counter(
+            "gateway_media_cache_lookups_total",
+            "Gateway media disk-cache lookups by outcome (hit, revalidated, stale, miss)",
+            ["result"],
+        )
+        self._key_cardinality = Gauge(
+            "gateway_cache_key_cardinality",
+            "Distinct response-cache keys filled per namespace in the current cardinality window",
+            ["namespace"],
+        )
+        self._param_cardinality = Gauge(
+            "gateway_cache_param_cardinality",
+            "Distinct values of each query parameter among filled cache keys, per namespace",
+            ["namespace", "param"],
+        )
+
+    def record_lookup(self, result: str, namespace: str | None = None) -> None:
+        if self._cache_lookups is None:
+            return
+        self._cache_lookups.labels(result=result, namespace=namespace or "none").inc()
+
+    def record_revalidation(self, result: str) -> None:
+        if self._cache_revalidations is None:
+            return
+        self._cache_revalidations.labels(result=result).inc()
+
+    def record_media_lookup(self, result: str) -> None:
+        if self._media_lookups is None:
+            return
+        self._media_lookups.labels(result=result).inc()
+
+    def record_key_cardinality(self, namespace: str, param: str | None, count: int) -> None:
+        """CacheManager.on_cardinality callback: *param* None is the namespace's whole-key count."""
+        if self._key_cardinality is None:
+            return
+        if param is None:
+            self._key_cardinality.labels(namespace=namespace).set(count)
+        else:
+            self._param_cardinality.labels(namespace=namespace, param=param).set(count)
+
+
+cache_metrics_helper = CacheMetricsHelper()
@@ -0,0 +1,38 @@
+from fastapi import Request
+from prometheus_client import Counter, Histogram
+
+
+class RequestMetricsHelper:
+    """Encapsulates gateway request count and latency metric setup and recording."""
+    def __init__(self) -> None:
+        self._requests: Counter | None = None
+        self._latency: Histogram | None = None
+
+    def initialize(self) -> None:
+        self._requests = Counter(
+            "gateway_requests_total",
+            "Total HTTP requests at API Gateway",
+            ["method", "path", "status"],
+        )
+        self._latency = Histogram(
+            "gateway_request_duration_seconds",
+            "Gateway request latency",
+            ["method", "path"],
+            buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+        )
+
+    def observe(self, request: Request, status_code: int, duration: float) -> None:
+        if self._requests is None or self._latency is None:
+            return
+        self._requests.labels(
+            method=request.method,
+            path=request.url.path,
+            status=f"{status_code // 100}xx",
+        ).inc()
+        self._latency.labels(
+            method=request.method,
+            path=request.url.path,
+        ).observe(duration)
+
+
+request_metrics_helper = RequestMetricsHelper()
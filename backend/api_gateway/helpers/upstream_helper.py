@@ -0,0 +1,95 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+class UpstreamMetricsHelper:
+    """
+    Encapsulates gateway upstream metric setup and recording
+    (circuit breakers, bulkheads, per-service connection pools).
+    """
+    def __init__(self) -> None:
+        self._breaker_state: Gauge | None = None
+        self._rejections: Counter | None = None
+        self._pool_size: Gauge | None = None
+        self._pool_in_use: Gauge | None = None
+        self._pool_peak_in_use: Gauge | None = None
+        self._pool_utilization: Gauge | None = None
+        self._pool_wait: Histogram | None = None
+        self._connections_opened: Counter | None = None
+
+    def initialize(self) -> None:
+        self._breaker_state = Gauge(
+            "gateway_circuit_breaker_state",
+            "Circuit-breaker state per upstream instance (0 closed, 1 half-open, 2 open)",
+            ["service", "instance"],
+        )
+        self._rejections = Counter(
+            "gateway_upstream_rejections_total",
+            "Requests fast-failed by the gateway without reaching the upstream, by reason",
+            ["service", "reason"],
+        )
+        self._pool_size = Gauge(
+            "gateway_upstream_pool_size",
+            "Maximum connections of the upstream service's connection pool",
+            ["service"],
+        )
+        self._pool_in_use = Gauge(
+            "gateway_upstream_pool_in_use",
+            "Upstream requests currently in flight on the service's connection pool",
+            ["service"],
+        )
+        self._pool_peak_in_use = Gauge(
+            "gateway_upstream_pool_peak_in_use",
+            "Highest number of concurrent upstream requests seen on the service's connection pool",
+            ["service"],
+        )
+        self._pool_utilization = Gauge(
+            "gateway_upstream_pool_utilization",
+            "Requests in flight as a fraction of the service's connection pool size",
+            ["service"],
+        )
+        self._pool_wait = Histogram(
+            "gateway_upstream_pool_wait_seconds",
+            "Time an upstream request waited for a pooled connection (or to start opening one)",
+            ["service"],
+            buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+        )
+        self._connections_opened = Counter(
+            "gateway_upstream_connections_opened_total",
+            "New connections opened to the upstream service; a steady rate means connections are churned",
+            ["service"],
+        )
+
+    def record_breaker_state(self, service: str, instance: str, state: int) -> None:
+        if self._breaker_state is None:
+            return
+        self._breaker_state.labels(service=service, instance=instance).set(state)
+
+    def record_rejection(self, service: str, reason: str) -> None:
+        if self._rejections is None:
+            return
+        self._rejections.labels(service=service, reason=reason).inc()
+
+    def record_pool_size(self, service: str, size: int) -> None:
+        if self._pool_size is None:
+            return
+        self._pool_size.labels(service=service).set(size)
+
+    def record_pool_usage(self, service: str, in_use: int, peak_in_use: int, utilization: float) -> None:
+        if self._pool_in_use is None:
+            return
+        self._pool_in_use.labels(service=service).set(in_use)
+        self._pool_peak_in_use.labels(service=service).set(peak_in_use)
+        self._pool_utilization.labels(service=service).set(utilization)
+
+    def record_pool_wait(self, service: str, seconds: float) -> None:
+        if self._pool_wait is None:
+            return
+        self._pool_wait.labels(service=service).observe(seconds)
+
+    def record_connection_opened(self, service: str) -> None:
+        if self._connections_opened is None:
+            return
+        self._connections_opened.labels(service=service).inc()
+
+
+upstream_metrics_helper = UpstreamMetricsHelper()
@@ -2,18 +2,23 @@ import os
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from datetime import datetime
-from time import perf_counter
 
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response as PlainResponse
 from uvicorn import run
-from fastapi import FastAPI, Request, HTTPException
-from httpx import RequestError
-from prometheus_client import CollectorRegistry, generate_latest, multiprocess, REGISTRY, Histogram, Counter
+from fastapi import FastAPI, Request, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+from prometheus_client import CollectorRegistry, generate_latest, multiprocess, REGISTRY
 
 from shared.exceptions.base_exceptions import BaseAPIException
 from shared.middleware.logging_middleware import add_logging_middleware
+from shared.middleware.service_middleware import RequestGuardMiddleware, RequestMetricsMiddleware
 from shared.telemetry import setup_tracing
+from shared.utils.compression import supported_encodings
+from helpers.cache_helper import cache_metrics_helper
+from helpers.request_helper import request_metrics_helper
+from helpers.upstream_helper import upstream_metrics_helper
+from middleware.compression_middleware import CompressionMiddleware
 from routes.user_routes import user_proxy
 from routes.product_routes import product_proxy
 from routes.supplier_routes import supplier_proxy
@@ -23,37 +28,25 @@ from routes.payment_routes import payment_proxy
 from routes.cart_routes import cart_proxy
 from routes.shipping_routes import shipping_proxy
 from routes.wishlist_routes import wishlist_proxy
+from routes.batch_routes import batch_proxy
 from resources import api_gateway_runtime, get_api_gateway_resources, logger, settings
 
 
 
 """
-Request  →  logging → CORS → authentication_middleware → gateway_middleware → route
+All layers are pure ASGI and share one RequestContext (shared.middleware.request_context):
 
-Response ←  logging ← CORS ← authentication_middleware ← gateway_middleware ← route
-"""
+Request  →  logging → CORS → authentication guard → metrics → compression → gateway → route
 
-REQUEST_COUNTER: Counter | None = None
-LATENCY_COUNTER: Histogram | None = None
+Response ←  logging ← CORS ← authentication guard ← metrics ← compression ← gateway ← route
+"""
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Attach one lifespan-owned resource container to this app instance."""
-    global REQUEST_COUNTER
-    global LATENCY_COUNTER
-
-    REQUEST_COUNTER = Counter(
-        "gateway_requests_total",
-        "Total HTTP requests at API Gateway",
-        ["method", "path", "status"],
-    )
-
-    LATENCY_COUNTER = Histogram(
-        "gateway_request_duration_seconds",
-        "Gateway request latency",
-        ["method", "path"],
-        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
-    )
+    request_metrics_helper.initialize()
+    cache_metrics_helper.initialize()
+    upstream_metrics_helper.initialize()
 
     logger.info(f"Server is starting up on {settings.APP_HOST}:{settings.API_GATEWAY_SERVICE_APP_PORT}...")
     async with api_gateway_runtime() as resources:
@@ -75,51 +68,62 @@ setup_tracing(app, service_name="api-gateway", instrument_sqlalchemy=False)
 
 
 
-# Ratelimiting and caching middleware on each request
-# Registered first → becomes the inner layer, runs AFTER authentication_middleware.
-# This ensures auth is always validated before cache is consulted or rate limits are tracked.
-@app.middleware("http")
-async def gateway_middleware(request: Request, call_next):
-    """
-    Gateway middleware: global rate limiting, response caching, and cache invalidation.
-    Monitoring paths bypass all gateway logic — they must never be rate-limited or cached.
-    """
+# Monitoring paths bypass all gateway logic — they must never be rate-limited, cached or counted.
+MONITORING_PATHS: frozenset[str] = frozenset({"/metrics", "/health"})
 
-    if request.url.path in ("/metrics", "/health"):
-        return await call_next(request)
 
-    resources = get_api_gateway_resources(request)
-    is_public = resources.auth.is_public_endpoint(request.url.path, request.method)
-    start = perf_counter()
-    response = await resources.request_middleware(request, call_next, is_public=is_public)
-    duration = perf_counter() - start
+class GatewayMiddleware:
+    """
+    Pure ASGI gateway layer: global rate limiting, response caching, and cache invalidation.
+    """
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
 
-    if REQUEST_COUNTER and LATENCY_COUNTER:
-        REQUEST_COUNTER.labels(
-            method=request.method,
-            path=request.url.path,
-            status=f"{response.status_code // 100}xx",
-        ).inc()
-        LATENCY_COUNTER.labels(
-            method=request.method,
-            path=request.url.path,
-        ).observe(duration)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in MONITORING_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-    return response
+        request = Request(scope, receive)
+        resources = get_api_gateway_resources(request)
+        is_public = resources.auth.route_policy(request).is_public(request.method)
+        await resources.request_middleware(request, self.app, send, is_public=is_public)
 
 
-# Auth middleware registered second → becomes the outer layer, runs FIRST on every request.
-# This guarantees tokens are validated before cache lookups or rate limiting.
-@app.middleware("http")
-async def authentication_middleware(request: Request, call_next):
+async def authenticate_request(request: Request) -> Response | None:
     """
-    Authentication middleware to handle JWT tokens
+    Authentication guard to handle JWT tokens; returns the 401 response for rejected requests.
     """
     logger.debug("Running authentication middleware...")
-    return await get_api_gateway_resources(request).auth.middleware(request, call_next)
+    return await get_api_gateway_resources(request).auth.authenticate(request)
+
+
+# Ratelimiting and caching middleware on each request
+# Added first → becomes the inner layer, runs AFTER the authentication guard.
+# This ensures auth is always validated before cache is consulted or rate limits are tracked.
+app.add_middleware(GatewayMiddleware)
+
+# Compresses what the gateway layer forwards; cache hits already carry a pre-compressed
+# variant (Content-Encoding set) and pass through untouched.
+app.add_middleware(
+    CompressionMiddleware,
+    encodings=supported_encodings(settings.API_GATEWAY_COMPRESSION_ENCODINGS),
+    minimum_size=settings.API_GATEWAY_COMPRESSION_MIN_BYTES,
+)
 
+# Request count/latency of everything that reaches the gateway layer.
+app.add_middleware(
+    RequestMetricsMiddleware,
+    observe=request_metrics_helper.observe,
+    skip_path=lambda path: path in MONITORING_PATHS,
+)
 
-# CORS must be added AFTER @app.middleware decorators — Starlette builds the stack
+# Authentication guard added after → becomes the outer layer, runs FIRST on every request.
+# This guarantees tokens are validated before cache lookups or rate limiting.
+app.add_middleware(RequestGuardMiddleware, guard=authenticate_request)
+
+
+# CORS must be added AFTER the gateway layers above — Starlette builds the stack
 # in LIFO order, so the last add_middleware call becomes the outermost layer.
 # This ensures CORS headers are present on ALL responses, including auth 401s.
 app.add_middleware(
@@ -174,34 +178,10 @@ async def proxy_product_media(request: Request, file_path: str):
     """
     Proxy product-service static media through API Gateway so frontend can use a
     single API origin (:8000) for both JSON APIs and generated image files.
+    Files are streamed, cached on the gateway's disk and served from there
+    with Range and conditional-request support (see MediaProxy).
     """
-    normalized_path = file_path.lstrip("/")
-    if not normalized_path:
-        raise HTTPException(status_code=404, detail="Media file not found")
-
-    upstream_url = f"{settings.PRODUCT_SERVICE_URL.rstrip('/')}/media/{normalized_path}"
-    try:
-        gateway = get_api_gateway_resources(request).gateway
-        upstream_response = await gateway.client.get(
-            upstream_url,
-            timeout=gateway._TIMEOUT,
-        )
-    except RequestError as exc:
-        logger.error(f"Failed to fetch media from product-service ({upstream_url}): {exc!r}")
-        raise HTTPException(status_code=502, detail="Failed to fetch media file")
-
-    passthrough_headers: dict[str, str] = {}
-    for header in ("cache-control", "etag", "last-modified", "accept-ranges", "content-range"):
-        value = upstream_response.headers.get(header)
-        if value:
-            passthrough_headers[header] = value
-
-    return PlainResponse(
-        content=upstream_response.content,
-        status_code=upstream_response.status_code,
-        media_type=upstream_response.headers.get("content-type"),
-        headers=passthrough_headers,
-    )
+    return await get_api_gateway_resources(request).media.serve(request, file_path)
 
 
 def add_exception_handlers(app: FastAPI):
@@ -234,6 +214,7 @@ app.include_router(payment_proxy, prefix=settings.API_GATEWAY_SERVICE_URL_API_VE
 app.include_router(cart_proxy, prefix=settings.API_GATEWAY_SERVICE_URL_API_VERSION, tags=["Cart Service Proxy"])
 app.include_router(shipping_proxy, prefix=settings.API_GATEWAY_SERVICE_URL_API_VERSION, tags=["Shipping Service Proxy"])
 app.include_router(wishlist_proxy, prefix=settings.API_GATEWAY_SERVICE_URL_API_VERSION, tags=["Wishlist Service Proxy"])
+app.include_router(batch_proxy, prefix=settings.API_GATEWAY_SERVICE_URL_API_VERSION, tags=["Batch"])
 
 if __name__ == "__main__":
     run("main:app",
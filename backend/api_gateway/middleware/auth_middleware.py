@@ -3,79 +3,103 @@ from fastapi import Request, HTTPException, Response
 from fastapi.responses import JSONResponse
 
 from shared.settings import Settings
+from shared.contracts.auth import TokenClaims
+from shared.managers.cache_manager import CacheManager
 from shared.managers.token_manager import TokenManager
 from shared.enums.auth_enums import AuthCookies
+from shared.utils.route_policy import ROUTE_POLICY_SCOPE_KEY, RoutePolicy, RoutePolicyMatcher
+
+
+def build_public_endpoints(api_version: str) -> dict[str, list[str] | None]:
+    """
+    Endpoints that don't require authentication, with their public methods (None = all).
+    A path covers everything below it; a trailing slash covers only what is below it.
+    The most specific matching entry decides (see RoutePolicyMatcher).
+    """
+    return {
+        "/health": None,
+        "/metrics": None,
+        "/media": None,
+        "/docs": None,
+        "/redoc": None,
+        "/openapi.json": None,
+        f"{api_version}/register": ['POST'],
+        f"{api_version}/login": ['POST'],
+        f"{api_version}/google-login": ['POST'],
+        f"{api_version}/refresh": ['POST'],
+        f"{api_version}/logout": ['POST'],
+        f"{api_version}/forgot-password": ['POST'],
+        f"{api_version}/activate/": ['POST'],
+        f"{api_version}/password-reset/": ['POST'],
+        f"{api_version}/products": ['GET'],
+        f"{api_version}/categories": ['GET'],
+        f"{api_version}/customization/pricing": ['GET'],
+        f"{api_version}/images/generations/": ['GET'],  # job status poll
+        f"{api_version}/images/generations": ['POST'],
+        f"{api_version}/admin/schema/users": ['GET'],
+        f"{api_version}/admin/schema/products": ['GET'],
+        f"{api_version}/admin/schema/categories": ['GET'],
+        f"{api_version}/admin/schema/images": ['GET'],
+        f"{api_version}/admin/schema/reviews": ['GET'],
+        f"{api_version}/admin/schema/orders": ['GET'],
+        f"{api_version}/payments/webhook": ['POST'],
+        f"{api_version}/shipping/methods": ['GET'],
+        f"{api_version}/shipping/methods/": ['GET'],
+        f"{api_version}/shipping/rates": ['POST'],
+        # Sub-requests are authorized one by one (see AuthMiddleware.authorize).
+        f"{api_version}/batch": ['POST'],
+    }
+
 
 class AuthMiddleware:
     """
     Middleware to handle proper access via JWT authentication by validating tokens with the User Service.
     """
-    def __init__(self, settings: Settings, logger: Logger, token_manager: TokenManager):
+    def __init__(
+        self,
+        settings: Settings,
+        logger: Logger,
+        token_manager: TokenManager,
+        route_matcher: RoutePolicyMatcher | None = None,
+    ):
         self.settings: Settings = settings
         self.logger: Logger = logger
         self.token_manager = token_manager
-        self.PUBLIC_ENDPOINTS: dict[str, list[str] | None] = {
-            "/health": None,
-            "/metrics": None,
-            "/media": None,
-            "/docs": None,
-            "/redoc": None,
-            "/openapi.json": None,
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/register": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/login": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/google-login": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/refresh": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/logout": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/forgot-password": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/activate/": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/password-reset/": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/products": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/categories": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/customization/pricing": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/images/generations/": ['GET'],  # job status poll
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/images/generations": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/users": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/products": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/categories": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/images": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/reviews": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/admin/schema/orders": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/payments/webhook": ['POST'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/shipping/methods": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/shipping/methods/": ['GET'],
-            f"{self.settings.API_GATEWAY_SERVICE_URL_API_VERSION}/shipping/rates": ['POST'],
+        self.PUBLIC_ENDPOINTS: dict[str, list[str] | None] = build_public_endpoints(
+            self.settings.API_GATEWAY_SERVICE_URL_API_VERSION
+        )
+        # Compiled once and shared with the CacheManager: the policy stored on the request scope
+        # must carry both the auth and the cache rules.
+        self.route_matcher: RoutePolicyMatcher = route_matcher or CacheManager.build_route_matcher(
+            self.settings.API_GATEWAY_SERVICE_URL_API_VERSION,
+            public_endpoints=self.PUBLIC_ENDPOINTS,
+        )
 
-        }
+    def route_policy(self, request: Request) -> RoutePolicy:
+        """The request's RoutePolicy, matched once per request and kept on its scope for later layers."""
+        policy = request.scope.get(ROUTE_POLICY_SCOPE_KEY)
+        if not isinstance(policy, RoutePolicy):
+            policy = self.route_matcher.match(request.url.path)
+            request.scope[ROUTE_POLICY_SCOPE_KEY] = policy
+        return policy
 
     def is_public_endpoint(self, path: str, method: str) -> bool:
         """Check if the given path is a public endpoint that doesn't require authentication"""
-        # Check exact matches
-        if path in self.PUBLIC_ENDPOINTS:
-            allowed_methods = self.PUBLIC_ENDPOINTS[path]
-            if allowed_methods is None:
-                return True
-            return method in allowed_methods
+        return self.route_matcher.match(path).is_public(method)
 
-
-        for endpoint_prefix, allowed_methods in self.PUBLIC_ENDPOINTS.items():
-            if path.startswith(endpoint_prefix):
-                if allowed_methods is None:
-                    return True
-                return method in allowed_methods
-        return False
-
-    async def middleware(self, request: Request, call_next):
+    async def authenticate(self, request: Request) -> Response | None:
         """
-        Main middleware function to authenticate requests using JWT tokens.
+        Authenticate a request using JWT tokens; returns the error response to answer it with,
+        or None to let it through (with `request.state.current_user` set when a token validated).
         Checks `access_token` **cookie first**, falls back to `Authorization: Bearer` header (so Swagger UI keeps working)
         """
         path, method = request.url.path, request.method
         self.logger.info(f"🔍 Auth middleware processing: {method} {path}")
         # Always pass OPTIONS (CORS preflight) through — CORSMiddleware handles it
         if method == "OPTIONS":
-            return await call_next(request)
+            return None
         # 1. Check if this is a public endpoint
-        is_public = self.is_public_endpoint(path, method)
+        is_public = self.route_policy(request).is_public(method)
         self.logger.info(f"🔍 Is path: '{path}' public?  - {is_public}")
         # 2. Extract token: prefer HttpOnly cookie, fall back to Authorization header
         token = request.cookies.get("access_token")
@@ -115,7 +139,30 @@ class AuthMiddleware:
         else:
             self.logger.info(f"Path: {path} is public, no token provided")
 
-        return await call_next(request)
+        return None
+
+    def authorize(
+        self,
+        request: Request,
+        current_user: TokenClaims | None,
+        owner_id: str | None = None) -> None:
+        """
+        Authorize a request the gateway dispatches itself (e.g. a batch sub-request)
+        for *current_user*, the caller already authenticated by `authenticate`.
+        Protected routes need a user; routes scoped to *owner_id* need that user or an admin.
+        Raises HTTPException (401/403) the way the route dependencies do.
+        """
+        if self.route_policy(request).is_public(request.method):
+            return
+        if current_user is None:
+            raise HTTPException(
+                status_code=401,
+                detail="Authentication required",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if owner_id is not None and current_user.role != self.settings.SECRET_ROLE and str(current_user.id) != owner_id:
+            self.logger.warning(f"User id: {current_user.id} is trying to access data of user id: {owner_id}")
+            raise HTTPException(status_code=403, detail="Access denied: You can only access your own data")
 
     def set_auth_cookies(self,
                           response: Response,
@@ -1,9 +1,17 @@
 from typing import Any
 
-from fastapi import Request, Response
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Send
 
+from helpers.cache_helper import cache_metrics_helper
+from middleware.rate_limit_lease import LeasedRateLimiter
+from middleware.request_coalescer import RequestCoalescer
 from shared.managers.cache_manager import CacheManager
-from shared.managers.ratelimit_manager import RateLimitManager
+from shared.middleware.request_context import bind_request_context
+from shared.utils.cache_entry import CachedResponse, CacheEntryMetadata, etag_matches
+from shared.utils.compression import is_compressible, negotiate_encoding
 
 
 class GatewayRequestMiddleware:
@@ -11,47 +19,107 @@ class GatewayRequestMiddleware:
     Class-based middleware that encapsulates the full gateway request pipeline:
     global rate limiting, cache read-through / write-through, and cache invalidation.
 
-    Holds a CacheManager for response caching/invalidation and a RateLimitManager
-    for global IP-based throttling.
+    Holds a CacheManager for response caching/invalidation, a LeasedRateLimiter
+    for global IP-based throttling from a local token lease and a RequestCoalescer that collapses
+    concurrent misses on the same cache key into one upstream call.
+
+    Cacheable bodies of at least compression_min_bytes are compressed with each of
+    compression_encodings when the entry is filled, so cache hits are answered
+    with pre-compressed bytes.
     """
 
     # Global rate-limit defaults applied to every request.
     _RATE_LIMIT_TIMES: int = 10_000
     _RATE_LIMIT_SECONDS: int = 60
 
-    def __init__(self, cache_manager: CacheManager, rate_limit_manager: RateLimitManager) -> None:
+    # Scope flag marking a background refresh of a stale entry: it skips rate limiting
+    # and the cache read, and goes straight upstream to re-fill the entry.
+    _REVALIDATE_SCOPE_KEY: str = "gateway.revalidate"
+    # Request scope keys carried over into a background refresh; routing keys are re-derived.
+    _REVALIDATE_SCOPE_KEYS: tuple[str, ...] = (
+        "type", "asgi", "http_version", "method", "scheme", "server", "client",
+        "root_path", "path", "raw_path", "query_string", "headers", "state",
+    )
+    # Validators dropped from a background refresh so upstream returns a full body to cache.
+    _CONDITIONAL_HEADERS: tuple[bytes, ...] = (b"if-none-match", b"if-modified-since")
+
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        rate_limiter: LeasedRateLimiter,
+        coalescer: RequestCoalescer,
+        max_cacheable_bytes: int = 1024 * 1024,
+        compression_encodings: tuple[str, ...] = (),
+        compression_min_bytes: int = 1024,
+    ) -> None:
         self.cache_manager: CacheManager = cache_manager
-        self.rate_limit_manager: RateLimitManager = rate_limit_manager
+        self.rate_limiter: LeasedRateLimiter = rate_limiter
+        self.coalescer: RequestCoalescer = coalescer
+        self.max_cacheable_bytes: int = max_cacheable_bytes
+        self.compression_encodings: tuple[str, ...] = compression_encodings
+        self.compression_min_bytes: int = compression_min_bytes
 
 
-    async def __call__(self, request: Request, call_next: Any, is_public: bool) -> Response:
+    async def __call__(self, request: Request, app: ASGIApp, send: Send, is_public: bool) -> None:
         """
-        Execute the full gateway middleware pipeline for a single request.
+        Execute the full gateway middleware pipeline for a single request, answering it through *send*.
 
         Steps:
-          1. Global rate-limit check (fails-open on Redis errors).
-          2. Return cached GET response when available.
-          3. Forward request to the downstream microservice.
-          4. On 2xx GET: buffer body, cache it, reconstruct a streamable Response.
+          1. Global rate-limit check from the worker's local lease; Redis is only
+             awaited when the lease is empty (fails-open on Redis errors).
+          2. Return cached GET response when available. A fresh entry is a hit; a stale
+             one (past its fresh TTL, before Redis expires it) is served as-is while a
+             background refresh runs, so an upstream outage keeps serving stale data.
+             A matching If-None-Match is answered with 304 from the entry's header alone.
+             The body goes out in the pre-compressed variant Accept-Encoding asks for.
+          3. On a cacheable miss: forward through the single-flight coalescer, so
+             concurrent misses on the same key share one upstream call. Client
+             validators are forwarded upstream as-is.
+          4. On 2xx GET: hold the body back, cache it (with its compressed variants),
+             then send it with the entry's ETag.
           5. On 2xx mutation: invalidate stale cache namespaces.
 
         Args:
             request:          Incoming FastAPI/Starlette request.
-            call_next:        Middleware callable to forward to the next layer.
+            app:              The rest of the ASGI stack to forward to.
+            send:             ASGI send callable answering the request.
             is_public:        True when the endpoint is caller-invariant
                               (same response for all users).
         """
+        scope, receive = request.scope, request.receive
+        if scope.get(self._REVALIDATE_SCOPE_KEY):
+            await self._forward_and_cache(request, app, send)
+            return
+
         # 1. Global rate limit: fail-open so Redis outages don't block all traffic.
-        _ = await self.rate_limit_manager.is_rate_limited(
-            request,
-            times=self._RATE_LIMIT_TIMES,
-            seconds=self._RATE_LIMIT_SECONDS,
-        )
+        try:
+            _ = await self.rate_limiter.is_rate_limited(
+                request,
+                times=self._RATE_LIMIT_TIMES,
+                seconds=self._RATE_LIMIT_SECONDS,
+            )
+        except HTTPException as exc:
+            # Raised outside the app's exception handlers, so it is rendered here.
+            response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers)
+            await response(scope, receive, send)
+            return
 
         # 2. Return from cache if available.
-        cached = await self.cache_manager.get_cached_response(request, is_public=is_public)
-        if cached:
-            return cached
+        if_none_match = request.headers.get("if-none-match")
+        accept_encoding = request.headers.get("accept-encoding")
+        if request.method == "GET":
+            if if_none_match:
+                metadata = await self.cache_manager.get_cached_metadata(request, is_public=is_public)
+                if metadata is not None and etag_matches(if_none_match, metadata.etag):
+                    await self._on_cache_hit(request, metadata)
+                    await self.cache_manager.build_not_modified(metadata.etag)(scope, receive, send)
+                    return
+
+            entry = await self.cache_manager.get_cached_entry(request, is_public=is_public)
+            if entry is not None:
+                await self._on_cache_hit(request, entry)
+                await self.cache_manager.build_response(entry, accept_encoding)(scope, receive, send)
+                return
 
         # 3. Determine cache-write eligibility before forwarding.
         #    Cache only when the response is identical for the caller:
@@ -61,30 +129,180 @@ class GatewayRequestMiddleware:
             "Authorization" in request.headers
             or request.cookies.get("access_token") is not None
         )
-        should_cache = request.method == "GET" and (is_public or not is_authenticated)
+        #    Paths the route policy keeps out of the cache (e.g. media, which has its own
+        #    disk cache) stream straight through instead of being held back.
+        should_cache = (
+            request.method == "GET"
+            and (is_public or not is_authenticated)
+            and self.cache_manager.route_policy(request).cacheable
+        )
+
+        if should_cache:
+            cache_metrics_helper.record_lookup("miss", self.cache_manager.namespace_for(request.url.path))
+            cache_key = await self.cache_manager.get_cache_key(request)
+            if not cache_key:
+                await self._forward_and_cache(request, app, send, if_none_match)
+                return
+            response = await self.coalescer.coalesce(
+                cache_key,
+                fill=lambda: self._forward_and_cache(request, app, send, if_none_match),
+                lookup=lambda: self.cache_manager.get_cached_entry(request, is_public=is_public),
+                accept_encoding=accept_encoding,
+            )
+            if response is not None:
+                # Served from an entry another request filled.
+                etag = response.headers.get("etag")
+                if if_none_match and response.status_code == 200 and etag_matches(if_none_match, etag):
+                    response = self.cache_manager.build_not_modified(etag)
+                await response(scope, receive, send)
+            return
 
         # 4. Forward to downstream microservice.
-        response: Response = await call_next(request)
-
-
-        # 5. Post-response cache handling.
-        if 200 <= response.status_code < 300:
-            if should_cache:
-                # Consume the streaming body iterator (can only be read once).
-                body = b"".join([chunk async for chunk in response.body_iterator])
-                ttl = self.cache_manager.get_cache_ttl(request.url.path)
-                await self.cache_manager.cache_response(request, body, response.status_code, ttl=ttl)
-                # Reconstruct a plain Response since body_iterator is now exhausted.
-                response = Response(
-                    content=body,
-                    status_code=response.status_code,
-                    headers=dict(response.headers),
-                    media_type=response.media_type,
-                    background=response.background,
-                )
-            elif request.method in ("POST", "PUT", "PATCH", "DELETE"):
-                namespaces = self.cache_manager.get_invalidation_namespaces(request.url.path)
-                for namespace in namespaces:
-                    await self.cache_manager.invalidate_namespace(namespace)
-
-        return response
+        context, send = bind_request_context(scope, send)
+        await app(scope, receive, send)
+
+        # 5. Post-response cache invalidation.
+        status_code = context.status_code
+        if (
+            status_code is not None
+            and 200 <= status_code < 300
+            and request.method in ("POST", "PUT", "PATCH", "DELETE")
+        ):
+            for namespace in self.cache_manager.route_policy(request).invalidation_namespaces:
+                await self.cache_manager.invalidate_namespace(namespace)
+
+    async def _on_cache_hit(self, request: Request, entry: CachedResponse | CacheEntryMetadata) -> None:
+        """Count a cache hit and, when the entry is stale, schedule its background refresh."""
+        namespace = self.cache_manager.namespace_for(request.url.path)
+        if self.cache_manager.is_fresh(entry, request.url.path, self.cache_manager.route_policy(request)):
+            cache_metrics_helper.record_lookup("hit", namespace)
+            return
+        cache_metrics_helper.record_lookup("stale", namespace)
+        cache_key = await self.cache_manager.get_cache_key(request)
+        if cache_key:
+            self.coalescer.schedule_revalidation(cache_key, lambda: self._refresh(request))
+
+    async def _forward_and_cache(
+        self,
+        request: Request,
+        app: ASGIApp,
+        send: Send,
+        if_none_match: str | None = None,
+    ) -> CachedResponse | None:
+        """
+        Forward a cacheable GET, answer it through *send* and, on 2xx, store its body.
+        Returns the stored entry.
+
+        Only cacheable responses are held back: non-2xx, content-encoded and oversized
+        bodies stream straight through. A body that turns out to be larger than
+        max_cacheable_bytes part-way through is flushed from what was read so far and
+        streams on from there. A held-back response goes out once stored, tagged with
+        the entry's ETag, or as 304 when that matches *if_none_match*. When the entry
+        has a variant in a coding the client accepts, that variant is sent instead.
+        """
+        start: Message | None = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def flush() -> None:
+            nonlocal passthrough
+            passthrough = True
+            if start is not None:
+                await send(start)
+
+        async def capture(message: Message) -> None:
+            nonlocal start, size
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_length = headers.get("content-length")
+                start = message
+                if (
+                    not 200 <= message["status"] < 300
+                    or headers.get("content-encoding")
+                    or (content_length is not None and int(content_length) > self.max_cacheable_bytes)
+                ):
+                    await flush()
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+                if size > self.max_cacheable_bytes:
+                    await flush()
+                    await send({**message, "body": b"".join(chunks)})
+                    chunks.clear()
+            else:
+                await flush()
+                if chunks:
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                    chunks.clear()
+                await send(message)
+
+        await app(request.scope, request.receive, capture)
+        if passthrough or start is None:
+            return None
+
+        body = b"".join(chunks)
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        policy = self.cache_manager.route_policy(request)
+        content_type = headers.get("content-type")
+        entry = await self.cache_manager.cache_response(
+            request,
+            body,
+            start["status"],
+            ttl=policy.ttl,
+            content_type=content_type,
+            stale_ttl=policy.stale_ttl,
+            encodings=self._encodings_for(body, content_type),
+        )
+        if entry is not None:
+            # Same validator a later cache hit will carry.
+            headers["etag"] = entry.etag
+        etag = headers.get("etag")
+        if if_none_match and start["status"] == 200 and etag_matches(if_none_match, etag):
+            await self.cache_manager.build_not_modified(etag)(request.scope, request.receive, send)
+            return entry
+
+        if entry is not None and entry.encoded:
+            headers.add_vary_header("Accept-Encoding")
+            encoding = negotiate_encoding(request.headers.get("accept-encoding"), tuple(entry.encoded))
+            if encoding is not None:
+                body = entry.encoded[encoding]
+                headers["content-encoding"] = encoding
+                headers["etag"] = f"W/{entry.etag}"
+
+        headers["content-length"] = str(len(body))
+        await send({**start, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+        return entry
+
+    def _encodings_for(self, body: bytes, content_type: str | None) -> tuple[str, ...]:
+        """Content codings to store *body* in besides identity: none for small or already-compressed media."""
+        if len(body) < self.compression_min_bytes or not is_compressible(content_type):
+            return ()
+        return self.compression_encodings
+
+    async def _refresh(self, request: Request) -> bool:
+        """
+        Re-run *request* through the app with the revalidate flag set, so it is
+        forwarded upstream and re-cached. Returns True when upstream answered 2xx.
+        """
+        scope = {key: request.scope[key] for key in self._REVALIDATE_SCOPE_KEYS if key in request.scope}
+        scope["headers"] = [
+            (name, value) for name, value in request.scope["headers"]
+            if name not in self._CONDITIONAL_HEADERS
+        ]
+        scope[self._REVALIDATE_SCOPE_KEY] = True
+        status_code = 500
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+        await request.app(scope, receive, send)
+        return 200 <= status_code < 300
@@ -0,0 +1,98 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from shared.utils.compression import StreamEncoder, is_compressible, negotiate_encoding
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI layer that compresses responses in the coding the client prefers
+    (Accept-Encoding), streaming them through an incremental encoder.
+
+    Responses that already carry a Content-Encoding (e.g. cache hits answered with
+    a pre-compressed variant), byte ranges, non-compressible media types, bodies
+    smaller than minimum_size and files sent by path (http.response.pathsend) are
+    passed through untouched.
+    """
+
+    # Statuses whose responses have no body to compress.
+    _NO_BODY_STATUSES: frozenset[int] = frozenset({204, 304})
+
+    def __init__(self, app: ASGIApp, encodings: tuple[str, ...], minimum_size: int = 1024) -> None:
+        self.app: ASGIApp = app
+        self.encodings: tuple[str, ...] = encodings
+        self.minimum_size: int = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: StreamEncoder | None = None
+        passthrough = False
+
+        async def compress_send(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                content_length = headers.get("content-length")
+                if (
+                    message["status"] in self._NO_BODY_STATUSES
+                    or headers.get("content-encoding")
+                    # Content-Range offsets describe the identity body.
+                    or headers.get("content-range")
+                    or not is_compressible(headers.get("content-type"))
+                    or (content_length is not None and int(content_length) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it is worth compressing.
+                    start = message
+            elif message["type"] == "http.response.pathsend" and start is not None:
+                passthrough = True
+                await send(start)
+                await send(message)
+            elif message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if encoder is None:
+                    if not more_body and len(body) < self.minimum_size:
+                        passthrough = True
+                        await send(start)
+                        await send(message)
+                        return
+                    encoder = StreamEncoder(encoding)
+                    headers = MutableHeaders(raw=list(start.get("headers", [])))
+                    del headers["content-length"]
+                    headers["content-encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        # Same content, different bytes: only a weak validator still holds.
+                        headers["etag"] = f"W/{etag}"
+                    if not more_body:
+                        compressed = encoder.compress(body) + encoder.finish()
+                        headers["content-length"] = str(len(compressed))
+                        await send({**start, "headers": headers.raw})
+                        await send({"type": "http.response.body", "body": compressed, "more_body": False})
+                        return
+                    await send({**start, "headers": headers.raw})
+
+                data = encoder.compress(body)
+                if not more_body:
+                    data += encoder.finish()
+                if data or not more_body:
+                    await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            else:
+                await send(message)
+
+        await self.app(scope, receive, compress_send)
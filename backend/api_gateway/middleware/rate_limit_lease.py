@@ -0,0 +1,120 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from logging import Logger
+from math import ceil
+from time import monotonic
+
+from fastapi import Request
+
+from shared.exceptions.base_exceptions import RateLimitExceededError
+from shared.managers.ratelimit_manager import RateLimitManager
+
+
+@dataclass(slots=True)
+class _Lease:
+    tokens: int = 0
+    expires_at: float = 0.0
+    denied_until: float = 0.0
+    failed: bool = False
+    refill: asyncio.Task[None] | None = None
+
+
+class LeasedRateLimiter:
+    """
+    Per-worker pre-admission for loose, cluster-wide rate limits.
+
+    Each worker claims tokens from the Redis GCRA limit (RateLimitManager.claim_tokens)
+    in batches and admits requests from that local lease without a Redis round trip.
+    The lease is topped up in the background once it runs low; only a request that
+    finds it empty waits for Redis. A denial from Redis is remembered until its
+    Retry-After, so denied clients do not reach Redis either.
+
+    Leased tokens are already counted in Redis, so the cluster-wide limit holds; a
+    worker can at most under-admit by the unused part of its lease, which is dropped
+    after one period. Redis errors fail open, like RateLimitManager.is_rate_limited.
+    """
+
+    # Refill in the background once the lease drops to this fraction of a batch.
+    _REFILL_FRACTION: float = 0.25
+    # Batches never exceed this fraction of the limit, so small limits stay accurate.
+    _MAX_LIMIT_FRACTION: int = 100
+
+    def __init__(
+        self,
+        rate_limit_manager: RateLimitManager,
+        logger: Logger,
+        lease_size: int = 100,
+        max_keys: int = 10_000,
+    ) -> None:
+        self.rate_limit_manager: RateLimitManager = rate_limit_manager
+        self.logger: Logger = logger
+        self.lease_size: int = lease_size
+        self.max_keys: int = max_keys
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+
+    async def is_rate_limited(self, request: Request, times: int, seconds: int) -> bool:
+        """Admit from the local lease; raises RateLimitExceededError when the cluster-wide limit is used up."""
+        key = self.rate_limit_manager.generate_rate_limit_key(request)
+        lease = self._get_lease(key)
+        batch = min(self.lease_size, max(1, times // self._MAX_LIMIT_FRACTION))
+
+        while True:
+            now = monotonic()
+            if lease.denied_until > now:
+                raise RateLimitExceededError(
+                    client_ip=self.rate_limit_manager.get_client_ip(request),
+                    retry_after=max(1, ceil(lease.denied_until - now)),
+                )
+            if lease.expires_at <= now:
+                lease.tokens = 0
+            if lease.tokens > 0:
+                lease.tokens -= 1
+                if lease.tokens <= batch * self._REFILL_FRACTION:
+                    self._start_refill(key, lease, times, seconds, batch)
+                return False
+            if lease.failed:
+                lease.failed = False
+                return False  # fail-open
+
+            # Lease is empty: wait for Redis (joining a refill already in flight).
+            await asyncio.shield(self._start_refill(key, lease, times, seconds, batch))
+
+    def _get_lease(self, key: str) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is not None:
+            self._leases.move_to_end(key)
+            return lease
+        lease = _Lease()
+        self._leases[key] = lease
+        if len(self._leases) > self.max_keys:
+            self._leases.popitem(last=False)
+        return lease
+
+    def _start_refill(self, key: str, lease: _Lease, times: int, seconds: int, batch: int) -> asyncio.Task[None]:
+        if lease.refill is None:
+            lease.refill = asyncio.create_task(self._refill(key, lease, times, seconds, batch))
+        return lease.refill
+
+    async def _refill(self, key: str, lease: _Lease, times: int, seconds: int, batch: int) -> None:
+        try:
+            granted, retry_after = await self.rate_limit_manager.claim_tokens(
+                key, times=times, seconds=seconds, count=batch,
+            )
+        except Exception as e:
+            self.logger.error(f"Rate limit lease refill failed: {str(e)}")
+            lease.failed = True
+            return
+        finally:
+            lease.refill = None
+
+        now = monotonic()
+        if granted:
+            if lease.expires_at <= now:
+                lease.tokens = 0
+            lease.tokens += granted
+            lease.expires_at = now + seconds
+            lease.denied_until = 0.0
+        elif lease.tokens == 0:
+            self.logger.warning(f"Rate limit exceeded for: {key}")
+            lease.denied_until = now + retry_after
@@ -0,0 +1,157 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from logging import Logger
+from time import monotonic
+from uuid import uuid4
+
+from fastapi import Response
+
+from helpers.cache_helper import cache_metrics_helper
+from shared.managers.cache_manager import CacheManager
+from shared.utils.cache_entry import CachedResponse
+
+
+# A fill forwards the request upstream, answers its own caller and returns the cache
+# entry it stored (None when the response was not cacheable).
+FillCallable = Callable[[], Awaitable[CachedResponse | None]]
+LookupCallable = Callable[[], Awaitable[CachedResponse | None]]
+# A refresh re-fetches a stale entry from upstream and reports whether it succeeded.
+RefreshCallable = Callable[[], Awaitable[bool]]
+
+
+class RequestCoalescer:
+    """
+    Single-flight coalescing for cache misses.
+
+    Within a worker, concurrent misses on the same cache key await one in-flight
+    upstream call. Across workers, a short Redis lock elects one filler; the other
+    workers poll the cache until the entry appears or the wait deadline passes,
+    after which they forward the request themselves.
+
+    Stale entries are refreshed in the background under the same lock, at most once
+    per key at a time. After a failed refresh the key is left alone for a short
+    backoff, and its stale entry keeps being served until it expires.
+    """
+
+    _POLL_INTERVAL_SECONDS: float = 0.05
+    _REVALIDATE_BACKOFF_SECONDS: float = 5.0
+
+    def __init__(
+        self,
+        cache_manager: CacheManager,
+        logger: Logger,
+        lock_ttl_ms: int,
+        wait_timeout_seconds: float,
+    ) -> None:
+        self.cache_manager: CacheManager = cache_manager
+        self.logger: Logger = logger
+        self.lock_ttl_ms: int = lock_ttl_ms
+        self.wait_timeout_seconds: float = wait_timeout_seconds
+        self._inflight: dict[str, asyncio.Future[CachedResponse | None]] = {}
+        self._revalidating: dict[str, asyncio.Task[None]] = {}
+        self._revalidate_after: dict[str, float] = {}
+
+    async def coalesce(
+        self,
+        cache_key: str,
+        fill: FillCallable,
+        lookup: LookupCallable,
+        accept_encoding: str | None = None,
+    ) -> Response | None:
+        """
+        Answer a miss on *cache_key*, sharing one upstream call between concurrent misses.
+
+        Returns the response to send when it was built from an entry another request
+        filled (in the content coding *accept_encoding* asks for), or None when the
+        caller's own fill has already answered it.
+        """
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return await self._follow(cache_key, inflight, fill, accept_encoding)
+
+        future: asyncio.Future[CachedResponse | None] = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        token = uuid4().hex
+        lock_acquired = False
+        try:
+            lock_acquired = await self.cache_manager.acquire_fill_lock(cache_key, token, self.lock_ttl_ms)
+            if not lock_acquired:
+                entry = await self._wait_for_remote_fill(lookup)
+                if entry is not None:
+                    future.set_result(entry)
+                    return self.cache_manager.build_response(entry, accept_encoding)
+                self.logger.warning(f"Timed out waiting for another worker to fill {cache_key}; forwarding directly")
+
+            entry = await fill()
+            future.set_result(entry)
+            return None
+        finally:
+            if not future.done():
+                # The fill failed — release followers so they forward on their own.
+                future.set_result(None)
+            self._inflight.pop(cache_key, None)
+            if lock_acquired:
+                await self.cache_manager.release_fill_lock(cache_key, token)
+
+    async def _follow(
+        self,
+        cache_key: str,
+        inflight: asyncio.Future[CachedResponse | None],
+        fill: FillCallable,
+        accept_encoding: str | None = None,
+    ) -> Response | None:
+        """Wait for the in-flight fill of *cache_key*; forward directly if it fails or runs too long."""
+        try:
+            entry = await asyncio.wait_for(asyncio.shield(inflight), timeout=self.wait_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Timed out waiting for in-flight fill of {cache_key}; forwarding directly")
+            entry = None
+
+        if entry is not None:
+            return self.cache_manager.build_response(entry, accept_encoding)
+        await fill()
+        return None
+
+    async def _wait_for_remote_fill(self, lookup: LookupCallable) -> CachedResponse | None:
+        """Poll the cache until another worker has stored the entry or the deadline passes."""
+        deadline = monotonic() + self.wait_timeout_seconds
+        while monotonic() < deadline:
+            await asyncio.sleep(self._POLL_INTERVAL_SECONDS)
+            entry = await lookup()
+            if entry is not None:
+                return entry
+        return None
+
+    def schedule_revalidation(self, cache_key: str, refresh: RefreshCallable) -> None:
+        """Refresh a stale *cache_key* in the background unless a refresh is running or backing off."""
+        if cache_key in self._revalidating:
+            return
+        retry_at = self._revalidate_after.get(cache_key)
+        if retry_at is not None:
+            if monotonic() < retry_at:
+                return
+            del self._revalidate_after[cache_key]
+
+        task = asyncio.create_task(self._revalidate(cache_key, refresh))
+        self._revalidating[cache_key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(cache_key, None))
+
+    async def _revalidate(self, cache_key: str, refresh: RefreshCallable) -> None:
+        token = uuid4().hex
+        if not await self.cache_manager.acquire_fill_lock(cache_key, token, self.lock_ttl_ms):
+            # Another worker is already filling or refreshing this key.
+            return
+        try:
+            refreshed = await refresh()
+        except Exception as e:
+            self.logger.error(f"Background refresh of {cache_key} failed: {str(e)}")
+            refreshed = False
+        finally:
+            await self.cache_manager.release_fill_lock(cache_key, token)
+
+        if refreshed:
+            cache_metrics_helper.record_revalidation("success")
+            return
+        cache_metrics_helper.record_revalidation("error")
+        self.logger.warning(f"Serving stale {cache_key} until upstream recovers")
+        self._revalidate_after[cache_key] = monotonic() + self._REVALIDATE_BACKOFF_SECONDS
@@ -10,13 +10,20 @@ from typing import Any
 from fastapi import Request
 
 from gateway.apigateway import ApiGateway
-from middleware.auth_middleware import AuthMiddleware
+from gateway.batch import BatchDispatcher
+from gateway.media import MediaDiskCache, MediaProxy
+from helpers.cache_helper import cache_metrics_helper
+from middleware.auth_middleware import AuthMiddleware, build_public_endpoints
 from middleware.cache_middleware import GatewayRequestMiddleware
+from middleware.rate_limit_lease import LeasedRateLimiter
+from middleware.request_coalescer import RequestCoalescer
 from shared.managers.cache_manager import CacheManager
+from shared.managers.local_cache import LocalResponseCache
 from shared.managers.logger_manager import setup_logger
 from shared.managers.ratelimit_manager import RateLimitManager
 from shared.managers.token_manager import TokenManager
 from shared.settings import Settings, get_settings
+from shared.utils.compression import supported_encodings
 
 
 settings: Settings = get_settings()
@@ -32,6 +39,8 @@ class ApiGatewayResources:
     gateway: ApiGateway
     auth: AuthMiddleware
     request_middleware: GatewayRequestMiddleware
+    batch: BatchDispatcher
+    media: MediaProxy
 
 
 def create_api_gateway_resources(
@@ -39,11 +48,25 @@ def create_api_gateway_resources(
     app_logger: Logger = logger,
 ) -> ApiGatewayResources:
     """Construct resources owned by one API-gateway ASGI process."""
+    api_version = app_settings.API_GATEWAY_SERVICE_URL_API_VERSION
+    # One compiled route table answers auth, cache and invalidation questions per request.
+    route_matcher = CacheManager.build_route_matcher(
+        api_version,
+        public_endpoints=build_public_endpoints(api_version),
+    )
     cache = CacheManager(
         service_prefix="api-gateway",
         redis_url=app_settings.APIGATEWAY_SERVICE_REDIS_URL,
         logger=app_logger,
-        service_api_version=app_settings.API_GATEWAY_SERVICE_URL_API_VERSION,
+        service_api_version=api_version,
+        route_matcher=route_matcher,
+        local_cache=LocalResponseCache(
+            max_bytes=app_settings.API_GATEWAY_LOCAL_CACHE_MAX_BYTES,
+            max_entry_bytes=app_settings.API_GATEWAY_LOCAL_CACHE_MAX_ENTRY_BYTES,
+        ),
+        param_cardinality_cap=app_settings.API_GATEWAY_CACHE_PARAM_CARDINALITY_CAP,
+        cardinality_refresh_seconds=app_settings.API_GATEWAY_CACHE_CARDINALITY_REFRESH_SECONDS,
+        on_cardinality=cache_metrics_helper.record_key_cardinality,
     )
     rate_limiter = RateLimitManager(
         service_prefix="api-gateway",
@@ -54,7 +77,12 @@ def create_api_gateway_resources(
     auth = AuthMiddleware(
         settings=app_settings,
         logger=app_logger,
-        token_manager=TokenManager(settings=app_settings),
+        token_manager=TokenManager(
+            settings=app_settings,
+            verified_cache_size=app_settings.JWT_VERIFIED_CACHE_SIZE,
+            backend=app_settings.JWT_BACKEND,
+        ),
+        route_matcher=route_matcher,
     )
     return ApiGatewayResources(
         settings=app_settings,
@@ -65,7 +93,42 @@ def create_api_gateway_resources(
         auth=auth,
         request_middleware=GatewayRequestMiddleware(
             cache_manager=cache,
-            rate_limit_manager=rate_limiter,
+            rate_limiter=LeasedRateLimiter(
+                rate_limit_manager=rate_limiter,
+                logger=app_logger,
+                lease_size=app_settings.API_GATEWAY_RATE_LIMIT_LEASE_SIZE,
+                max_keys=app_settings.API_GATEWAY_RATE_LIMIT_LEASE_MAX_KEYS,
+            ),
+            coalescer=RequestCoalescer(
+                cache_manager=cache,
+                logger=app_logger,
+                lock_ttl_ms=app_settings.API_GATEWAY_COALESCE_LOCK_TTL_MS,
+                wait_timeout_seconds=app_settings.API_GATEWAY_COALESCE_WAIT_SECONDS,
+            ),
+            max_cacheable_bytes=app_settings.API_GATEWAY_CACHE_MAX_BODY_BYTES,
+            compression_encodings=supported_encodings(app_settings.API_GATEWAY_COMPRESSION_ENCODINGS),
+            compression_min_bytes=app_settings.API_GATEWAY_COMPRESSION_MIN_BYTES,
+        ),
+        batch=BatchDispatcher(
+            gateway=gateway,
+            cache_manager=cache,
+            auth=auth,
+            rate_limiter=rate_limiter,
+            logger=app_logger,
+            api_version=api_version,
+            max_requests=app_settings.API_GATEWAY_BATCH_MAX_REQUESTS,
+            timeout_seconds=app_settings.API_GATEWAY_BATCH_TIMEOUT_SECONDS,
+        ),
+        media=MediaProxy(
+            gateway=gateway,
+            cache=MediaDiskCache(
+                directory=app_settings.API_GATEWAY_MEDIA_CACHE_DIR,
+                max_bytes=app_settings.API_GATEWAY_MEDIA_CACHE_MAX_BYTES,
+                max_entry_bytes=app_settings.API_GATEWAY_MEDIA_CACHE_MAX_ENTRY_BYTES,
+                revalidate_seconds=app_settings.API_GATEWAY_MEDIA_CACHE_REVALIDATE_SECONDS,
+            ),
+            logger=app_logger,
+            upstream_url=app_settings.PRODUCT_SERVICE_URL,
         ),
     )
 
@@ -80,6 +143,7 @@ async def api_gateway_runtime(
         await stack.enter_async_context(resources.cache)
         await stack.enter_async_context(resources.rate_limiter)
         await stack.enter_async_context(resources.gateway)
+        await stack.enter_async_context(resources.media)
         yield resources
 
 
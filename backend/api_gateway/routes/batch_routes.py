@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Request, Response
+
+from resources import get_api_gateway_resources
+from schemas.batch_schemas import BatchRequest
+
+
+batch_proxy = APIRouter(tags=["Batch"])
+
+
+@batch_proxy.post("/batch", summary="Run several GET requests in one round trip")
+async def batch(request: Request, payload: BatchRequest) -> Response:
+    """
+    PUBLIC - Each sub-request is authorized on its own, against the caller's token.
+
+    Body: {"requests": [{"id": "product", "path": "/api/v1/products/{id}/detailed"}, ...]}
+    Returns {"responses": [{"id", "status", "cached", "body"}, ...]} in request order.
+    """
+    return await get_api_gateway_resources(request).batch.dispatch(request, payload.requests)
@@ -32,6 +32,22 @@ async def get_all_products_detailed(request: Request):
         request=request,
     )
 
+@product_proxy.get("/products/page", summary="Get one keyset page of products")
+async def get_products_page(request: Request):
+    """PUBLIC - Cursor-paginated product browsing (follow next_cursor)"""
+    return await api_gateway_manager.forward_request(
+        service_name="product-service",
+        request=request,
+    )
+
+@product_proxy.get("/products/detailed/page", summary="Get one keyset page of products with details")
+async def get_products_page_detailed(request: Request):
+    """PUBLIC - Cursor-paginated product browsing with details"""
+    return await api_gateway_manager.forward_request(
+        service_name="product-service",
+        request=request,
+    )
+
 @product_proxy.get("/products/{product_id}", summary="Get product by ID")
 async def get_product_by_id(request: Request,
                             product_id: UUID):
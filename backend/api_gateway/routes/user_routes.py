@@ -38,6 +38,7 @@ async def login_user(request: Request, response: Response) -> JSONResponse:
     upstream = await api_gateway_manager.forward_request(
         request=request,
         service_name=Services.USER_SERVICE,
+        stream=False,
     )
     if upstream.status_code == 200:
         body: dict[str, str] = loads(upstream.body)
@@ -66,6 +67,7 @@ async def google_login(request: Request, response: Response) -> JSONResponse:
     upstream = await api_gateway_manager.forward_request(
         request=request,
         service_name=Services.USER_SERVICE,
+        stream=False,
     )
     if upstream.status_code == 200:
         body: dict[str, str] = loads(upstream.body)
@@ -101,6 +103,7 @@ async def refresh_token(request: Request, response: Response) -> JSONResponse:
         request=request,
         service_name=Services.USER_SERVICE,
         override_body={AuthCookies.REFRESH_COOKIE: refresh},
+        stream=False,
     )
     if upstream.status_code == 200:
         body = loads(upstream.body)
@@ -127,6 +130,7 @@ async def logout(request: Request, response: Response) -> JSONResponse:
             request=request,
             service_name=Services.USER_SERVICE,
             override_body={"refresh_token": refresh},
+            stream=False,
         )
     return JSONResponse(content={"detail": "Logged out successfully"}, status_code=200)
 
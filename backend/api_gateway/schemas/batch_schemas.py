@@ -0,0 +1,24 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class BatchSubRequest(BaseModel):
+    # Echoed back on the matching sub-response.
+    id: str = Field(min_length=1, max_length=64)
+    method: Literal["GET"] = "GET"
+    # Gateway path, including the API version and an optional query string.
+    path: str = Field(min_length=1, max_length=2048, pattern=r"^/")
+    # Per-sub-request upstream timeout; the gateway default applies when omitted.
+    timeout: float | None = Field(default=None, gt=0, le=30)
+
+
+class BatchRequest(BaseModel):
+    requests: list[BatchSubRequest] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def validate_unique_ids(self):
+        ids = [sub_request.id for sub_request in self.requests]
+        if len(ids) != len(set(ids)):
+            raise ValueError("sub-request ids must be unique")
+        return self
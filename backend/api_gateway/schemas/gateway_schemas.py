@@ -6,6 +6,7 @@ class ServiceConfig(BaseModel):
     instances: list[str]
     health_check_path: str
     api_version: str
+    srv_record: str | None = None
 
 
 class GatewayConfig(BaseModel):
@@ -0,0 +1,20 @@
+"""ASGI test helpers shared by the api_gateway unit tests."""
+from starlette.datastructures import Headers
+
+
+class SentMessages(list):
+    """Collects the ASGI messages sent for one response."""
+    async def __call__(self, message: dict) -> None:
+        self.append(message)
+
+    @property
+    def status(self) -> int:
+        return next(message["status"] for message in self if message["type"] == "http.response.start")
+
+    @property
+    def headers(self) -> Headers:
+        return Headers(raw=next(message["headers"] for message in self if message["type"] == "http.response.start"))
+
+    @property
+    def body(self) -> bytes:
+        return b"".join(message.get("body", b"") for message in self if message["type"] == "http.response.body")
@@ -5,7 +5,7 @@ Strategy:
   - No database — api_gateway is a pure proxy service.
   - The lifespan (Redis + httpx client init) is replaced with a no-op.
   - the app-owned auth middleware is patched to inject a mock user (bypass JWT validation).
-  - All CacheManager and RateLimitManager async methods (rate-limiter, cache) are patched to no-ops.
+  - All CacheManager, RateLimitManager and LeasedRateLimiter async methods (rate-limiter, cache) are patched to no-ops.
   - api_gateway_manager.forward_request is patched per-test via the `mock_forward` fixture.
 """
 from collections.abc import AsyncGenerator
@@ -118,16 +118,18 @@ def _make_client(current_user: CurrentUserInfo, mock_forward: AsyncMock, mock_se
     resources = create_api_gateway_resources()
     app.state.resources = resources
 
-    async def _bypass_auth(request, call_next):
-        """Auth middleware replacement: injects current_user and passes through."""
+    async def _bypass_auth(request):
+        """Auth guard replacement: injects current_user and passes through."""
         request.state.current_user = current_user
-        return await call_next(request)
+        return None
 
     patches = [
-        patch.object(resources.auth, "middleware", side_effect=_bypass_auth),
+        patch.object(resources.auth, "authenticate", side_effect=_bypass_auth),
         patch.object(resources.rate_limiter, "is_rate_limited", new=AsyncMock(return_value=False)),
-        patch.object(resources.cache, "get_cached_response", new=AsyncMock(return_value=None)),
-        patch.object(resources.cache, "cache_response", new=AsyncMock()),
+        patch.object(resources.request_middleware.rate_limiter, "is_rate_limited", new=AsyncMock(return_value=False)),
+        patch.object(resources.cache, "get_cached_entry", new=AsyncMock(return_value=None)),
+        patch.object(resources.cache, "get_cache_key", new=AsyncMock(return_value=None)),
+        patch.object(resources.cache, "cache_response", new=AsyncMock(return_value=None)),
         patch.object(resources.cache, "invalidate_namespace", new=AsyncMock()),
         patch.object(api_gateway_manager, "forward_request", mock_forward),
         patch.object(api_gateway_manager, "request_service", mock_service_request),
@@ -2,16 +2,29 @@
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
-from httpx import Response as HttpxResponse
+from httpx import ReadError, Response as HttpxResponse
+from starlette.requests import ClientDisconnect
 
 from gateway.apigateway import ApiGateway
 from resources import logger, settings
 
 
+# ASGI 2.4 scope: Starlette streams without a disconnect listener and re-raises body errors.
+_STREAM_SCOPE = {"type": "http", "asgi": {"spec_version": "2.4"}}
+
+
 def _make_gateway() -> ApiGateway:
     return ApiGateway(settings=settings, logger=logger)
 
 
+def _make_http_client(response: HttpxResponse | None = None, side_effect: Exception | None = None) -> MagicMock:
+    """An AsyncClient stand-in: build_request records its kwargs, send returns *response*."""
+    client = MagicMock()
+    client.build_request = MagicMock(side_effect=lambda **kwargs: kwargs)
+    client.send = AsyncMock(return_value=response, side_effect=side_effect)
+    return client
+
+
 class TestPrepareHeaders:
     def setup_method(self):
         self.gw = _make_gateway()
@@ -71,14 +84,98 @@ class TestForwardRequest:
         mock_response.json.return_value = {"items": []}
         mock_response.headers = {}
 
-        mock_http_client = AsyncMock()
-        mock_http_client.request = AsyncMock(return_value=mock_response)
+        mock_http_client = _make_http_client(mock_response)
 
         with patch.object(self.gw, "_http_client", mock_http_client):
             result = await self.gw.forward_request(request=req, service_name="product-service")
 
         assert result.status_code == 200
 
+    async def test_forward_passes_upstream_304_through(self):
+        req = self._make_mock_request("GET", "/api/v1/products")
+        req.headers = {"if-none-match": '"abc"'}
+
+        mock_response = MagicMock(spec=HttpxResponse)
+        mock_response.status_code = 304
+        mock_response.headers = {"etag": '"abc"', "content-length": "0"}
+
+        mock_http_client = _make_http_client(mock_response)
+
+        with patch.object(self.gw, "_http_client", mock_http_client):
+            result = await self.gw.forward_request(request=req, service_name="product-service")
+
+        assert result.status_code == 304
+        assert result.headers["etag"] == '"abc"'
+        assert mock_http_client.build_request.call_args.kwargs["headers"]["if-none-match"] == '"abc"'
+        mock_response.json.assert_not_called()
+
+    async def test_forward_streams_raw_upstream_bytes(self):
+        req = self._make_mock_request("GET", "/api/v1/products")
+        body = b'{"items":  [],"spacing":"kept"}'
+
+        async def chunks():
+            yield body[:10]
+            yield body[10:]
+
+        upstream = HttpxResponse(200, content=chunks(), headers={"content-type": "application/json", "x-upstream": "1"})
+        mock_http_client = _make_http_client(upstream)
+
+        with patch.object(self.gw, "_http_client", mock_http_client):
+            result = await self.gw.forward_request(request=req, service_name="product-service")
+
+        assert mock_http_client.send.call_args.kwargs["stream"] is True
+        assert result.headers["x-upstream"] == "1"
+        assert b"".join([chunk async for chunk in result.body_iterator]) == body
+
+    async def test_aborted_stream_closes_upstream_response(self):
+        req = self._make_mock_request("GET", "/api/v1/products")
+
+        async def chunks():
+            yield b'{"items": ['
+            raise ReadError("upstream went away")
+
+        upstream = HttpxResponse(200, content=chunks())
+        with patch.object(self.gw, "_http_client", _make_http_client(upstream)):
+            result = await self.gw.forward_request(request=req, service_name="product-service")
+
+        with pytest.raises(ReadError):
+            await result(_STREAM_SCOPE, AsyncMock(), AsyncMock())
+        assert upstream.is_closed
+
+    @pytest.mark.parametrize("abort", ["upstream_read_error", "client_disconnect"])
+    async def test_aborted_stream_frees_bulkhead_pool_and_balancer_slots(self, abort):
+        req = self._make_mock_request("GET", "/api/v1/products")
+
+        async def chunks():
+            yield b'{"items": ['
+            if abort == "upstream_read_error":
+                raise ReadError("upstream went away")
+            yield b"]}"
+
+        send = AsyncMock()
+        if abort == "client_disconnect":
+            send.side_effect = [None, OSError("client went away")]
+        with patch.object(self.gw, "_http_client", _make_http_client(HttpxResponse(200, content=chunks()))):
+            result = await self.gw.forward_request(request=req, service_name="product-service")
+        assert self.gw.bulkheads["product-service"].in_use == 1
+
+        with pytest.raises((ReadError, ClientDisconnect)):
+            await result(_STREAM_SCOPE, AsyncMock(), send)
+
+        assert self.gw.bulkheads["product-service"].in_use == 0
+        assert self.gw.pools["product-service"].in_use == 0
+        assert all(instance.inflight == 0 for instance in self.gw.load_balancer.instances("product-service"))
+
+    async def test_forward_without_stream_returns_buffered_body(self):
+        req = self._make_mock_request("POST", "/api/v1/login")
+        upstream = HttpxResponse(200, content=b'{"access_token":"a"}', headers={"content-type": "application/json"})
+
+        with patch.object(self.gw, "_http_client", _make_http_client(upstream)):
+            result = await self.gw.forward_request(request=req, service_name="user-service", stream=False)
+
+        assert result.body == b'{"access_token":"a"}'
+        assert result.headers["content-length"] == str(len(result.body))
+
     async def test_forward_unknown_service_raises_404(self):
         from fastapi import HTTPException
         req = self._make_mock_request("GET", "/api/v1/unknown")
@@ -94,8 +191,7 @@ class TestForwardRequest:
 
         req = self._make_mock_request("GET", "/api/v1/products")
 
-        mock_http_client = AsyncMock()
-        mock_http_client.request = AsyncMock(side_effect=RequestError("connection refused"))
+        mock_http_client = _make_http_client(side_effect=RequestError("connection refused"))
 
         with patch.object(self.gw, "_http_client", mock_http_client):
             with pytest.raises(HTTPException) as exc_info:
@@ -111,8 +207,7 @@ class TestForwardRequest:
         mock_response.json.return_value = {"id": "order-123"}
         mock_response.headers = {}
 
-        mock_http_client = AsyncMock()
-        mock_http_client.request = AsyncMock(return_value=mock_response)
+        mock_http_client = _make_http_client(mock_response)
 
         override = {"user_id": "abc", "total": 50}
         with patch.object(self.gw, "_http_client", mock_http_client):
@@ -123,7 +218,7 @@ class TestForwardRequest:
             )
 
         assert result.status_code == 201
-        call_kwargs = mock_http_client.request.call_args.kwargs
+        call_kwargs = mock_http_client.build_request.call_args.kwargs
         assert call_kwargs["json"] == override
 
     async def test_image_generation_path_uses_standard_timeout(self):
@@ -138,13 +233,12 @@ class TestForwardRequest:
         mock_response.json.return_value = {"image_url": "/media/generated/test.png"}
         mock_response.headers = {}
 
-        mock_http_client = AsyncMock()
-        mock_http_client.request = AsyncMock(return_value=mock_response)
+        mock_http_client = _make_http_client(mock_response)
 
         with patch.object(self.gw, "_http_client", mock_http_client):
             await self.gw.forward_request(request=req, service_name="product-service")
 
-        call_kwargs = mock_http_client.request.call_args.kwargs
+        call_kwargs = mock_http_client.build_request.call_args.kwargs
         assert call_kwargs["timeout"] == self.gw._TIMEOUT
 
     async def test_regular_product_path_uses_default_timeout(self):
@@ -155,11 +249,141 @@ class TestForwardRequest:
         mock_response.json.return_value = {"items": []}
         mock_response.headers = {}
 
-        mock_http_client = AsyncMock()
-        mock_http_client.request = AsyncMock(return_value=mock_response)
+        mock_http_client = _make_http_client(mock_response)
 
         with patch.object(self.gw, "_http_client", mock_http_client):
             await self.gw.forward_request(request=req, service_name="product-service")
 
-        call_kwargs = mock_http_client.request.call_args.kwargs
+        call_kwargs = mock_http_client.build_request.call_args.kwargs
         assert call_kwargs["timeout"] == self.gw._TIMEOUT
+
+    async def test_upload_body_is_streamed_upstream_unparsed(self):
+        req = self._make_mock_request("POST", "/api/v1/products/upload")
+        content_type = "multipart/form-data; boundary=----abc"
+        req.headers = {"content-type": content_type, "content-length": "1234"}
+        req.form = AsyncMock()
+        req.json = AsyncMock()
+        body_stream = MagicMock()
+        req.stream = MagicMock(return_value=body_stream)
+
+        mock_response = MagicMock(spec=HttpxResponse)
+        mock_response.status_code = 201
+        mock_response.headers = {}
+        mock_http_client = _make_http_client(mock_response)
+
+        with patch.object(self.gw, "_http_client", mock_http_client):
+            await self.gw.forward_request(request=req, service_name="product-service")
+
+        call_kwargs = mock_http_client.build_request.call_args.kwargs
+        assert call_kwargs["content"] is body_stream
+        assert call_kwargs["headers"]["Content-Type"] == content_type
+        assert call_kwargs["headers"]["Content-Length"] == "1234"
+        req.form.assert_not_awaited()
+        req.json.assert_not_awaited()
+
+    async def test_login_body_is_still_parsed_for_username_mapping(self):
+        req = self._make_mock_request("POST", "/api/v1/login")
+        req.headers = {"content-type": "application/x-www-form-urlencoded"}
+        req.form = AsyncMock(return_value={"email": "a@b.c", "password": "pw"})
+        req.stream = MagicMock()
+
+        mock_response = MagicMock(spec=HttpxResponse)
+        mock_response.status_code = 200
+        mock_response.headers = {}
+        mock_http_client = _make_http_client(mock_response)
+
+        with patch.object(self.gw, "_http_client", mock_http_client):
+            await self.gw.forward_request(request=req, service_name="user-service")
+
+        call_kwargs = mock_http_client.build_request.call_args.kwargs
+        assert call_kwargs["data"] == {"username": "a@b.c", "password": "pw"}
+        req.stream.assert_not_called()
+
+    async def test_connect_error_is_reported_to_load_balancer(self):
+        from httpx import ConnectError
+        from fastapi import HTTPException
+
+        req = self._make_mock_request("GET", "/api/v1/products")
+        instance = self.gw.load_balancer.instances("product-service")[0]
+
+        with patch.object(self.gw, "_http_client", _make_http_client(side_effect=ConnectError("refused"))):
+            with pytest.raises(HTTPException):
+                await self.gw.forward_request(request=req, service_name="product-service")
+
+        assert instance.consecutive_failures == 1
+        assert instance.inflight == 0
+
+
+class TestUpstreamPools:
+    def setup_method(self):
+        self.gw = _make_gateway()
+
+    def test_pool_size_defaults_to_bulkhead_limit(self):
+        for service_name, pool in self.gw.pools.items():
+            assert pool.size == self.gw.bulkheads[service_name].max_concurrency
+
+    def test_pool_size_override(self):
+        custom = settings.model_copy(update={"API_GATEWAY_UPSTREAM_POOL_SIZES": {"product-service": 7}})
+        gw = ApiGateway(settings=custom, logger=logger)
+
+        assert gw.pools["product-service"].size == 7
+        assert gw.pools["user-service"].size == gw.bulkheads["user-service"].max_concurrency
+
+    async def test_startup_opens_one_client_per_service(self):
+        async with self.gw:
+            clients = {service_name: self.gw.client_for(service_name) for service_name in self.gw.pools}
+            assert len({id(client) for client in clients.values()}) == len(clients)
+            assert self.gw.client not in clients.values()
+
+        assert all(pool.client is None for pool in self.gw.pools.values())
+
+    async def test_forward_uses_the_service_pool(self):
+        req = TestForwardRequest()._make_mock_request("GET", "/api/v1/products")
+        shared = _make_http_client(HttpxResponse(500))
+        pooled = _make_http_client(HttpxResponse(200, content=b"{}"))
+        self.gw.pools["product-service"]._client = pooled
+
+        with patch.object(self.gw, "_http_client", shared):
+            result = await self.gw.forward_request(request=req, service_name="product-service", stream=False)
+
+        assert result.status_code == 200
+        shared.send.assert_not_called()
+        assert "trace" in pooled.build_request.call_args.kwargs["extensions"]
+
+    async def test_in_flight_requests_are_counted(self):
+        pool = self.gw.pools["product-service"]
+        seen: list[int] = []
+
+        async def request(**kwargs):
+            seen.append(pool.in_use)
+            return HttpxResponse(200)
+
+        client = MagicMock()
+        client.request = AsyncMock(side_effect=request)
+        pool._client = client
+
+        await self.gw.request_service("product-service", "/products")
+
+        assert seen == [1]
+        assert pool.in_use == 0
+        assert pool.peak_in_use == 1
+
+    async def test_trace_records_wait_and_new_connections(self):
+        pool = self.gw.pools["product-service"]
+        trace = pool.extensions()["trace"]
+
+        with patch("gateway.connection_pool.upstream_metrics_helper") as metrics:
+            await trace("connection.connect_tcp.started", {})
+            await trace("connection.connect_tcp.complete", {})
+            await trace("http11.send_request_headers.started", {})
+
+        metrics.record_pool_wait.assert_called_once()
+        metrics.record_connection_opened.assert_called_once_with("product-service")
+
+    def test_h2c_without_h2_falls_back_to_http1(self):
+        custom = settings.model_copy(update={"API_GATEWAY_UPSTREAM_H2C_SERVICES": ["product-service"]})
+
+        with patch("gateway.connection_pool.h2", None):
+            gw = ApiGateway(settings=custom, logger=logger)
+
+        assert gw.pools["product-service"].http2 is False
@@ -1,13 +1,14 @@
 """Unit tests for AuthMiddleware.is_public_endpoint and middleware logic."""
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock, patch
 
 import pytest
-from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException, Request
 from starlette.datastructures import MutableHeaders
 
+from dependencies.auth_dependencies import get_current_user
 from middleware.auth_middleware import AuthMiddleware
 from resources import settings
+from shared.contracts.auth import TokenClaims
 
 
 def _make_request(path: str, method: str, headers: dict | None = None, cookies: dict | None = None) -> MagicMock:
@@ -17,6 +18,7 @@ def _make_request(path: str, method: str, headers: dict | None = None, cookies:
     req.headers = MutableHeaders(headers=headers or {})
     req.cookies = cookies or {}
     req.state = MagicMock()
+    req.scope = {}
     return req
 
 
@@ -103,9 +105,50 @@ class TestIsPublicEndpoint:
     def test_admin_schema_users_get_is_public(self):
         assert self.mw.is_public_endpoint(f"{API}/admin/schema/users", "GET") is True
 
+    def test_prefix_match_is_segment_based(self):
+        assert self.mw.is_public_endpoint(f"{API}/productsx", "GET") is False
+
+    def test_activate_root_itself_is_not_public(self):
+        assert self.mw.is_public_endpoint(f"{API}/activate", "POST") is False
+        assert self.mw.is_public_endpoint(f"{API}/activate/some-token", "POST") is True
+
+
+class TestRoutePolicy:
+    """Tests for the compiled route table shared by auth and cache layers."""
+
+    def setup_method(self):
+        self.mw = AuthMiddleware(settings=settings, logger=MagicMock(), token_manager=MagicMock())
+
+    def test_most_specific_ttl_wins(self):
+        policy = self.mw.route_matcher.match(f"{API}/products/detailed")
+        assert (policy.ttl, policy.stale_ttl) == (600, 3600)
+
+    def test_wildcard_segment_matches_invalidation_namespaces(self):
+        policy = self.mw.route_matcher.match(f"{API}/3f2a/images")
+        assert set(policy.invalidation_namespaces) == {"images", "products"}
+
+    def test_generation_status_poll_is_not_cacheable(self):
+        policy = self.mw.route_matcher.match(f"{API}/images/generations/job-1/status")
+        assert policy.cacheable is False
+        assert policy.is_public("GET") is True
+
+    def test_unknown_path_uses_defaults(self):
+        policy = self.mw.route_matcher.match(f"{API}/unknown-route")
+        assert policy.public_methods == frozenset()
+        assert policy.cacheable is True
+        assert policy.invalidation_namespaces == ()
+
+    def test_policy_is_matched_once_per_request(self):
+        req = _make_request(f"{API}/products", "GET")
+        self.mw.route_matcher = MagicMock(wraps=self.mw.route_matcher)
+        first = self.mw.route_policy(req)
+        second = self.mw.route_policy(req)
+        assert first is second
+        self.mw.route_matcher.match.assert_called_once_with(f"{API}/products")
+
 
 class TestMiddlewareAuth:
-    """Tests for the middleware function: token extraction, validation, pass-through."""
+    """Tests for AuthMiddleware.authenticate: token extraction, validation, pass-through."""
 
     def setup_method(self):
         self.mw = AuthMiddleware.__new__(AuthMiddleware)
@@ -113,46 +156,39 @@ class TestMiddlewareAuth:
 
     async def test_options_request_passes_through(self):
         req = _make_request("/api/v1/users", "OPTIONS")
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
-        response = await self.mw.middleware(req, call_next)
+        response = await self.mw.authenticate(req)
 
-        call_next.assert_awaited_once_with(req)
-        assert response.status_code == 200
+        assert response is None
 
     async def test_public_endpoint_passes_through_without_token(self):
         req = _make_request(f"{API}/products", "GET")
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
-        response = await self.mw.middleware(req, call_next)
+        response = await self.mw.authenticate(req)
 
-        call_next.assert_awaited_once()
-        assert response.status_code == 200
+        assert response is None
 
     async def test_protected_endpoint_without_token_returns_401(self):
         req = _make_request(f"{API}/users/abc", "GET")
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
-        response = await self.mw.middleware(req, call_next)
+        response = await self.mw.authenticate(req)
 
         assert response.status_code == 401
-        call_next.assert_not_awaited()
 
     async def test_protected_endpoint_with_valid_bearer_token_passes(self):
         req = _make_request(
             f"{API}/users/abc", "GET",
             headers={"Authorization": "Bearer valid.jwt.token"},
         )
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
         mock_user = MagicMock()
         mock_user.email = "user@example.com"
 
         with patch.object(self.mw.token_manager, "decode_token", return_value=mock_user):
-            response = await self.mw.middleware(req, call_next)
+            response = await self.mw.authenticate(req)
 
-        call_next.assert_awaited_once()
-        assert response.status_code == 200
+        assert response is None
+        assert req.state.current_user is mock_user
 
     async def test_protected_endpoint_with_invalid_token_returns_401(self):
         from fastapi import HTTPException
@@ -160,30 +196,64 @@ class TestMiddlewareAuth:
             f"{API}/users/abc", "GET",
             headers={"Authorization": "Bearer bad.token"},
         )
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
         with patch.object(
             self.mw.token_manager,
             "decode_token",
             side_effect=HTTPException(status_code=401, detail="Token expired"),
         ):
-            response = await self.mw.middleware(req, call_next)
+            response = await self.mw.authenticate(req)
 
         assert response.status_code == 401
-        call_next.assert_not_awaited()
 
     async def test_protected_endpoint_with_access_token_cookie_passes(self):
         req = _make_request(
             f"{API}/users/abc", "GET",
             cookies={"access_token": "valid.cookie.token"},
         )
-        call_next = AsyncMock(return_value=JSONResponse(content={}, status_code=200))
 
         mock_user = MagicMock()
         mock_user.email = "user@example.com"
 
         with patch.object(self.mw.token_manager, "decode_token", return_value=mock_user):
-            response = await self.mw.middleware(req, call_next)
+            response = await self.mw.authenticate(req)
+
+        assert response is None
+        assert req.state.current_user is mock_user
+
+
+class TestAuthorize:
+    """Tests for AuthMiddleware.authorize, used for requests the gateway dispatches itself."""
+
+    USER = TokenClaims(email="a@b.com", id="00000000-0000-0000-0000-000000000001", role="user")
+
+    def setup_method(self):
+        self.mw = AuthMiddleware.__new__(AuthMiddleware)
+        self.mw.__init__(settings=settings, logger=MagicMock(), token_manager=MagicMock())
+
+    def test_public_route_needs_no_user(self):
+        self.mw.authorize(_make_request(f"{API}/products", "GET"), None)
+
+    def test_protected_route_without_user_is_401(self):
+        with pytest.raises(HTTPException) as exc:
+            self.mw.authorize(_make_request(f"{API}/wishlists/me", "GET"), None)
+        assert exc.value.status_code == 401
+
+    def test_owner_scoped_route_of_another_user_is_403(self):
+        other_id = "00000000-0000-0000-0000-000000000002"
+        with pytest.raises(HTTPException) as exc:
+            self.mw.authorize(_make_request(f"{API}/users/{other_id}/cart", "GET"), self.USER, owner_id=other_id)
+        assert exc.value.status_code == 403
+
+    def test_owner_scoped_route_of_own_user_passes(self):
+        own_id = str(self.USER.id)
+        self.mw.authorize(_make_request(f"{API}/users/{own_id}/cart", "GET"), self.USER, owner_id=own_id)
+
+
+class TestCurrentUserDependency:
+    def test_reuses_claims_set_by_middleware(self):
+        claims = TokenClaims(email="a@b.com", id="00000000-0000-0000-0000-000000000001", role="user")
+        req = _make_request(f"{API}/orders", "GET")
+        req.state.current_user = claims
 
-        call_next.assert_awaited_once()
-        assert response.status_code == 200
+        assert get_current_user(req) is claims
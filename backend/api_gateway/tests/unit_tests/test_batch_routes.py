@@ -0,0 +1,94 @@
+"""Unit tests for the /batch endpoint: authorization, cache hits, fan-out and timeouts."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+from uuid import uuid4
+
+from httpx import AsyncClient
+from httpx import Response as HttpxResponse
+
+from main import app
+from shared.utils.cache_entry import CachedResponse
+from tests.constants import TEST_API, TEST_PRODUCT_ID, TEST_USER_ID
+
+
+def _upstream(_service, path, **_kwargs):
+    return HttpxResponse(200, json={"path": path})
+
+
+class TestBatchRoutes:
+    async def test_sub_requests_are_answered_in_request_order(self, client: AsyncClient):
+        resources = app.state.resources
+        with patch.object(resources.gateway, "request_service", new=AsyncMock(side_effect=_upstream)) as upstream:
+            response = await client.post(f"{TEST_API}/batch", json={"requests": [
+                {"id": "product", "path": f"{TEST_API}/products/{TEST_PRODUCT_ID}/detailed"},
+                {"id": "wishlist", "path": f"{TEST_API}/wishlists/me"},
+                {"id": "orders", "path": f"{TEST_API}/orders/user/{TEST_USER_ID}?limit=5"},
+            ]})
+
+        assert response.status_code == 200
+        responses = response.json()["responses"]
+        assert [r["id"] for r in responses] == ["product", "wishlist", "orders"]
+        assert responses[0] == {
+            "id": "product", "status": 200, "cached": False,
+            "body": {"path": f"/products/{TEST_PRODUCT_ID}/detailed"},
+        }
+        assert responses[2]["body"] == {"path": f"/orders/user/{TEST_USER_ID}?limit=5"}
+        assert upstream.await_count == 3
+
+    async def test_another_users_data_is_forbidden(self, client: AsyncClient):
+        resources = app.state.resources
+        with patch.object(resources.gateway, "request_service", new=AsyncMock(side_effect=_upstream)) as upstream:
+            response = await client.post(f"{TEST_API}/batch", json={"requests": [
+                {"id": "cart", "path": f"{TEST_API}/users/{uuid4()}/cart"},
+            ]})
+
+        assert response.json()["responses"][0]["status"] == 403
+        upstream.assert_not_awaited()
+
+    async def test_admin_only_routes_are_not_batchable(self, client: AsyncClient):
+        resources = app.state.resources
+        with patch.object(resources.gateway, "request_service", new=AsyncMock(side_effect=_upstream)) as upstream:
+            response = await client.post(f"{TEST_API}/batch", json={"requests": [
+                {"id": "users", "path": f"{TEST_API}/users"},
+                {"id": "all-methods", "path": f"{TEST_API}/shipping/methods/all"},
+            ]})
+
+        assert [r["status"] for r in response.json()["responses"]] == [404, 404]
+        upstream.assert_not_awaited()
+
+    async def test_fresh_cache_entry_is_served_without_upstream_call(self, client: AsyncClient):
+        resources = app.state.resources
+        entry = CachedResponse.from_upstream(b'{"items":[]}', 200, "application/json")
+        with (
+            patch.object(resources.cache, "get_cached_entry", new=AsyncMock(return_value=entry)),
+            patch.object(resources.gateway, "request_service", new=AsyncMock(side_effect=_upstream)) as upstream,
+        ):
+            response = await client.post(f"{TEST_API}/batch", json={"requests": [
+                {"id": "products", "path": f"{TEST_API}/products"},
+            ]})
+
+        assert response.json()["responses"][0] == {"id": "products", "status": 200, "cached": True, "body": {"items": []}}
+        upstream.assert_not_awaited()
+
+    async def test_slow_sub_request_times_out_alone(self, client: AsyncClient):
+        async def respond(service, path, **kwargs):
+            if path == "/categories":
+                await asyncio.sleep(1)
+            return _upstream(service, path)
+
+        resources = app.state.resources
+        with patch.object(resources.gateway, "request_service", new=AsyncMock(side_effect=respond)):
+            response = await client.post(f"{TEST_API}/batch", json={"requests": [
+                {"id": "categories", "path": f"{TEST_API}/categories", "timeout": 0.05},
+                {"id": "products", "path": f"{TEST_API}/products"},
+            ]})
+
+        assert [r["status"] for r in response.json()["responses"]] == [504, 200]
+
+    async def test_duplicate_ids_are_rejected(self, client: AsyncClient):
+        response = await client.post(f"{TEST_API}/batch", json={"requests": [
+            {"id": "a", "path": f"{TEST_API}/products"},
+            {"id": "a", "path": f"{TEST_API}/categories"},
+        ]})
+
+        assert response.status_code == 422
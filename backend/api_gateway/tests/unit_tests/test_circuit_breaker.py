@@ -0,0 +1,78 @@
+"""Unit tests for per-instance circuit breakers and per-service bulkheads."""
+import asyncio
+
+import pytest
+
+from exceptions.exceptions import ServiceUnavailableError
+from gateway.bulkhead import Bulkhead
+from gateway.circuit_breaker import BreakerState, CircuitBreaker
+
+
+def _make_breaker(**kwargs) -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=kwargs.pop("failure_threshold", 3), recovery_seconds=10.0, **kwargs)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_consecutive_failures(self):
+        breaker = _make_breaker()
+        for _ in range(3):
+            assert breaker.allow_request(now=0.0)
+            breaker.record_failure(now=0.0)
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request(now=5.0)
+        assert breaker.retry_after(now=5.0) == pytest.approx(5.0)
+
+    def test_success_resets_failure_count(self):
+        breaker = _make_breaker()
+        breaker.record_failure(now=0.0)
+        breaker.record_failure(now=0.0)
+        breaker.record_success()
+        breaker.record_failure(now=0.0)
+        assert breaker.state == BreakerState.CLOSED
+
+    def test_half_open_probe_success_closes(self):
+        breaker = _make_breaker(failure_threshold=1)
+        breaker.record_failure(now=0.0)
+        assert breaker.allow_request(now=10.0)
+        assert breaker.state == BreakerState.HALF_OPEN
+        assert not breaker.allow_request(now=10.0)  # only one probe at a time
+        breaker.record_success()
+        assert breaker.state == BreakerState.CLOSED
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = _make_breaker(failure_threshold=1)
+        breaker.record_failure(now=0.0)
+        assert breaker.allow_request(now=10.0)
+        breaker.record_failure(now=10.0)
+        assert breaker.state == BreakerState.OPEN
+        assert not breaker.allow_request(now=15.0)
+
+    def test_lost_probe_frees_its_slot_after_recovery_period(self):
+        breaker = _make_breaker(failure_threshold=1)
+        breaker.record_failure(now=0.0)
+        assert breaker.allow_request(now=10.0)
+        assert not breaker.allow_request(now=15.0)
+        assert breaker.allow_request(now=20.0)
+
+
+class TestBulkhead:
+    async def test_rejects_with_503_when_full(self):
+        bulkhead = Bulkhead("product-service", max_concurrency=1, queue_timeout_seconds=0)
+        await bulkhead.acquire()
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            await bulkhead.acquire()
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+    async def test_waiting_request_gets_released_slot(self):
+        bulkhead = Bulkhead("product-service", max_concurrency=1, queue_timeout_seconds=1.0)
+        await bulkhead.acquire()
+
+        waiter = asyncio.create_task(bulkhead.acquire())
+        await asyncio.sleep(0.01)
+        bulkhead.release()
+        await waiter
+
+        assert bulkhead.in_use == 1
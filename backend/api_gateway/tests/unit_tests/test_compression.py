@@ -0,0 +1,122 @@
+"""Unit tests for content-coding negotiation and the gateway's CompressionMiddleware."""
+import gzip
+
+from middleware.compression_middleware import CompressionMiddleware
+from shared.utils.compression import is_compressible, negotiate_encoding, supported_encodings
+from tests.asgi_messages import SentMessages
+
+
+def _scope(accept_encoding: str | None = "gzip") -> dict:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding is not None else []
+    return {"type": "http", "method": "GET", "path": "/api/v1/products", "headers": headers}
+
+
+def _app(chunks: list[bytes], headers: dict[str, str] | None = None, status: int = 200):
+    async def app(scope, receive, send):
+        raw_headers = {"content-type": "application/json", **(headers or {})}
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode(), value.encode()) for name, value in raw_headers.items()],
+        })
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+    return app
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+_BODY: bytes = b'{"items": [' + b'{"name": "product"},' * 100 + b"{}]}"
+
+
+class TestNegotiation:
+    def test_highest_q_value_wins(self):
+        assert negotiate_encoding("gzip;q=0.5, zstd;q=0.9", ("br", "zstd", "gzip")) == "zstd"
+
+    def test_ties_go_to_server_preference(self):
+        assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+
+    def test_wildcard_and_explicit_refusal(self):
+        assert negotiate_encoding("*;q=0.5, br;q=0", ("br", "gzip")) == "gzip"
+        assert negotiate_encoding("identity", ("br", "gzip")) is None
+        assert negotiate_encoding(None, ("gzip",)) is None
+
+    def test_only_encodings_with_a_codec_are_supported(self):
+        assert "gzip" in supported_encodings(["br", "zstd", "GZIP", "deflate"])
+        assert "deflate" not in supported_encodings(["deflate"])
+
+    def test_compressible_media_types(self):
+        assert is_compressible("application/json; charset=utf-8")
+        assert is_compressible("text/html")
+        assert not is_compressible("image/png")
+        assert not is_compressible(None)
+
+
+class TestCompressionMiddleware:
+    async def test_streamed_json_is_compressed(self):
+        middleware = CompressionMiddleware(
+            _app([_BODY[:500], _BODY[500:]], headers={"etag": '"abc"'}), encodings=("gzip",), minimum_size=64,
+        )
+        sent = SentMessages()
+
+        await middleware(_scope(), _receive, sent)
+
+        assert sent.headers["content-encoding"] == "gzip"
+        assert sent.headers["vary"] == "Accept-Encoding"
+        assert sent.headers["etag"] == 'W/"abc"'
+        assert "content-length" not in sent.headers
+        assert gzip.decompress(sent.body) == _BODY
+
+    async def test_single_chunk_gets_a_content_length(self):
+        middleware = CompressionMiddleware(_app([_BODY]), encodings=("gzip",), minimum_size=64)
+        sent = SentMessages()
+
+        await middleware(_scope(), _receive, sent)
+
+        assert sent.headers["content-length"] == str(len(sent.body))
+        assert gzip.decompress(sent.body) == _BODY
+
+    async def test_small_body_is_passed_through(self):
+        middleware = CompressionMiddleware(_app([b'{"ok":true}']), encodings=("gzip",), minimum_size=64)
+        sent = SentMessages()
+
+        await middleware(_scope(), _receive, sent)
+
+        assert "content-encoding" not in sent.headers
+        assert sent.body == b'{"ok":true}'
+
+    async def test_already_encoded_response_is_passed_through(self):
+        precompressed = gzip.compress(_BODY)
+        middleware = CompressionMiddleware(
+            _app([precompressed], headers={"content-encoding": "gzip"}), encodings=("gzip",), minimum_size=64,
+        )
+        sent = SentMessages()
+
+        await middleware(_scope(), _receive, sent)
+
+        assert sent.body == precompressed
+
+    async def test_client_without_accepted_coding_gets_identity(self):
+        middleware = CompressionMiddleware(_app([_BODY]), encodings=("gzip",), minimum_size=64)
+        sent = SentMessages()
+
+        await middleware(_scope(accept_encoding=None), _receive, sent)
+
+        assert "content-encoding" not in sent.headers
+        assert sent.body == _BODY
+
+    async def test_byte_range_is_passed_through(self):
+        part = _BODY[:200]
+        middleware = CompressionMiddleware(
+            _app([part], headers={"content-type": "image/svg+xml", "content-range": f"bytes 0-199/{len(_BODY)}"},
+                 status=206),
+            encodings=("gzip",), minimum_size=64,
+        )
+        sent = SentMessages()
+
+        await middleware(_scope(), _receive, sent)
+
+        assert "content-encoding" not in sent.headers
+        assert sent.body == part
@@ -0,0 +1,151 @@
+"""Unit tests for LoadBalancer and ServiceDiscovery: instance selection, health checks, outlier ejection."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import ConnectError, Response as HttpxResponse
+
+from exceptions.exceptions import ServiceUnavailableError
+from gateway.load_balancer import LoadBalancer
+from gateway.service_discovery import ServiceDiscovery
+from schemas.gateway_schemas import GatewayConfig, ServiceConfig
+
+
+INSTANCES = ["http://product-service-1:8002", "http://product-service-2:8002"]
+
+
+def _make_balancer(instances: list[str] | None = None, **kwargs) -> LoadBalancer:
+    config = GatewayConfig(
+        services={
+            "product-service": ServiceConfig(
+                name="product-service",
+                instances=instances or INSTANCES,
+                health_check_path="/health",
+                api_version="/api/v1",
+            ),
+        }
+    )
+    return LoadBalancer(config=config, logger=MagicMock(), **kwargs)
+
+
+class TestPick:
+    def test_prefers_instance_with_fewer_inflight_requests(self):
+        lb = _make_balancer()
+        busy, idle = lb.instances("product-service")
+        lb.acquire(busy)
+        lb.acquire(busy)
+        assert all(lb.pick("product-service") is idle for _ in range(20))
+
+    def test_prefers_instance_with_lower_latency(self):
+        lb = _make_balancer()
+        slow, fast = lb.instances("product-service")
+        lb.observe("product-service", slow, latency=1.0, failed=False)
+        lb.observe("product-service", fast, latency=0.01, failed=False)
+        assert all(lb.pick("product-service") is fast for _ in range(20))
+
+    def test_skips_unhealthy_instances(self):
+        lb = _make_balancer()
+        down, up = lb.instances("product-service")
+        down.healthy = False
+        assert all(lb.pick("product-service") is up for _ in range(20))
+
+    def test_panics_to_all_instances_when_none_available(self):
+        lb = _make_balancer()
+        for instance in lb.instances("product-service"):
+            instance.healthy = False
+        assert lb.pick("product-service").url in INSTANCES
+
+
+class TestOutlierEjection:
+    def test_ejects_after_consecutive_failures(self):
+        lb = _make_balancer(failure_threshold=3)
+        bad, good = lb.instances("product-service")
+        for _ in range(3):
+            lb.observe("product-service", bad, latency=0.01, failed=True)
+        assert bad.ejected_until > 0
+        assert all(lb.pick("product-service") is good for _ in range(20))
+
+    def test_success_resets_failure_count(self):
+        lb = _make_balancer(failure_threshold=3)
+        instance = lb.instances("product-service")[0]
+        lb.observe("product-service", instance, latency=0.01, failed=True)
+        lb.observe("product-service", instance, latency=0.01, failed=True)
+        lb.observe("product-service", instance, latency=0.01, failed=False)
+        lb.observe("product-service", instance, latency=0.01, failed=True)
+        assert instance.ejected_until == 0
+
+    def test_never_ejects_more_than_max_ratio(self):
+        lb = _make_balancer(failure_threshold=1, max_ejection_ratio=0.5)
+        first, second = lb.instances("product-service")
+        lb.observe("product-service", first, latency=0.01, failed=True)
+        lb.observe("product-service", second, latency=0.01, failed=True)
+        assert first.ejected_until > 0
+        assert second.ejected_until == 0
+
+
+class TestHealthChecks:
+    async def test_marks_failing_instances_unhealthy(self):
+        lb = _make_balancer()
+
+        async def get(url, timeout):
+            if url.startswith(INSTANCES[0]):
+                raise ConnectError("connection refused")
+            assert url == f"{INSTANCES[1]}/health"
+            return HttpxResponse(200)
+
+        client = MagicMock()
+        client.get = AsyncMock(side_effect=get)
+        await lb.check_health(client)
+
+        down, up = lb.instances("product-service")
+        assert down.healthy is False
+        assert up.healthy is True
+
+    async def test_set_instances_keeps_state_of_remaining_instances(self):
+        lb = _make_balancer()
+        kept = lb.instances("product-service")[0]
+        kept.healthy = False
+        lb.set_instances("product-service", [INSTANCES[0], "http://product-service-3:8002"])
+        assert lb.instances("product-service")[0] is kept
+        assert lb.config.services["product-service"].instances[1] == "http://product-service-3:8002"
+
+
+class TestServiceDiscovery:
+    async def test_refreshes_instances_from_file(self, tmp_path):
+        discovery_file = tmp_path / "services.json"
+        discovery_file.write_bytes(b'{"product-service": ["http://product-service-3:8002"]}')
+        discovery = ServiceDiscovery(logger=MagicMock(), file_path=str(discovery_file))
+        lb = _make_balancer(discovery=discovery)
+
+        await lb.refresh_instances()
+
+        assert [i.url for i in lb.instances("product-service")] == ["http://product-service-3:8002"]
+
+    async def test_unknown_service_keeps_static_instances(self, tmp_path):
+        discovery_file = tmp_path / "services.json"
+        discovery_file.write_bytes(b'{"user-service": ["http://user-service-2:8001"]}')
+        discovery = ServiceDiscovery(logger=MagicMock(), file_path=str(discovery_file))
+        lb = _make_balancer(discovery=discovery)
+
+        await lb.refresh_instances()
+
+        assert [i.url for i in lb.instances("product-service")] == INSTANCES
+
+
+class TestCircuitBreakers:
+    def test_open_breaker_takes_instance_out_of_rotation(self):
+        lb = _make_balancer(failure_threshold=100, breaker_failure_threshold=2)
+        bad, good = lb.instances("product-service")
+        lb.observe("product-service", bad, latency=0.01, failed=True)
+        lb.observe("product-service", bad, latency=0.01, failed=True)
+        assert all(lb.pick("product-service") is good for _ in range(20))
+
+    def test_all_breakers_open_fast_fails_with_retry_after(self):
+        lb = _make_balancer(breaker_failure_threshold=1, breaker_recovery_seconds=30.0)
+        for instance in lb.instances("product-service"):
+            lb.observe("product-service", instance, latency=0.01, failed=True)
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            lb.pick("product-service")
+
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "30"
@@ -0,0 +1,214 @@
+"""Unit tests for the media proxy: streaming, the disk cache, byte ranges and conditional requests."""
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient, ConnectError, ReadError, Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from gateway.media import MediaDiskCache, MediaProxy
+from resources import logger
+
+
+_IMAGE: bytes = bytes(range(256)) * 40
+_ETAG: str = '"v1"'
+_LAST_MODIFIED: str = "Wed, 01 Oct 2025 10:00:00 GMT"
+
+
+def _upstream_file(body: bytes = _IMAGE, etag: str = _ETAG):
+    """A product-service StaticFiles stand-in: honours If-None-Match and single byte ranges."""
+    async def send(request: HttpxRequest, stream: bool = False) -> HttpxResponse:
+        headers = {"content-type": "image/png", "etag": etag, "last-modified": _LAST_MODIFIED, "accept-ranges": "bytes"}
+        if request.headers.get("if-none-match") == etag:
+            return HttpxResponse(304, headers={"etag": etag})
+        status, content = 200, body
+        if request.headers.get("range"):
+            start, end = (int(value) for value in request.headers["range"].removeprefix("bytes=").split("-"))
+            status, content = 206, body[start:end + 1]
+            headers["content-range"] = f"bytes {start}-{end}/{len(body)}"
+
+        async def chunks():
+            for offset in range(0, len(content), 4096):
+                yield content[offset:offset + 4096]
+
+        headers["content-length"] = str(len(content))
+        return HttpxResponse(status, headers=headers, content=chunks())
+    return send
+
+
+def _proxy(tmp_path, send, max_bytes: int = 1024 * 1024, revalidate_seconds: float = 300.0) -> MediaProxy:
+    client = MagicMock()
+    client.build_request = MagicMock(
+        side_effect=lambda method, url, headers, timeout: HttpxRequest(method, url, headers=headers),
+    )
+    client.send = AsyncMock(side_effect=send)
+    gateway = MagicMock()
+    gateway.client = client
+    cache = MediaDiskCache(
+        directory=str(tmp_path),
+        max_bytes=max_bytes,
+        max_entry_bytes=max_bytes,
+        revalidate_seconds=revalidate_seconds,
+    )
+    return MediaProxy(gateway=gateway, cache=cache, logger=logger, upstream_url="http://product-service:8002")
+
+
+@pytest.fixture
+async def media_client():
+    proxies: list[MediaProxy] = []
+
+    async def make(proxy: MediaProxy) -> AsyncClient:
+        proxies.append(proxy)
+        await proxy.__aenter__()
+
+        async def media(request):
+            return await proxy.serve(request, request.path_params["file_path"])
+
+        app = Starlette(routes=[Route("/media/{file_path:path}", media)])
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    yield make
+    for proxy in proxies:
+        await proxy.__aexit__(None, None, None)
+
+
+class TestMediaProxy:
+    async def test_miss_streams_and_fills_the_disk_cache(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file())
+        client = await media_client(proxy)
+
+        first = await client.get("/media/products/a.png")
+        second = await client.get("/media/products/a.png")
+
+        assert first.content == second.content == _IMAGE
+        assert second.headers["etag"] == _ETAG
+        assert second.headers["content-type"] == "image/png"
+        assert proxy.gateway.client.send.await_count == 1
+        assert proxy.cache.get("products/a.png").file.read_bytes() == _IMAGE
+
+    async def test_cached_file_answers_byte_ranges(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file())
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+
+        response = await client.get("/media/a.png", headers={"range": "bytes=100-199"})
+
+        assert response.status_code == 206
+        assert response.content == _IMAGE[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(_IMAGE)}"
+        assert proxy.gateway.client.send.await_count == 1
+
+    @pytest.mark.parametrize("headers", [
+        {"if-none-match": _ETAG},
+        {"if-modified-since": _LAST_MODIFIED},
+    ])
+    async def test_cached_file_answers_conditional_requests(self, tmp_path, media_client, headers):
+        proxy = _proxy(tmp_path, _upstream_file())
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+
+        response = await client.get("/media/a.png", headers=headers)
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert proxy.gateway.client.send.await_count == 1
+
+    async def test_range_miss_is_forwarded_and_not_cached(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file())
+        client = await media_client(proxy)
+
+        response = await client.get("/media/a.png", headers={"range": "bytes=0-9"})
+
+        assert response.status_code == 206
+        assert response.content == _IMAGE[:10]
+        assert proxy.gateway.client.send.await_args.args[0].headers["range"] == "bytes=0-9"
+        assert proxy.cache.get("a.png") is None
+
+    async def test_stale_file_is_revalidated_with_its_etag(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file(), revalidate_seconds=0)
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+
+        response = await client.get("/media/a.png")
+
+        assert response.content == _IMAGE
+        revalidation = proxy.gateway.client.send.await_args.args[0]
+        assert revalidation.headers["if-none-match"] == _ETAG
+
+    async def test_changed_file_replaces_the_cached_copy(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file(), revalidate_seconds=0)
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+        old_file = proxy.cache.get("a.png").file
+        proxy.gateway.client.send.side_effect = _upstream_file(body=b"new" * 100, etag='"v2"')
+
+        response = await client.get("/media/a.png")
+
+        assert response.content == b"new" * 100
+        assert proxy.cache.get("a.png").etag == '"v2"'
+        assert not old_file.exists()
+
+    async def test_stale_file_is_served_when_upstream_is_down(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file(), revalidate_seconds=0)
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+        proxy.gateway.client.send.side_effect = ConnectError("refused")
+
+        response = await client.get("/media/a.png")
+
+        assert response.status_code == 200
+        assert response.content == _IMAGE
+
+    async def test_upstream_down_without_a_copy_is_502(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, AsyncMock(side_effect=ConnectError("refused")))
+        client = await media_client(proxy)
+
+        response = await client.get("/media/a.png")
+
+        assert response.status_code == 502
+
+    async def test_least_recently_used_file_is_evicted(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file(), max_bytes=len(_IMAGE) + 100)
+        client = await media_client(proxy)
+        await client.get("/media/a.png")
+        evicted = proxy.cache.get("a.png").file
+
+        await client.get("/media/b.png")
+
+        assert proxy.cache.get("a.png") is None
+        assert not evicted.exists()
+        assert proxy.cache.current_bytes == len(_IMAGE)
+
+    async def test_disabled_cache_only_streams(self, tmp_path, media_client):
+        proxy = _proxy(tmp_path, _upstream_file(), max_bytes=0)
+        client = await media_client(proxy)
+
+        await client.get("/media/a.png")
+        response = await client.get("/media/a.png")
+
+        assert response.content == _IMAGE
+        assert proxy.gateway.client.send.await_count == 2
+        assert len(proxy.cache) == 0
+
+    async def test_aborted_miss_closes_upstream_and_drops_the_partial_fill(self, tmp_path):
+        upstreams: list[HttpxResponse] = []
+
+        async def send(request: HttpxRequest, stream: bool = False) -> HttpxResponse:
+            async def chunks():
+                yield _IMAGE[:4096]
+                raise ReadError("upstream went away")
+
+            headers = {"content-type": "image/png", "etag": _ETAG, "content-length": str(len(_IMAGE))}
+            upstreams.append(HttpxResponse(200, headers=headers, content=chunks()))
+            return upstreams[-1]
+
+        proxy = _proxy(tmp_path, send)
+        async with proxy:
+            response = await proxy.serve(MagicMock(headers={}), "a.png")
+            with pytest.raises(ReadError):
+                await response({"type": "http", "asgi": {"spec_version": "2.4"}}, AsyncMock(), AsyncMock())
+
+            assert upstreams[0].is_closed
+            assert list(tmp_path.rglob("*.part")) == []
+            assert proxy.cache.get("a.png") is None
@@ -0,0 +1,108 @@
+"""Unit tests for RateLimitManager (GCRA script) and the gateway's LeasedRateLimiter."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+import pytest
+
+from shared.exceptions.base_exceptions import RateLimitExceededError
+from shared.managers.ratelimit_manager import RateLimitManager
+from middleware.rate_limit_lease import LeasedRateLimiter
+from resources import logger
+
+
+def _make_request(path: str = "/api/v1/products") -> MagicMock:
+    req = MagicMock()
+    req.url = MagicMock()
+    req.url.path = path
+    req.headers = {"X-Forwarded-For": "1.2.3.4"}
+    return req
+
+
+def _make_rate_limiter() -> RateLimitManager:
+    return RateLimitManager(service_prefix="api-gateway", redis_url="redis://localhost:6379/0", logger=logger)
+
+
+class TestIsRateLimited:
+    async def test_allowed_request_is_one_script_call(self):
+        limiter = _make_rate_limiter()
+        script = AsyncMock(return_value=[1, 0])
+
+        with patch.object(RateLimitManager, "gcra_script", new_callable=PropertyMock, return_value=script):
+            assert await limiter.is_rate_limited(_make_request(), times=10_000, seconds=60) is False
+
+        script.assert_awaited_once_with(
+            keys=["api-gateway:ratelimit:1.2.3.4:/api/v1/products"],
+            args=[6_000, 60_000_000, 1],
+        )
+
+    async def test_denied_request_raises_with_retry_after(self):
+        limiter = _make_rate_limiter()
+        script = AsyncMock(return_value=[0, 2_500_000])
+
+        with patch.object(RateLimitManager, "gcra_script", new_callable=PropertyMock, return_value=script):
+            with pytest.raises(RateLimitExceededError) as exc_info:
+                await limiter.is_rate_limited(_make_request(), times=5, seconds=60)
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == "3"
+
+    async def test_redis_error_fails_open(self):
+        limiter = _make_rate_limiter()
+        script = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        with patch.object(RateLimitManager, "gcra_script", new_callable=PropertyMock, return_value=script):
+            assert await limiter.is_rate_limited(_make_request(), times=5, seconds=60) is False
+
+
+def _make_leased_limiter(claim: AsyncMock, lease_size: int = 100) -> LeasedRateLimiter:
+    rate_limit_manager = _make_rate_limiter()
+    rate_limit_manager.claim_tokens = claim
+    return LeasedRateLimiter(rate_limit_manager=rate_limit_manager, logger=logger, lease_size=lease_size)
+
+
+class TestLeasedRateLimiter:
+    async def test_admits_from_local_lease_with_one_redis_call(self):
+        claim = AsyncMock(return_value=(100, 0))
+        limiter = _make_leased_limiter(claim)
+
+        for _ in range(50):
+            assert await limiter.is_rate_limited(_make_request(), times=10_000, seconds=60) is False
+
+        claim.assert_awaited_once_with(
+            "api-gateway:ratelimit:1.2.3.4:/api/v1/products", times=10_000, seconds=60, count=100,
+        )
+
+    async def test_refills_in_background_when_lease_runs_low(self):
+        claim = AsyncMock(return_value=(100, 0))
+        limiter = _make_leased_limiter(claim)
+
+        for _ in range(80):
+            await limiter.is_rate_limited(_make_request(), times=10_000, seconds=60)
+        await asyncio.sleep(0)
+
+        assert claim.await_count == 2
+
+    async def test_batch_is_capped_for_small_limits(self):
+        claim = AsyncMock(return_value=(1, 0))
+        limiter = _make_leased_limiter(claim)
+
+        await limiter.is_rate_limited(_make_request(), times=50, seconds=60)
+
+        assert claim.await_args.kwargs["count"] == 1
+
+    async def test_denial_is_remembered_until_retry_after(self):
+        claim = AsyncMock(return_value=(0, 30))
+        limiter = _make_leased_limiter(claim)
+
+        for _ in range(3):
+            with pytest.raises(RateLimitExceededError) as exc_info:
+                await limiter.is_rate_limited(_make_request(), times=10_000, seconds=60)
+            assert exc_info.value.headers["Retry-After"] == "30"
+
+        claim.assert_awaited_once()
+
+    async def test_redis_error_fails_open(self):
+        claim = AsyncMock(side_effect=ConnectionError("redis down"))
+        limiter = _make_leased_limiter(claim)
+
+        assert await limiter.is_rate_limited(_make_request(), times=10_000, seconds=60) is False
@@ -0,0 +1,126 @@
+"""Unit tests for RequestCoalescer: single-flight cache fills within and across workers."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import Response
+
+from middleware.request_coalescer import RequestCoalescer
+from shared.utils.cache_entry import CachedResponse
+
+
+def _entry(body: bytes = b'{"items":[]}') -> CachedResponse:
+    return CachedResponse.from_upstream(body, 200, "application/json")
+
+
+def _make_coalescer(lock_acquired: bool = True, wait_timeout_seconds: float = 1.0) -> RequestCoalescer:
+    cache_manager = MagicMock()
+    cache_manager.acquire_fill_lock = AsyncMock(return_value=lock_acquired)
+    cache_manager.release_fill_lock = AsyncMock()
+    cache_manager.build_response = lambda entry, accept_encoding=None: Response(content=entry.body, status_code=entry.status_code)
+    coalescer = RequestCoalescer(
+        cache_manager=cache_manager,
+        logger=MagicMock(),
+        lock_ttl_ms=1000,
+        wait_timeout_seconds=wait_timeout_seconds,
+    )
+    coalescer._POLL_INTERVAL_SECONDS = 0.01
+    return coalescer
+
+
+class TestRequestCoalescer:
+    async def test_concurrent_misses_share_one_fill(self):
+        coalescer = _make_coalescer()
+        entry = _entry()
+        calls = 0
+
+        async def fill():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return entry
+
+        responses = await asyncio.gather(
+            *(coalescer.coalesce("k", fill, AsyncMock(return_value=None)) for _ in range(5))
+        )
+
+        assert calls == 1
+        # The filler answered its own caller; the followers are served the filled entry.
+        assert responses[0] is None
+        assert all(response.body == entry.body for response in responses[1:])
+        coalescer.cache_manager.release_fill_lock.assert_awaited_once()
+        assert coalescer._inflight == {}
+
+    async def test_lock_loser_serves_entry_filled_by_another_worker(self):
+        coalescer = _make_coalescer(lock_acquired=False)
+        entry = _entry()
+        fill = AsyncMock()
+        lookup = AsyncMock(side_effect=[None, entry])
+
+        response = await coalescer.coalesce("k", fill, lookup)
+
+        assert response.body == entry.body
+        fill.assert_not_awaited()
+        coalescer.cache_manager.release_fill_lock.assert_not_awaited()
+
+    async def test_lock_loser_forwards_after_wait_deadline(self):
+        coalescer = _make_coalescer(lock_acquired=False, wait_timeout_seconds=0.03)
+        entry = _entry()
+        fill = AsyncMock(return_value=entry)
+
+        response = await coalescer.coalesce("k", fill, AsyncMock(return_value=None))
+
+        assert response is None
+        fill.assert_awaited_once()
+
+    async def test_failed_fill_releases_followers(self):
+        coalescer = _make_coalescer()
+        started = asyncio.Event()
+
+        async def failing_fill():
+            started.set()
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        follower_fill = AsyncMock(return_value=None)
+        leader = asyncio.create_task(coalescer.coalesce("k", failing_fill, AsyncMock()))
+        await started.wait()
+        follower = await coalescer.coalesce("k", follower_fill, AsyncMock())
+
+        assert follower is None
+        follower_fill.assert_awaited_once()
+        assert isinstance((await asyncio.gather(leader, return_exceptions=True))[0], RuntimeError)
+        coalescer.cache_manager.release_fill_lock.assert_awaited_once()
+
+
+class TestRevalidation:
+    async def test_concurrent_stale_hits_schedule_one_refresh(self):
+        coalescer = _make_coalescer()
+        refresh = AsyncMock(return_value=True)
+
+        for _ in range(3):
+            coalescer.schedule_revalidation("k", refresh)
+        await asyncio.gather(*coalescer._revalidating.values())
+
+        refresh.assert_awaited_once()
+        coalescer.cache_manager.release_fill_lock.assert_awaited_once()
+
+    async def test_refresh_is_skipped_when_another_worker_holds_the_lock(self):
+        coalescer = _make_coalescer(lock_acquired=False)
+        refresh = AsyncMock(return_value=True)
+
+        coalescer.schedule_revalidation("k", refresh)
+        await asyncio.gather(*coalescer._revalidating.values())
+
+        refresh.assert_not_awaited()
+
+    async def test_failed_refresh_backs_off(self):
+        coalescer = _make_coalescer()
+        refresh = AsyncMock(side_effect=RuntimeError("upstream down"))
+
+        coalescer.schedule_revalidation("k", refresh)
+        await asyncio.gather(*coalescer._revalidating.values(), return_exceptions=True)
+        coalescer.schedule_revalidation("k", refresh)
+
+        refresh.assert_awaited_once()
+        assert "k" in coalescer._revalidate_after
+        assert "k" not in coalescer._revalidating
@@ -0,0 +1,573 @@
+"""Unit tests for the gateway response cache: LocalResponseCache (L1) and CacheManager tiering."""
+import gzip
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from orjson import loads
+
+from shared.managers.cache_manager import CacheManager
+from shared.managers.local_cache import LocalResponseCache
+from middleware.cache_middleware import GatewayRequestMiddleware
+from shared.utils.cache_entry import (
+    METADATA_READ_BYTES,
+    CachedResponse,
+    CacheEntryFormatError,
+    CacheEntryMetadata,
+    etag_matches,
+)
+from resources import logger, settings
+from tests.asgi_messages import SentMessages
+
+
+def _make_request(path: str = "/api/v1/products", query: dict | None = None, method: str = "GET") -> MagicMock:
+    req = MagicMock()
+    req.method = method
+    req.url = MagicMock()
+    req.url.path = path
+    req.query_params = query or {}
+    req.headers = {}
+    req.cookies = {}
+    req.scope = {"type": "http"}
+    return req
+
+
+def _make_cache_manager(local_cache: LocalResponseCache | None = None, generation: int | None = None) -> CacheManager:
+    manager = CacheManager(
+        service_prefix="api-gateway",
+        redis_url="redis://localhost:6379/0",
+        logger=logger,
+        service_api_version=settings.API_GATEWAY_SERVICE_URL_API_VERSION,
+        local_cache=local_cache,
+    )
+    manager._redis = MagicMock()
+    manager._redis.get = AsyncMock(return_value=None if generation is None else str(generation))
+    return manager
+
+
+def _entry(body: bytes, status_code: int = 200, encodings: tuple[str, ...] = ()) -> CachedResponse:
+    return CachedResponse.from_upstream(body, status_code, "application/json", encodings=encodings)
+
+
+class TestCachedResponse:
+    def test_round_trip_keeps_body_bytes_untouched(self):
+        body = b'{"items": [1, 2, 3],  "spacing":"kept"}'
+        entry = CachedResponse.from_upstream(body, 200, "application/json; charset=utf-8")
+
+        decoded = CachedResponse.from_bytes(entry.to_bytes())
+
+        assert decoded.body == body
+        assert decoded.status_code == 200
+        assert decoded.content_type == "application/json; charset=utf-8"
+        assert decoded.etag == entry.etag
+        assert decoded.stored_at == entry.stored_at
+
+    def test_etag_depends_only_on_body(self):
+        assert _entry(b"same").etag == _entry(b"same").etag
+        assert _entry(b"same").etag != _entry(b"other").etag
+
+    def test_round_trip_keeps_compressed_variants(self):
+        body = b'{"items": [' + b'{"name": "product"},' * 50 + b"{}]}"
+        entry = _entry(body, encodings=("gzip",))
+
+        decoded = CachedResponse.from_bytes(entry.to_bytes())
+
+        assert decoded.body == body
+        assert list(decoded.encoded) == ["gzip"]
+        assert gzip.decompress(decoded.encoded["gzip"]) == body
+        assert decoded.size == entry.size == len(entry.to_bytes())
+        assert CacheEntryMetadata.from_bytes(entry.to_bytes()[:METADATA_READ_BYTES]).etag == entry.etag
+
+    def test_legacy_json_entry_is_rejected(self):
+        with pytest.raises(CacheEntryFormatError):
+            CachedResponse.from_bytes(b'{"content": {}, "status_code": 200}')
+
+
+class TestLocalResponseCache:
+    def test_get_returns_stored_entry(self):
+        cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        cache.set("k", _entry(b'{"a":1}'), ttl=60)
+
+        entry = cache.get("k")
+
+        assert entry is not None
+        assert entry.body == b'{"a":1}'
+        assert entry.status_code == 200
+
+    def test_expired_entry_is_dropped(self):
+        cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        with patch("shared.managers.local_cache.monotonic", return_value=100.0):
+            cache.set("k", _entry(b"body"), ttl=5)
+        with patch("shared.managers.local_cache.monotonic", return_value=106.0):
+            assert cache.get("k") is None
+        assert cache.current_bytes == 0
+
+    def test_evicts_least_recently_used_when_over_budget(self):
+        entry_size = _entry(b"12345").size
+        cache = LocalResponseCache(max_bytes=entry_size * 2, max_entry_bytes=entry_size)
+        cache.set("a", _entry(b"12345"), ttl=60)
+        cache.set("b", _entry(b"12345"), ttl=60)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", _entry(b"12345"), ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.current_bytes == entry_size * 2
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=4)
+        cache.set("k", _entry(b"12345"), ttl=60)
+        assert cache.get("k") is None
+
+    def test_invalidate_prefix_only_drops_matching_keys(self):
+        cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        cache.set("api-gateway:cache:GET:/api/v1/products:limit=50", _entry(b"p"), ttl=60)
+        cache.set("api-gateway:cache:GET:/api/v1/categories:", _entry(b"c"), ttl=60)
+
+        removed = cache.invalidate_prefix("api-gateway:cache:GET:/api/v1/products")
+
+        assert removed == 1
+        assert cache.get("api-gateway:cache:GET:/api/v1/categories:") is not None
+
+
+class TestCacheManagerLocalTier:
+    async def test_local_hit_skips_redis(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        request = _make_request(query={"limit": "50"})
+        local_cache.set(await manager._resolve_cache_key(request), _entry(b'{"items":[]}'), ttl=60)
+        manager._binary_redis = MagicMock()
+
+        response = await manager.get_cached_response(request, is_public=True)
+
+        assert response is not None
+        assert response.body == b'{"items":[]}'
+        manager._binary_redis.pipeline.assert_not_called()
+
+    async def test_redis_hit_is_promoted_to_local_tier(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        request = _make_request(query={"limit": "50"})
+        pipe = MagicMock()
+        stored = _entry(b'{"items": []}')
+        pipe.execute = AsyncMock(return_value=[stored.to_bytes(), 120])
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.pipeline.return_value = pipe
+
+        response = await manager.get_cached_response(request, is_public=True)
+
+        assert response is not None
+        assert response.body == b'{"items": []}'
+        assert response.headers["etag"] == stored.etag
+        assert local_cache.get(await manager._resolve_cache_key(request)) is not None
+
+    async def test_invalidate_namespace_publishes_and_drops_local_entries(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        request = _make_request(query={"limit": "50"})
+        local_cache.set(await manager._resolve_cache_key(request), _entry(b"{}"), ttl=60)
+        manager._redis.incr = AsyncMock(return_value=1)
+        manager._redis.publish = AsyncMock()
+
+        await manager.invalidate_namespace("products")
+
+        assert len(local_cache) == 0
+        manager._redis.publish.assert_awaited_once()
+        channel, message = manager._redis.publish.call_args.args
+        assert channel == manager.invalidation_channel
+        assert loads(message) == {
+            "prefix": manager._namespace_key_prefix("products"),
+            "namespace": "products",
+            "generation": 1,
+        }
+
+
+class TestCacheManagerGenerations:
+    async def test_generation_is_folded_into_namespaced_keys(self):
+        manager = _make_cache_manager(generation=7)
+        key = await manager._resolve_cache_key(_make_request("/api/v1/products/detailed", {"limit": "50"}))
+        assert key.endswith(":g7")
+
+    async def test_paths_outside_namespaces_have_no_generation(self):
+        manager = _make_cache_manager(generation=7)
+        key = await manager._resolve_cache_key(_make_request("/api/v1/customization/pricing"))
+        assert ":g" not in key
+        manager._redis.get.assert_not_awaited()
+
+    async def test_invalidate_namespace_is_a_single_incr(self):
+        manager = _make_cache_manager()
+        manager._redis.incr = AsyncMock(return_value=3)
+        manager._redis.publish = AsyncMock()
+        manager._redis.scan_iter = MagicMock()
+        manager._redis.delete = AsyncMock()
+
+        await manager.invalidate_namespace("products")
+
+        manager._redis.incr.assert_awaited_once_with(manager._generation_key("products"))
+        manager._redis.scan_iter.assert_not_called()
+        manager._redis.delete.assert_not_awaited()
+
+    async def test_bumped_generation_changes_the_key(self):
+        manager = _make_cache_manager(generation=1)
+        request = _make_request(query={"limit": "50"})
+        before = await manager._resolve_cache_key(request)
+        manager._redis.get = AsyncMock(return_value="2")
+        after = await manager._resolve_cache_key(request)
+        assert before != after
+
+
+class TestCacheManagerBinaryEntries:
+    async def test_cache_response_stores_raw_body_bytes(self):
+        manager = _make_cache_manager()
+        request = _make_request(query={"limit": "50"})
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.setex = AsyncMock()
+        body = b'{"items":[{"id":1}]}'
+
+        await manager.cache_response(request, body, 200, ttl=60, content_type="application/json")
+
+        stored = manager._binary_redis.setex.call_args.kwargs["value"]
+        assert CachedResponse.from_bytes(stored).body == body
+
+
+class TestCacheKeyNormalization:
+    async def _key(self, manager: CacheManager, path: str = "/api/v1/products", query: dict | None = None) -> str:
+        return await manager._resolve_cache_key(_make_request(path, query))
+
+    async def test_equivalent_listing_queries_share_a_key(self):
+        manager = _make_cache_manager(generation=1)
+
+        verbose = await self._key(manager, query={"limit": "050", "brand": "ACME", "utm_source": "mail"})
+        plain = await self._key(manager, query={"brand": "acme", "limit": "50"})
+
+        assert verbose == plain
+        assert plain.endswith(":brand=acme&limit=50:g1")
+
+    async def test_surrounding_whitespace_keeps_its_own_key(self):
+        manager = _make_cache_manager()
+
+        # product-service matches " acme " literally in its ILIKE pattern, so it is a different result.
+        assert (
+            await self._key(manager, query={"brand": " acme "})
+            != await self._key(manager, query={"brand": "acme"})
+        )
+
+    async def test_default_values_and_trailing_slash_are_dropped(self):
+        manager = _make_cache_manager()
+
+        explicit = await self._key(manager, path="/api/v1/products/", query={"limit": "10", "offset": "0"})
+
+        assert explicit == await self._key(manager)
+        assert explicit.endswith(":/api/v1/products::g0")
+
+    async def test_decimal_values_are_written_in_one_form(self):
+        manager = _make_cache_manager()
+
+        assert (
+            await self._key(manager, query={"min_price": "10.50"})
+            == await self._key(manager, query={"min_price": "10.5"})
+        )
+
+    async def test_invalid_query_is_keyed_as_sent(self):
+        manager = _make_cache_manager()
+
+        key = await self._key(manager, query={"limit": "abc"})
+
+        assert ":limit=abc:" in key
+
+    async def test_routes_without_a_schema_keep_every_parameter(self):
+        manager = _make_cache_manager()
+
+        key = await self._key(manager, path="/api/v1/categories", query={"b": "2", "a": "1"})
+
+        assert ":a=1&b=2:" in key
+
+    async def test_long_queries_are_hashed(self):
+        manager = _make_cache_manager()
+
+        key = await self._key(manager, query={"search_term": "x" * 300})
+
+        assert ":sha256-" in key
+        assert "x" * 300 not in key
+
+    async def test_parameter_over_the_cap_bypasses_the_cache(self):
+        manager = _make_cache_manager()
+        manager.param_cardinality_cap = 100
+        manager.key_cardinality = {("products", "search_term"): 101, ("products", "brand"): 5}
+
+        assert await self._key(manager, query={"search_term": "lamp"}) is None
+        assert await self._key(manager, query={"brand": "acme"}) is not None
+
+    async def test_fill_records_key_and_parameter_cardinality(self):
+        manager = _make_cache_manager()
+        manager.cardinality_refresh_seconds = 60
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.setex = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        manager._redis.pipeline = MagicMock(return_value=pipe)
+
+        await manager.cache_response(_make_request(query={"brand": "Acme"}), b"{}", 200, ttl=60)
+
+        pfadds = [c.args for c in pipe.pfadd.call_args_list]
+        assert ("api-gateway:cache:cardinality:products:param:brand", "acme") in pfadds
+        assert pfadds[0][1].endswith(":brand=acme")
+        pipe.sadd.assert_called_once_with("api-gateway:cache:cardinality:products:params", "brand")
+
+    async def test_read_key_cardinality_counts_each_namespace(self):
+        manager = _make_cache_manager()
+        manager._redis.smembers = AsyncMock(side_effect=lambda key: {"brand"} if ":products:" in key else set())
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=lambda: [7, 3] if len(pipe.pfcount.call_args_list) == 2 else [0])
+        manager._redis.pipeline = MagicMock(return_value=pipe)
+
+        manager.namespaces = ["products"]
+
+        cardinality = await manager.read_key_cardinality()
+
+        assert cardinality == {("products", None): 7, ("products", "brand"): 3}
+
+
+class TestStaleWhileRevalidate:
+    def test_ttls_come_from_the_path_map(self):
+        manager = _make_cache_manager()
+        assert manager.get_cache_ttls("/api/v1/products/detailed") == (600, 3600)
+        assert manager.get_cache_ttls("/api/v1/unknown") == (manager.DEFAULT_TTL, manager.DEFAULT_STALE_TTL)
+        assert manager.get_cache_ttl("/api/v1/products") == 300
+
+    def test_entry_past_its_fresh_ttl_is_stale(self):
+        manager = _make_cache_manager()
+        entry = _entry(b"{}")
+        assert manager.is_fresh(entry, "/api/v1/products")
+        entry.stored_at -= 301
+        assert not manager.is_fresh(entry, "/api/v1/products")
+
+    async def test_redis_keeps_entry_until_stale_ttl(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.setex = AsyncMock()
+
+        await manager.cache_response(_make_request(), b"{}", 200, ttl=300, stale_ttl=1800)
+
+        assert manager._binary_redis.setex.call_args.kwargs["time"] == 1800
+
+    async def test_stale_local_entry_is_rechecked_in_redis(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        request = _make_request(query={"limit": "50"})
+        stale = _entry(b'{"old":1}')
+        stale.stored_at -= 10_000
+        local_cache.set(await manager._resolve_cache_key(request), stale, ttl=60)
+        refreshed = _entry(b'{"new":1}')
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[refreshed.to_bytes(), 1700])
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.pipeline.return_value = pipe
+
+        entry = await manager.get_cached_entry(request, is_public=True)
+
+        assert entry.body == b'{"new":1}'
+        assert local_cache.get(await manager._resolve_cache_key(request)).body == b'{"new":1}'
+
+    async def test_stale_local_entry_is_served_when_redis_has_nothing(self):
+        local_cache = LocalResponseCache(max_bytes=1024, max_entry_bytes=1024)
+        manager = _make_cache_manager(local_cache)
+        request = _make_request(query={"limit": "50"})
+        stale = _entry(b'{"old":1}')
+        stale.stored_at -= 10_000
+        local_cache.set(await manager._resolve_cache_key(request), stale, ttl=60)
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[None, -2])
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.pipeline.return_value = pipe
+
+        entry = await manager.get_cached_entry(request, is_public=True)
+
+        assert entry is stale
+
+
+class TestConditionalRequests:
+    def test_metadata_is_readable_from_the_entry_prefix(self):
+        entry = _entry(b"x" * 4096)
+        metadata = CacheEntryMetadata.from_bytes(entry.to_bytes()[:METADATA_READ_BYTES])
+        assert metadata.etag == entry.etag
+        assert metadata.status_code == 200
+
+    def test_etag_matching_uses_weak_comparison(self):
+        etag = _entry(b"{}").etag
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(etag, None)
+
+    async def test_metadata_lookup_reads_only_the_header_range(self):
+        manager = _make_cache_manager()
+        entry = _entry(b"x" * 4096)
+        manager._binary_redis = MagicMock()
+        manager._binary_redis.getrange = AsyncMock(return_value=entry.to_bytes()[:METADATA_READ_BYTES])
+
+        metadata = await manager.get_cached_metadata(_make_request(), is_public=True)
+
+        assert metadata.etag == entry.etag
+        manager._binary_redis.getrange.assert_awaited_once_with(
+            await manager._resolve_cache_key(_make_request()), 0, METADATA_READ_BYTES - 1,
+        )
+        manager._binary_redis.pipeline.assert_not_called()
+
+    async def test_matching_if_none_match_is_answered_with_304(self):
+        entry = _entry(b'{"items":[]}')
+        cache_manager = _make_cache_manager()
+        cache_manager.get_cached_metadata = AsyncMock(return_value=entry.metadata)
+        cache_manager.get_cached_entry = AsyncMock()
+        rate_limiter = MagicMock()
+        rate_limiter.is_rate_limited = AsyncMock(return_value=False)
+        middleware = GatewayRequestMiddleware(cache_manager, rate_limiter, coalescer=MagicMock())
+        request = _make_request()
+        request.headers = {"if-none-match": entry.etag}
+        app = AsyncMock()
+        sent = SentMessages()
+
+        await middleware(request, app, sent, is_public=True)
+
+        assert sent.status == 304
+        assert sent.headers["etag"] == entry.etag
+        assert sent.body == b""
+        cache_manager.get_cached_entry.assert_not_awaited()
+        app.assert_not_awaited()
+
+
+class TestCacheFillTee:
+    def _middleware(self, max_cacheable_bytes: int) -> GatewayRequestMiddleware:
+        cache_manager = _make_cache_manager()
+        cache_manager.cache_response = AsyncMock(
+            side_effect=lambda req, body, status, **kw: _entry(body, status, kw.get("encodings", ())),
+        )
+        return GatewayRequestMiddleware(
+            cache_manager,
+            MagicMock(),
+            coalescer=MagicMock(),
+            max_cacheable_bytes=max_cacheable_bytes,
+            compression_encodings=("gzip",),
+            compression_min_bytes=64,
+        )
+
+    @staticmethod
+    def _upstream(chunks: list[bytes], headers: dict[str, str] | None = None):
+        async def app(scope, receive, send):
+            raw_headers = {"content-type": "application/json", **(headers or {})}
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(name.encode(), value.encode()) for name, value in raw_headers.items()],
+            })
+            for index, chunk in enumerate(chunks):
+                await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+        return app
+
+    async def test_small_body_is_cached_and_tagged(self):
+        middleware = self._middleware(max_cacheable_bytes=1024)
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(_make_request(), self._upstream([b'{"items":', b"[]}"]), sent)
+
+        assert entry.body == b'{"items":[]}'
+        assert sent.body == b'{"items":[]}'
+        assert sent.headers["etag"] == entry.etag
+        assert sent.headers["content-length"] == str(len(entry.body))
+
+    async def test_matching_if_none_match_gets_304_after_fill(self):
+        middleware = self._middleware(max_cacheable_bytes=1024)
+        etag = _entry(b'{"items":[]}').etag
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(
+            _make_request(), self._upstream([b'{"items":[]}']), sent, if_none_match=etag,
+        )
+
+        assert entry.etag == etag
+        assert sent.status == 304
+        assert sent.body == b""
+
+    async def test_oversized_body_streams_through_uncached(self):
+        middleware = self._middleware(max_cacheable_bytes=8)
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(_make_request(), self._upstream([b"12345", b"67890", b"abc"]), sent)
+
+        assert entry is None
+        assert sent.status == 200
+        assert sent.body == b"1234567890abc"
+        middleware.cache_manager.cache_response.assert_not_awaited()
+
+    async def test_encoded_body_is_not_cached(self):
+        middleware = self._middleware(max_cacheable_bytes=1024)
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(
+            _make_request(), self._upstream([b"\x1f\x8b..."], headers={"content-encoding": "gzip"}), sent,
+        )
+
+        assert entry is None
+        assert sent.headers["content-encoding"] == "gzip"
+        assert sent.body == b"\x1f\x8b..."
+        middleware.cache_manager.cache_response.assert_not_awaited()
+
+    async def test_large_body_is_stored_and_sent_precompressed(self):
+        middleware = self._middleware(max_cacheable_bytes=4096)
+        body = b'{"items": [' + b'{"name": "product"},' * 50 + b"{}]}"
+        request = _make_request()
+        request.headers = {"accept-encoding": "gzip, deflate"}
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(request, self._upstream([body]), sent)
+
+        assert entry.body == body
+        assert sent.headers["content-encoding"] == "gzip"
+        assert sent.headers["vary"] == "Accept-Encoding"
+        assert sent.headers["etag"] == f"W/{entry.etag}"
+        assert sent.headers["content-length"] == str(len(sent.body))
+        assert gzip.decompress(sent.body) == body
+
+    async def test_small_body_is_not_compressed(self):
+        middleware = self._middleware(max_cacheable_bytes=1024)
+        request = _make_request()
+        request.headers = {"accept-encoding": "gzip"}
+        sent = SentMessages()
+
+        entry = await middleware._forward_and_cache(request, self._upstream([b'{"items":[]}']), sent)
+
+        assert entry.encoded == {}
+        assert "content-encoding" not in sent.headers
+        assert sent.body == b'{"items":[]}'
+
+
+class TestCompressedCacheHits:
+    body: bytes = b'{"items": [' + b'{"name": "product"},' * 50 + b"{}]}"
+
+    def test_hit_is_served_in_the_accepted_coding(self):
+        entry = _entry(self.body, encodings=("gzip",))
+
+        response = _make_cache_manager().build_response(entry, "br;q=1.0, gzip;q=0.8")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == f"W/{entry.etag}"
+        assert response.body == entry.encoded["gzip"]
+
+    def test_hit_without_accepted_coding_is_served_identity(self):
+        entry = _entry(self.body, encodings=("gzip",))
+
+        response = _make_cache_manager().build_response(entry, "gzip;q=0")
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == entry.etag
+        assert response.body == self.body
+
+    def test_weak_etag_of_compressed_hit_still_matches(self):
+        entry = _entry(self.body, encodings=("gzip",))
+        response = _make_cache_manager().build_response(entry, "gzip")
+
+        assert etag_matches(response.headers["etag"], entry.metadata.etag)
@@ -1,5 +1,5 @@
 """Unit tests for order, notification, and payment proxy routes."""
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
@@ -205,11 +205,15 @@ class TestMediaProxy:
     async def test_media_proxy_returns_binary_from_product_service(
         self, client: AsyncClient, mock_forward: AsyncMock
     ):
-        mock_http_client = AsyncMock()
-        mock_http_client.get = AsyncMock(
+        async def image_chunks():
+            yield b"image-"
+            yield b"bytes"
+
+        mock_http_client = MagicMock()
+        mock_http_client.send = AsyncMock(
             return_value=HttpxResponse(
                 status_code=200,
-                content=b"image-bytes",
+                content=image_chunks(),
                 headers={"content-type": "image/png"},
             )
         )
@@ -220,4 +224,5 @@ class TestMediaProxy:
         assert response.status_code == 200
         assert response.content == b"image-bytes"
         assert response.headers["content-type"].startswith("image/png")
+        assert mock_http_client.send.call_args.kwargs["stream"] is True
         mock_forward.assert_not_awaited()
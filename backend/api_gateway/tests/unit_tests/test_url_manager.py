@@ -80,3 +80,10 @@ class TestBuildUrl:
         um = _make_url_manager(instances=instances)
         url = um.build_url("user-service", "/login")
         assert url.startswith("http://user-service-1:8001") or url.startswith("http://user-service-2:8001")
+
+    def test_builds_url_on_given_instance(self):
+        instances = ["http://user-service-1:8001", "http://user-service-2:8001"]
+        um = _make_url_manager(instances=instances)
+        instance = um.load_balancer.instances("user-service")[1]
+        url = um.build_url("user-service", "/login", instance=instance)
+        assert url == "http://user-service-2:8001/api/v1/login"
@@ -0,0 +1,125 @@
+"""
+In-process RPS of GET /api/v1/products through the full api-gateway middleware stack.
+
+Requests are ASGI calls straight into the gateway app, with no server or network in
+between. The upstream, Redis, auth and rate limiting are mocked, and every request
+misses the cache, so the number measures the gateway's own per-request overhead.
+Use gateway_rps_tests.js to measure a deployed gateway instead.
+
+Run from backend/api_gateway with the gateway's settings in the environment:
+
+    python ../k6/gateway_asgi_rps.py [--requests 4000] [--concurrency 50]
+
+The script also runs against older trees (middleware-style auth), so two builds can
+be compared on the same machine.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from time import perf_counter
+from unittest.mock import AsyncMock, patch
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(BACKEND_DIR / "api_gateway"), str(BACKEND_DIR)]
+
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from main import app  # noqa: E402
+from resources import api_gateway_manager, create_api_gateway_resources, settings  # noqa: E402
+from shared.contracts.auth import TokenClaims  # noqa: E402
+
+BODY = {"items": [{"id": index, "name": f"product {index}", "price": 9.99} for index in range(50)], "total": 50}
+USER = TokenClaims(email="bench@example.com", id="00000000-0000-0000-0000-000000000001", role="user")
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "server": ("testserver", 80),
+    "client": ("127.0.0.1", 1234),
+    "root_path": "",
+    "path": "/api/v1/products",
+    "raw_path": b"/api/v1/products",
+    "query_string": b"limit=50",
+    "headers": [(b"host", b"testserver")],
+}
+WARMUP_REQUESTS = 200
+
+
+def _patches(resources) -> list:
+    async def authenticate(request):
+        request.state.current_user = USER
+
+    async def middleware(request, call_next):
+        request.state.current_user = USER
+        return await call_next(request)
+
+    if hasattr(resources.auth, "authenticate"):
+        auth = patch.object(resources.auth, "authenticate", side_effect=authenticate)
+    else:
+        auth = patch.object(resources.auth, "middleware", side_effect=middleware)
+    return [
+        auth,
+        patch.object(resources.request_middleware.rate_limiter, "is_rate_limited", new=AsyncMock(return_value=False)),
+        patch.object(resources.cache, "get_cached_entry", new=AsyncMock(return_value=None)),
+        patch.object(resources.cache, "get_cache_key", new=AsyncMock(return_value=None)),
+        patch.object(resources.cache, "cache_response", new=AsyncMock(return_value=None)),
+        patch.object(api_gateway_manager, "forward_request", new=AsyncMock(side_effect=lambda *a, **k: JSONResponse(BODY))),
+    ]
+
+
+async def _request() -> None:
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await app(dict(SCOPE, headers=list(SCOPE["headers"])), receive, send)
+    if sent[0]["status"] != 200:
+        raise RuntimeError(f"unexpected response: {sent[0]}")
+
+
+async def run(requests: int, concurrency: int) -> float:
+    """Requests per second over *requests* calls spread across *concurrency* workers."""
+    settings.DEBUG_MODE = True
+    resources = create_api_gateway_resources()
+    app.state.resources = resources
+    patches = _patches(resources)
+    for active in patches:
+        active.start()
+    try:
+        for _ in range(WARMUP_REQUESTS):
+            await _request()
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                await _request()
+
+        per_worker = requests // concurrency
+        started = perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (perf_counter() - started)
+    finally:
+        for active in patches:
+            active.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rps = asyncio.run(run(args.requests, args.concurrency))
+    print(f"{rps:.0f} req/s ({args.requests} requests, concurrency {args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
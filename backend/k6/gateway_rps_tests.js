@@ -0,0 +1,34 @@
+import http from "k6/http";
+import { check } from "k6";
+
+// Closed-loop RPS of the gateway's /products path: a fixed number of VUs send requests
+// back to back, so `http_reqs` (per second) is the throughput the gateway sustains.
+// Run once per build to compare middleware changes, e.g. `k6 run -e VUS=100 gateway_rps_tests.js`.
+// BYPASS_CACHE=1 gives every request its own max_price, far above any product price. The
+// gateway keeps max_price in the cache key (unknown params are dropped), so each request
+// misses the cache and goes upstream, while the result stays that of the plain listing.
+export const options = {
+	scenarios: {
+		rps: {
+			executor: "constant-vus",
+			vus: Number(__ENV.VUS || 50),
+			duration: __ENV.DURATION || "1m",
+		},
+	},
+
+	thresholds: {
+		http_req_failed: ["rate<0.01"],
+	},
+};
+
+const BASE_URL = __ENV.BASE_URL || "http://127.0.0.1:8000";
+const BYPASS_CACHE = __ENV.BYPASS_CACHE === "1";
+
+export default function () {
+	const query = BYPASS_CACHE ? `limit=50&max_price=${1e9 + __VU * 1e6 + __ITER}` : "limit=50";
+	const res = http.get(`${BASE_URL}/api/v1/products?${query}`);
+
+	check(res, {
+		"status 200": (r) => r.status === 200,
+	});
+}
@@ -2,12 +2,11 @@ from collections.abc import AsyncIterator
 from datetime import datetime
 from contextlib import asynccontextmanager
 import os
-from time import perf_counter
 
 from uvicorn import run
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response as PlainResponse
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, Response, HTTPException
 from pydantic import ValidationError
 from fastapi.exceptions import ResponseValidationError, RequestValidationError
 from prometheus_client import CollectorRegistry, generate_latest, multiprocess, REGISTRY
@@ -16,6 +15,7 @@ from routes.orders_routes import order_routes
 from models import Base
 from shared.exceptions.base_exceptions import (BaseAPIException, RateLimitExceededError)
 from shared.middleware.logging_middleware import add_logging_middleware
+from shared.middleware.service_middleware import RequestGuardMiddleware, RequestMetricsMiddleware
 from shared.telemetry import setup_tracing
 from prometheus_fastapi_instrumentator import Instrumentator
 from config import logger, settings
@@ -55,21 +55,14 @@ setup_tracing(app, service_name="order-service")
 
 Instrumentator().instrument(app)
 
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    """Records request latency into a multiprocess-safe histogram."""
-    if internal_access_helper.is_internal_path(request.url.path):
-        return await call_next(request)
-
-    start = perf_counter()
-    response = await call_next(request)
-    duration = perf_counter() - start
-    request_metrics_helper.observe(request=request, response=response, duration=duration)
-    return response
+app.add_middleware(
+    RequestMetricsMiddleware,
+    observe=request_metrics_helper.observe,
+    skip_path=internal_access_helper.is_internal_path,
+)
 
 
-@app.middleware("http")
-async def host_validation_middleware(request: Request, call_next):
+async def host_validation(request: Request) -> Response | None:
     """
     Validates the HTTP Host header against ALLOWED_HOSTS to prevent DNS-rebinding
     attacks.
@@ -81,11 +74,11 @@ async def host_validation_middleware(request: Request, call_next):
       is the Docker service name, not a public hostname
     """
     if settings.DEBUG_MODE or internal_access_helper.is_internal_client(request):
-        return await call_next(request)
+        return None
 
     host = request.headers.get("host", "").split(":")[0]
     if host in settings.ALLOWED_HOSTS:
-        return await call_next(request)
+        return None
 
     logger.warning(f"Invalid Host header: {host} from {request.client}")
     raise HTTPException(
@@ -95,6 +88,9 @@ async def host_validation_middleware(request: Request, call_next):
     )
 
 
+app.add_middleware(RequestGuardMiddleware, guard=host_validation)
+
+
 @app.get("/health", tags=["Health Check"])
 async def health_check():
     """
@@ -1,4 +1,4 @@
-from fastapi import Request, Response
+from fastapi import Request
 from prometheus_client import Histogram
 
 
@@ -15,7 +15,7 @@ class RequestMetricsHelper:
             buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
         )
 
-    def observe(self, request: Request, response: Response, duration: float) -> None:
+    def observe(self, request: Request, status_code: int, duration: float) -> None:
         if self._request_latency is None:
             return
 
@@ -24,7 +24,7 @@ class RequestMetricsHelper:
         self._request_latency.labels(
             method=request.method,
             handler=handler,
-            status=f"{response.status_code // 100}xx",
+            status=f"{status_code // 100}xx",
         ).observe(duration)
 
 
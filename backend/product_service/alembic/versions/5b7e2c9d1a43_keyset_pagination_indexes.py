@@ -0,0 +1,48 @@
+"""keyset_pagination_indexes
+
+Extends the product sort indexes with a trailing id so keyset pages
+(WHERE (sort_col, id) > (:value, :id) ORDER BY sort_col, id) seek straight
+to the cursor instead of scanning OFFSET rows:
+  - newest first (default page order)          → (date_created, id)
+  - in-stock products sorted by newest          → (in_stock, date_created, id)
+  - price sort within category                  → (category_id, price, id)
+  - price sort / price range queries            → (price, id)
+
+Revision ID: 5b7e2c9d1a43
+Revises: c31a7d9e2f40
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = '5b7e2c9d1a43'
+down_revision: Union[str, Sequence[str], None] = 'c31a7d9e2f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_product_date_created_id', 'products', ['date_created', 'id'])
+
+    op.drop_index('idx_product_in_stock_date_created', table_name='products')
+    op.create_index('idx_product_in_stock_date_created', 'products', ['in_stock', 'date_created', 'id'])
+
+    op.drop_index('idx_product_category_price', table_name='products')
+    op.create_index('idx_product_category_price', 'products', ['category_id', 'price', 'id'])
+
+    op.drop_index('idx_product_price', table_name='products')
+    op.create_index('idx_product_price', 'products', ['price', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_product_price', table_name='products')
+    op.create_index('idx_product_price', 'products', ['price'])
+
+    op.drop_index('idx_product_category_price', table_name='products')
+    op.create_index('idx_product_category_price', 'products', ['category_id', 'price'])
+
+    op.drop_index('idx_product_in_stock_date_created', table_name='products')
+    op.create_index('idx_product_in_stock_date_created', 'products', ['in_stock', 'date_created'])
+
+    op.drop_index('idx_product_date_created_id', table_name='products')
@@ -0,0 +1,63 @@
+"""product_full_text_search
+
+Replaces sequential ILIKE '%term%' scans for product search:
+  - products.search_vector: generated tsvector over name (A), brand (B)
+    and description (C), with a GIN index → search_vector @@ query, ts_rank
+  - pg_trgm GIN indexes on name and brand → fuzzy word matching, and the
+    ILIKE '%value%' name / brand filters
+
+Revision ID: 8d3f61b0c2e7
+Revises: 5b7e2c9d1a43
+Create Date: 2026-10-17
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = '8d3f61b0c2e7'
+down_revision: Union[str, Sequence[str], None] = '5b7e2c9d1a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION: str = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # ── products: full-text search ───────────────────────────────────────────
+    op.add_column(
+        'products',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index('idx_product_search_vector', 'products', ['search_vector'], postgresql_using='gin')
+
+    # ── products: trigram indexes for fuzzy matching / ILIKE filters ────────
+    op.create_index(
+        'idx_product_name_trgm', 'products', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'idx_product_brand_trgm', 'products', ['brand'],
+        postgresql_using='gin', postgresql_ops={'brand': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_product_brand_trgm', table_name='products')
+    op.drop_index('idx_product_name_trgm', table_name='products')
+    op.drop_index('idx_product_search_vector', table_name='products')
+    op.drop_column('products', 'search_vector')
+    # pg_trgm is left installed; other database objects may rely on it.
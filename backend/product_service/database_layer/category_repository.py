@@ -16,19 +16,16 @@ class CategoryRepository(BaseRepository[ProductCategory]):
     def __init__(self, session: AsyncSession):
         super().__init__(session, ProductCategory)
 
-    async def get_or_create_id_by_name(self, name: str) -> UUID:
-        statement = (
+    async def get_or_create_ids_by_names(self, names: list[str]) -> dict[str, UUID]:
+        """Map every name to its category id, creating the missing ones in one statement."""
+        if not names:
+            return {}
+        await self.session.execute(
             insert(ProductCategory)
-            .values(name=name)
+            .values([{"name": name} for name in names])
             .on_conflict_do_nothing(index_elements=["name"])
-            .returning(ProductCategory.id)
         )
-        created_id = (await self.session.execute(statement)).scalar_one_or_none()
-        if created_id:
-            return created_id
-        existing_id = (
-            await self.session.execute(
-                select(ProductCategory.id).where(ProductCategory.name == name)
-            )
-        ).scalar_one()
-        return existing_id
+        rows = await self.session.execute(
+            select(ProductCategory.name, ProductCategory.id).where(ProductCategory.name.in_(names))
+        )
+        return {name: category_id for name, category_id in rows.all()}
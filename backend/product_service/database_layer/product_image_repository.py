@@ -1,9 +1,10 @@
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, exists, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from shared.database_layer.database_layer import BaseRepository
+from shared.database_layer.database_layer import BaseRepository, unnest_rows
 from models.product_image_models import ProductImage
 
 
@@ -26,3 +27,31 @@ class ProductImageRepository(BaseRepository[ProductImage]):
             select(ProductImage).where(ProductImage.product_id == product_id)
         )
         return list(result.scalars().all())
+
+    async def sync_images(self, product_ids: list[UUID], rows: list[dict[str, Any]]) -> None:
+        """
+        Make *rows* (``id``, ``product_id``, ``image_url``) the images of *product_ids*:
+        one DELETE for URLs no longer listed, one INSERT for URLs not stored yet.
+        Unchanged images keep their ids.
+        """
+        if not product_ids:
+            return
+        columns = [ProductImage.__table__.c[name] for name in ["id", "product_id", "image_url"]]
+        incoming = unnest_rows(columns, rows)
+        same_image = and_(
+            incoming.c.product_id == ProductImage.product_id,
+            incoming.c.image_url == ProductImage.image_url,
+        )
+        await self.session.execute(
+            delete(ProductImage).where(
+                ProductImage.product_id.in_(product_ids),
+                ~exists().where(same_image),
+            )
+        )
+        if rows:
+            await self.session.execute(
+                insert(ProductImage).from_select(
+                    [column.key for column in columns],
+                    select(*(incoming.c[column.key] for column in columns)).where(~exists().where(same_image)),
+                )
+            )
@@ -1,10 +1,13 @@
 from uuid import UUID
 
-from sqlalchemy import select, update
+from typing import Any
+
+from sqlalchemy import Row, Select, func, literal, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import insert, websearch_to_tsquery
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.product_models import Product
-from shared.database_layer.database_layer import BaseRepository
+from shared.database_layer.database_layer import BaseRepository, unnest_rows
 from shared.database_layer.repository_mixins import AdvancedQueryMixin
 
 
@@ -19,27 +22,84 @@ class ProductRepository(AdvancedQueryMixin[Product], BaseRepository[Product]):
     # String fields that should use equality rather than ILIKE in get_all().
     EQUAL_ONLY_FIELDS: list[str] = ["id", "uuid"]
 
+    # Search fields folded into Product.search_vector; any other search field falls back to ILIKE.
+    FULL_TEXT_FIELDS: frozenset[str] = frozenset({"name", "brand", "description"})
+    # Search fields with a trigram index: matched by word similarity, so typos and
+    # partial words ("lapt") still find the product.
+    FUZZY_FIELDS: list[str] = ["name", "brand"]
+    TEXT_SEARCH_CONFIG: str = "english"
+
+    # Columns a supplier import overwrites on an existing (supplier_id, pid) row.
+    SUPPLIER_UPDATE_FIELDS: list[str] = [
+        "name", "supplier_category_id", "description", "category_id", "brand",
+        "quantity", "price", "in_stock", "sku", "image_url",
+    ]
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, Product)
 
-    async def get_by_supplier_pid(
-        self,
-        supplier_id: str,
-        pid: str,
-        load_relations: list[str] | None = None,
-    ) -> Product | None:
-        """Get a product by its stable supplier identity."""
-        query = select(Product).where(
-            Product.supplier_id == supplier_id,
-            Product.pid == pid,
+    async def upsert_by_supplier_pid(self, rows: list[dict[str, Any]]) -> list[Row]:
+        """
+        Insert or update a batch of supplier products in one
+        ``INSERT ... SELECT FROM unnest(...) ON CONFLICT (supplier_id, pid) DO UPDATE``.
+
+        Each row carries an ``id`` (used only when the product is new) plus the
+        SUPPLIER_UPDATE_FIELDS; (supplier_id, pid) must be unique within *rows*.
+        Returns one ``(id, supplier_id, pid, inserted)`` row per product.
+        """
+        if not rows:
+            return []
+        columns = [Product.__table__.c[name] for name in ["id", "supplier_id", "pid", *self.SUPPLIER_UPDATE_FIELDS]]
+        # A stable row order keeps concurrent imports from locking the same products in opposite orders.
+        rows = sorted(rows, key=lambda row: (row["supplier_id"], row["pid"]))
+        incoming = unnest_rows(columns, rows)
+        statement = insert(Product).from_select(
+            [column.key for column in columns],
+            select(*(incoming.c[column.key] for column in columns)),
         )
-        if load_relations:
-            from sqlalchemy.orm import selectinload
-            for relation in load_relations:
-                if hasattr(Product, relation):
-                    query = query.options(selectinload(getattr(Product, relation)))
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        statement = statement.on_conflict_do_update(
+            index_elements=["supplier_id", "pid"],
+            set_={
+                **{name: statement.excluded[name] for name in self.SUPPLIER_UPDATE_FIELDS},
+                "date_updated": func.now(),
+            },
+        ).returning(
+            Product.id,
+            Product.supplier_id,
+            Product.pid,
+            # xmax is 0 only for a freshly inserted row version
+            literal_column("xmax = 0").label("inserted"),
+        )
+        return list((await self.session.execute(statement)).all())
+
+    def _apply_search(self, query: Select, search_term: str, search_fields: list[str], ranked: bool) -> Select:
+        """
+        Full-text search over search_vector (GIN) plus trigram word similarity on
+        FUZZY_FIELDS, ranked by ts_rank and then name similarity.
+        """
+        if not self.FULL_TEXT_FIELDS.intersection(search_fields):
+            return super()._apply_search(query, search_term, search_fields, ranked)
+
+        ts_query = websearch_to_tsquery(self.TEXT_SEARCH_CONFIG, search_term)
+        conditions = [Product.search_vector.bool_op("@@")(ts_query)]
+        conditions += [
+            literal(search_term).bool_op("<%")(getattr(Product, field))
+            for field in self.FUZZY_FIELDS
+            if field in search_fields
+        ]
+        conditions += [
+            getattr(Product, field).ilike(f"%{search_term}%")
+            for field in search_fields
+            if field not in self.FULL_TEXT_FIELDS and hasattr(Product, field)
+        ]
+        query = query.where(or_(*conditions))
+        if ranked:
+            query = query.order_by(
+                func.ts_rank(Product.search_vector, ts_query).desc(),
+                func.word_similarity(search_term, Product.name).desc(),
+                Product.id,
+            )
+        return query
 
     async def atomic_decrement_quantity(self, item_id: UUID, requested: int) -> Product | None:
         """Atomically decrement `quantity` by *requested* only if sufficient stock exists.
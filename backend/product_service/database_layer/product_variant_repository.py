@@ -1,10 +1,12 @@
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import delete, select, update
+from sqlalchemy import and_, delete, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.product_variant_models import ProductVariant
-from shared.database_layer.database_layer import BaseRepository
+from shared.database_layer.database_layer import BaseRepository, unnest_rows
 
 
 class ProductVariantRepository(BaseRepository[ProductVariant]):
@@ -24,6 +26,51 @@ class ProductVariantRepository(BaseRepository[ProductVariant]):
         )
         return list(result.scalars().all())
 
+    async def sync_supplier_variants(self, product_ids: list[UUID], rows: list[dict[str, Any]]) -> None:
+        """
+        Make *rows* the active variants of *product_ids* in two set-based statements:
+        upsert by (product_id, vid), keeping the local id of known variants, then
+        deactivate every active variant of those products that *rows* no longer lists.
+        """
+        if not product_ids:
+            return
+        fields = [
+            column.key for column in ProductVariant.__table__.c
+            if column.key not in {"active", "date_created", "date_updated"}
+        ]
+        columns = [ProductVariant.__table__.c[name] for name in fields]
+        rows = sorted(rows, key=lambda row: (row["product_id"], row["vid"]))
+        if rows:
+            incoming = unnest_rows(columns, rows)
+            statement = insert(ProductVariant).from_select(
+                fields, select(*(incoming.c[name] for name in fields))
+            )
+            await self.session.execute(
+                statement.on_conflict_do_update(
+                    constraint="uq_product_variant_product_id_vid",
+                    set_={
+                        **{name: statement.excluded[name] for name in fields if name not in {"id", "product_id", "vid"}},
+                        "active": True,
+                        "date_updated": func.now(),
+                    },
+                )
+            )
+        listed = unnest_rows([ProductVariant.__table__.c.product_id, ProductVariant.__table__.c.vid], rows, name="listed")
+        await self.session.execute(
+            update(ProductVariant)
+            .where(
+                ProductVariant.product_id.in_(product_ids),
+                ProductVariant.active.is_(True),
+                ~exists().where(
+                    and_(
+                        listed.c.product_id == ProductVariant.product_id,
+                        listed.c.vid == ProductVariant.vid,
+                    )
+                ),
+            )
+            .values(active=False)
+        )
+
     async def atomic_decrement_inventory(
         self, variant_id: UUID, requested: int
     ) -> ProductVariant | None:
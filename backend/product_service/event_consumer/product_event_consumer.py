@@ -8,9 +8,9 @@ from database_layer.category_repository import CategoryRepository
 from database_layer.supplier_import_repository import SupplierImportBatchRepository
 from exceptions.product_exceptions import ProductCreationError, ProductReleaseError
 from pydantic import ValidationError
-from sqlalchemy.exc import IntegrityError
 from models.outbox_models import OutboxEvent
 from models.supplier_import_models import SupplierImportBatch
+from schemas.product_schemas import CreateProduct
 from service_layer.product_service import ProductService
 from service_layer.product_image_service import ProductImageService
 from service_layer.category_service import CategoryService
@@ -225,8 +225,8 @@ class ProductEventConsumer:
         Steps:
         1. Parse the event
         2. Check idempotency
-        3. Map generic supplier products to CreateProduct DTOs
-        4. Persist via bulk_upsert_products
+        3. Resolve categories once and map/validate products to CreateProduct DTOs
+        4. Persist the valid ones via bulk_upsert_products (set-based, one pass)
         5. Persist import completed/failed feedback in the transactional outbox
         6. Invalidate product cache
         """
@@ -270,31 +270,27 @@ class ProductEventConsumer:
                     category_service=category_service,
                 )
 
+                # Categories are resolved once per batch; every product is then validated
+                # up front, so one bad row is rejected without a savepoint per product.
+                category_ids = await category_service.get_or_create_by_names(
+                    supplier_product.category_name for supplier_product in event.products
+                )
                 errors: list[str] = []
+                valid_products: list[CreateProduct] = []
                 for supplier_product in event.products:
                     pid = supplier_product.supplier_pid or "<missing>"
                     try:
-                        local_category_id = await category_service.get_or_create_by_name(
-                            supplier_product.category_name
-                        )
-                        product_data = SupplierProductMapper.map_supplier_product(
-                            supplier_product,
-                            local_category_id,
-                        )
-                        existing = await product_repository.get_by_supplier_pid(
-                            supplier_product.supplier_id,
-                            pid,
+                        if not supplier_product.supplier_pid or not supplier_product.supplier_id:
+                            raise ProductCreationError("Cannot upsert supplier product without supplier_id and pid.")
+                        valid_products.append(
+                            SupplierProductMapper.map_supplier_product(
+                                supplier_product,
+                                category_ids[supplier_product.category_name],
+                            )
                         )
-                        async with session.begin_nested():
-                            await product_service.upsert_product_by_pid(product_data)
-                        if existing:
-                            inbox.updated += 1
-                        else:
-                            inbox.imported += 1
                     except (
                         ProductCreationError,
                         ValidationError,
-                        IntegrityError,
                         ValueError,
                         ArithmeticError,
                     ) as product_error:
@@ -304,6 +300,10 @@ class ProductEventConsumer:
                             f"Rejected supplier product {pid} in batch {event.batch_id}: {product_error}"
                         )
 
+                counts = await product_service.bulk_upsert_products(valid_products)
+                inbox.imported += counts["inserted"]
+                inbox.updated += counts["updated"]
+                inbox.failed += counts["failed"]
                 inbox.errors = errors[:100]
                 await inbox_repository.update(inbox)
 
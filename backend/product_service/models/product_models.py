@@ -3,8 +3,8 @@ from typing import Any
 from uuid import UUID, uuid4
 
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, Index, inspect, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
+from sqlalchemy import DDL, Computed, ForeignKey, Index, event, inspect, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID as PostgresUUID
 
 from models.base import Base
 from shared.utils.models_mixins import TimestampMixin
@@ -19,19 +19,30 @@ class Product(Base, TimestampMixin):
         Index('idx_product_brand',      'brand'),
         Index('idx_product_category',   'category_id'),
         Index('idx_product_in_stock',   'in_stock'),
-        Index('idx_product_price',      'price'),          # range queries (min_price/max_price)
+        Index('idx_product_price',      'price', 'id'),    # range queries, keyset pages sorted by price
         Index('idx_product_pid',        'pid'),
         Index('idx_product_supplier_pid', 'supplier_id', 'pid', unique=True),
 
         # ── Composite indexes for the most common query patterns ─────────────
-        # "Show in-stock products" sorted by newest — the default browse query
-        Index('idx_product_in_stock_date_created', 'in_stock', 'date_created'),
+        # Sort indexes end with id: keyset pages seek to (sort value, id) and
+        # read forward instead of skipping OFFSET rows.
+        # Newest first — the default browse query and keyset page order
+        Index('idx_product_date_created_id', 'date_created', 'id'),
+        # "Show in-stock products" sorted by newest
+        Index('idx_product_in_stock_date_created', 'in_stock', 'date_created', 'id'),
         # "Browse by category, in-stock only" — most common e-commerce filter
         Index('idx_product_category_in_stock', 'category_id', 'in_stock'),
         # "Browse by brand, in-stock only"
         Index('idx_product_brand_in_stock', 'brand', 'in_stock'),
         # Sorting by price within a category
-        Index('idx_product_category_price', 'category_id', 'price'),
+        Index('idx_product_category_price', 'category_id', 'price', 'id'),
+
+        # ── Search ───────────────────────────────────────────────────────────
+        # Full-text search (search_vector @@ query, ranked by ts_rank)
+        Index('idx_product_search_vector', 'search_vector', postgresql_using='gin'),
+        # Fuzzy word matching, and ILIKE '%value%' on name / brand filters (pg_trgm)
+        Index('idx_product_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_product_brand_trgm', 'brand', postgresql_using='gin', postgresql_ops={'brand': 'gin_trgm_ops'}),
 
         # ── Partial index — only indexes in-stock rows ───────────────────────
         # Smallest possible index for the most common filter; Postgres uses this
@@ -53,6 +64,17 @@ class Product(Base, TimestampMixin):
     in_stock: Mapped[bool] = mapped_column(nullable=False)
     sku: Mapped[str | None] = mapped_column(nullable=True)
     image_url: Mapped[str | None] = mapped_column(nullable=True)
+    # Maintained by Postgres from name (weight A), brand (B) and description (C); never loaded by default.
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple'::regconfig, coalesce(brand, '')), 'B') || "
+            "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
 
     reviews: Mapped[list['ProductReview']] = relationship('ProductReview', back_populates='product', cascade='all, delete-orphan') # pyright: ignore[reportUndefinedVariable]
     images: Mapped[list['ProductImage']] = relationship('ProductImage', back_populates='product', cascade='all, delete-orphan') # pyright: ignore[reportUndefinedVariable]
@@ -76,6 +98,8 @@ class Product(Base, TimestampMixin):
         fields = []
 
         for column in inspector.columns:
+            if column.computed is not None:
+                continue
             field_info = {
                 "path": column.name,
                 "type": cls._map_sqlalchemy_type_to_adminjs(column.type),
@@ -112,5 +136,13 @@ class Product(Base, TimestampMixin):
         return f"Product(id={self.id}, pid={self.pid}, name={self.name}, category_id={self.category_id}, brand={self.brand}, in_stock={self.in_stock})"
 
 
+# The trigram indexes need pg_trgm; create it with the table (create_all / init_db), as the migration does.
+event.listen(
+    Product.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
 # Import variant model here so SQLAlchemy can resolve the relationship at mapper configuration time.
 from models.product_variant_models import ProductVariant  # noqa: E402, F401
@@ -11,7 +11,9 @@ from resources import settings
 from schemas.product_schemas import (
     CustomTshirtPricingResponse,
     CreateProduct,
+    DetailedProductPage,
     ProductBase,
+    ProductPage,
     ProductSchema,
     ProductUploadForm,
     ProductsFilterParams,
@@ -99,6 +101,29 @@ async def get_all_products_detailed(
     )
 
 
+@product_routes.get(
+    "/products/page",
+    response_model=ProductPage,
+    response_description="One page of products and the cursor of the next",
+    status_code=status.HTTP_200_OK,
+)
+async def get_products_page(product_service: product_service_dependency,
+                            filters_query: Annotated[ProductsFilterParams, Query()]) -> ProductPage:
+    """Keyset-paginated product listing: follow next_cursor instead of raising offset."""
+    return await product_service.get_products_page(filters_query=filters_query)
+
+
+@product_routes.get(
+    "/products/detailed/page",
+    response_model=DetailedProductPage,
+    response_description="One page of products with relations and the cursor of the next",
+    status_code=status.HTTP_200_OK,
+)
+async def get_products_page_detailed(product_service: product_service_dependency,
+                                     filters_query: Annotated[ProductsFilterParams, Query()]) -> DetailedProductPage:
+    return await product_service.get_products_page(filters_query=filters_query, with_relations=True)
+
+
 @product_routes.get(
     "/products/{product_id}",
     response_model=ProductBase,
@@ -7,6 +7,7 @@ from uuid import UUID, uuid4
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from fastapi import UploadFile, Form, File
 
+from shared.contracts.product import BaseFilters, ProductsFilterParams  # noqa: F401
 from schemas.category_schema import CategorySchema
 from schemas.product_image_schema import ImageType
 from schemas.review_schemas import ReviewSchema
@@ -59,15 +60,6 @@ class CreateProductVariant(BaseModel):
 
 # --- Product Schemas ---
 
-class BaseFilters(BaseModel):
-    # Pagination
-    offset: int = Field(default=0, ge=0, description="Number of records to skip")
-    limit: int = Field(default=10, gt=0, le=100, description="Maximum number of records to return")
-
-    # Sorting
-    sort_order: Optional[str] = Field(None, pattern="^(asc|desc)$")
-
-
 class ProductBase(BaseModel):
     """Base product schema with common attributes"""
 
@@ -203,70 +195,24 @@ class ProductSchema(ProductBase):
     variants: List[ProductVariantBase] = []
 
 
-class CreatedProduct(ProductBase):
-    id: UUID
-    date_created: datetime
-    date_updated: Optional[datetime] = None
-
-
-class ProductsFilterParams(BaseFilters):
-    # Sorting options
-    sort_by: Optional[str] = Field(
-        None, pattern="^(name|price|date_created|date_updated|quantity)$"
-    )
+class ProductPage(BaseModel):
+    """One keyset page of products; pass next_cursor as ?cursor= for the next one (None = last page)."""
 
-    # Filtering options
-    name: Optional[str] = None
-    brand: Optional[str] = None
-    category_id: Optional[UUID] = None
-    search_term: Optional[str] = Field(None, min_length=3, max_length=50)
-    in_stock: Optional[bool] = None
+    items: list[ProductBase]
+    next_cursor: str | None = None
 
-    # Price filters (exact and range)
-    price: Optional[Decimal] = None  # Exact price match
-    min_price: Optional[Decimal] = Field(None, ge=0)
-    max_price: Optional[Decimal] = Field(None, ge=0)
 
-    # Quantity filters (exact and range)
-    quantity: Optional[int] = None  # Exact quantity match
-    min_quantity: Optional[int] = Field(None, ge=0)
-    max_quantity: Optional[int] = Field(None, ge=0)
+class DetailedProductPage(BaseModel):
+    """One keyset page of products with relations."""
 
-    # Date range filters
-    date_created_from: Optional[datetime] = None
-    date_created_to: Optional[datetime] = None
-    date_updated_from: Optional[datetime] = None
-    date_updated_to: Optional[datetime] = None
+    items: list[ProductSchema]
+    next_cursor: str | None = None
 
-    @field_validator("in_stock", mode="before")
-    @classmethod
-    def convert_in_stock(cls, value):
-        """Convert string 'true'/'false' to boolean"""
-        if value is None:
-            return None
-        if isinstance(value, str):
-            return value.lower() == "true"
-        return value
 
-    @field_validator(
-        "date_created_from",
-        "date_created_to",
-        "date_updated_from",
-        "date_updated_to",
-        mode="before",
-    )
-    @classmethod
-    def parse_datetime(cls, value):
-        """Parse ISO datetime strings"""
-        if value is None:
-            return None
-        if isinstance(value, str):
-            try:
-                # Handle ISO format with 'Z' suffix
-                return datetime.fromisoformat(value.replace("Z", "+00:00"))
-            except ValueError:
-                return None
-        return value
+class CreatedProduct(ProductBase):
+    id: UUID
+    date_created: datetime
+    date_updated: Optional[datetime] = None
 
 
 class CJDropshippingFilterParams(BaseModel):
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from typing import Optional
 from uuid import UUID
 
@@ -79,12 +80,20 @@ class CategoryService:
         created = await self.repository.create(new_category)
         return created.id
 
-    async def get_or_create_by_name(self, name: str | None) -> UUID:
-        """Resolve an application category without interpreting supplier IDs as UUIDs."""
+    def _normalize_name(self, name: str | None) -> str:
         normalized = (name or self.default_category_name).lower().strip()
         if not normalized:
             normalized = self.default_category_name.lower().strip()
-        return await self.repository.get_or_create_id_by_name(normalized)
+        return normalized
+
+    async def get_or_create_by_names(self, names: Iterable[str | None]) -> dict[str | None, UUID]:
+        """
+        Resolve a batch of application categories (never interpreting supplier IDs as UUIDs)
+        in one round of queries, keyed by the names as given.
+        """
+        normalized = {name: self._normalize_name(name) for name in names}
+        category_ids = await self.repository.get_or_create_ids_by_names(sorted(set(normalized.values())))
+        return {name: category_ids[value] for name, value in normalized.items()}
 
     async def get_all_categories(self) -> list[CategorySchema]:
         categories = await self.repository.get_all()
@@ -19,9 +19,7 @@ from exceptions.product_exceptions import (
     ProductAlreadyExistsError
 )
 from models.category_models import ProductCategory
-from models.product_image_models import ProductImage
 from models.product_models import Product
-from models.product_variant_models import ProductVariant
 from models.inventory_reservation_models import InventoryReservation
 from service_layer.category_service import CategoryService
 from service_layer.product_image_service import ProductImageService
@@ -29,7 +27,9 @@ from shared.contracts.order import OrderItem as OrderItemBase
 from schemas.product_schemas import (
     CreateProduct,
     CreateProductVariant,
+    DetailedProductPage,
     ProductBase,
+    ProductPage,
     ProductSchema,
     ProductsFilterParams,
     UpdateProduct,
@@ -70,58 +70,19 @@ class ProductService:
         """Persist variants for a product."""
         if not variants:
             return
-        variant_models = [
-            ProductVariant(product_id=product_id, **variant.model_dump())
-            for variant in variants
-        ]
-        await self.variant_repository.create_many(variant_models)
+        await self.variant_repository.bulk_create(
+            [{"product_id": product_id, **variant.model_dump()} for variant in variants],
+            returning=False,
+        )
 
     async def _create_images(self, product_id: UUID, image_urls: list[str] | None) -> None:
         """Persist image URLs for a product."""
         if not image_urls:
             return
-        image_models = [ProductImage(product_id=product_id, image_url=url) for url in image_urls]
-        await self.image_repository.create_many(image_models)
-
-    async def _sync_variants(self, product_id: UUID, variants: list[CreateProductVariant] | None) -> None:
-        """Upsert supplier variants by VID while preserving local UUIDs."""
-        existing = {variant.vid: variant for variant in await self.variant_repository.get_by_product_id(product_id)}
-        incoming = {variant.vid: variant for variant in (variants or []) if variant.vid}
-
-        for vid, variant_data in incoming.items():
-            variant = existing.get(vid)
-            if variant is None:
-                await self.variant_repository.create(
-                    ProductVariant(product_id=product_id, active=True, **variant_data.model_dump())
-                )
-                continue
-            for field, value in variant_data.model_dump().items():
-                setattr(variant, field, value)
-            variant.active = True
-            await self.variant_repository.update(variant)
-
-        for vid, variant in existing.items():
-            if vid not in incoming and variant.active:
-                variant.active = False
-                await self.variant_repository.update(variant)
-
-    async def _sync_images(self, product_id: UUID, image_urls: list[str] | None) -> None:
-        """Reconcile image URLs without recreating unchanged image records."""
-        normalized_urls = list(dict.fromkeys(url for url in (image_urls or []) if url))
-        existing = await self.image_repository.get_by_product_id(product_id)
-        existing_by_url = {image.image_url: image for image in existing}
-        incoming = set(normalized_urls)
-
-        missing = [
-            ProductImage(product_id=product_id, image_url=url)
-            for url in normalized_urls
-            if url not in existing_by_url
-        ]
-        if missing:
-            await self.image_repository.create_many(missing)
-        for url, image in existing_by_url.items():
-            if url not in incoming:
-                await self.image_repository.delete(image)
+        await self.image_repository.bulk_create(
+            [{"product_id": product_id, "image_url": url} for url in image_urls],
+            returning=False,
+        )
 
     async def create_product_item(self, product_data: CreateProduct) -> ProductBase:
         existing_id = await self.repository.get_by_id(item_id=product_data.id)
@@ -155,76 +116,52 @@ class ProductService:
             # Re-raise other integrity errors
             raise ProductCreationError(f"Failed to create product: {str(e)}")
 
-    async def upsert_product_by_pid(self, product_data: CreateProduct) -> ProductBase:
-        """Create or update a product keyed by supplier plus external PID."""
-        if not product_data.pid or not product_data.supplier_id:
-            raise ProductCreationError("Cannot upsert supplier product without supplier_id and pid.")
-
-        category_id = await self._resolve_category_id(product_data.category_id)
-        existing = await self.repository.get_by_supplier_pid(
-            product_data.supplier_id,
-            product_data.pid,
-        )
-
-        if existing:
-            # Update scalar fields
-            existing.name = product_data.name
-            existing.supplier_category_id = product_data.supplier_category_id
-            existing.description = product_data.description
-            existing.category_id = category_id
-            existing.brand = product_data.brand
-            existing.quantity = product_data.quantity
-            existing.price = product_data.price
-            existing.in_stock = product_data.in_stock
-            existing.sku = product_data.sku
-            existing.image_url = product_data.image_url
-
-            await self._sync_variants(existing.id, product_data.variants)
-            await self._sync_images(existing.id, product_data.images)
-
-            await self.repository.update(existing)
-            return ProductBase.model_validate(existing)
-
-        # Create new product
-        new_product = Product(
-            id=uuid4(),
-            pid=product_data.pid,
-            supplier_id=product_data.supplier_id,
-            supplier_category_id=product_data.supplier_category_id,
-            sku=product_data.sku,
-            image_url=product_data.image_url,
-            **product_data.model_dump(exclude={"id", "pid", "supplier_id", "supplier_category_id", "sku", "image_url", "category_id", "variants", "images"})
-        )
-        new_product.category_id = category_id
-
-        try:
-            new_db_product = await self.repository.create(new_product)
-            await self._sync_variants(new_db_product.id, product_data.variants)
-            await self._sync_images(new_db_product.id, product_data.images)
-            return ProductBase.model_validate(new_db_product)
-        except IntegrityError as e:
-            if "products_category_id_fkey" in str(e):
-                raise ProductCreationError(f'Category with id "{category_id}" does not exist.')
-            raise ProductCreationError(f"Failed to create product: {str(e)}")
-
     async def bulk_upsert_products(self, products: list[CreateProduct]) -> dict[str, int]:
-        """Upsert multiple products by pid, returning counts."""
+        """
+        Upsert a batch of supplier products by (supplier_id, pid) with set-based statements:
+        one product upsert, one variant upsert plus deactivation, one image delete plus insert,
+        however many products the batch holds. Products must already be validated
+        (CreateProduct, existing category ids); a database error fails the whole batch.
+        Products without supplier_id or pid are counted as failed; a repeated
+        (supplier_id, pid) keeps its last occurrence.
+        """
         results: dict[str, int] = {"inserted": 0, "updated": 0, "failed": 0}
+        batch: dict[tuple[str, str], CreateProduct] = {}
         for product_data in products:
-            try:
-                existing = (
-                    await self.repository.get_by_supplier_pid(product_data.supplier_id, product_data.pid)
-                    if product_data.pid and product_data.supplier_id
-                    else None
-                )
-                async with self.repository.session.begin_nested():
-                    await self.upsert_product_by_pid(product_data)
-                if existing:
-                    results["updated"] += 1
-                else:
-                    results["inserted"] += 1
-            except ProductCreationError:
+            if not product_data.pid or not product_data.supplier_id:
                 results["failed"] += 1
+                continue
+            batch[(product_data.supplier_id, product_data.pid)] = product_data
+        if not batch:
+            return results
+
+        written = await self.repository.upsert_by_supplier_pid([
+            {
+                "id": uuid4(),
+                **product_data.model_dump(include={"supplier_id", "pid", *ProductRepository.SUPPLIER_UPDATE_FIELDS}),
+            }
+            for product_data in batch.values()
+        ])
+        product_ids: dict[tuple[str, str], UUID] = {}
+        for row in written:
+            product_ids[(row.supplier_id, row.pid)] = row.id
+            results["inserted" if row.inserted else "updated"] += 1
+
+        variant_rows: list[dict[str, Any]] = []
+        image_rows: list[dict[str, Any]] = []
+        for key, product_data in batch.items():
+            product_id = product_ids[key]
+            variants = {variant.vid: variant for variant in (product_data.variants or []) if variant.vid}
+            variant_rows += [
+                {"id": uuid4(), "product_id": product_id, **variant.model_dump()}
+                for variant in variants.values()
+            ]
+            image_rows += [
+                {"id": uuid4(), "product_id": product_id, "image_url": url}
+                for url in dict.fromkeys(url for url in (product_data.images or []) if url)
+            ]
+        await self.variant_repository.sync_supplier_variants(list(product_ids.values()), variant_rows)
+        await self.image_repository.sync_images(list(product_ids.values()), image_rows)
         return results
 
     async def create_product_with_images(self, product_data: ProductUploadForm) -> ProductSchema:
@@ -255,7 +192,9 @@ class ProductService:
 
     async def get_all_products_without_relations(self,
                                                 filters_query: Annotated[ProductsFilterParams, Query()]) -> list[ProductBase]:
-        params = self.filter_parser.parse_filter_params(filter_query=filters_query)
+        params = self.filter_parser.parse_filter_params(
+            filter_query=filters_query, search_fields=self.product_search_fileds,
+        )
         products: list[Product] = await self.repository.get_all(**params)
         if not products:
             raise ProductNotFoundError("No products found with the given criteria.")
@@ -264,13 +203,41 @@ class ProductService:
     async def get_all_products_with_relations(self,
                                               filters_query: Annotated[ProductsFilterParams, Query()]) -> list[ProductSchema]:
         # Parse filters using helper method and add relations
-        params = self.filter_parser.parse_filter_params(filter_query=filters_query)
+        params = self.filter_parser.parse_filter_params(
+            filter_query=filters_query, search_fields=self.product_search_fileds,
+        )
         params["load_relations"] = self.product_relations
         products = await self.repository.get_all(**params)
         if not products:
             raise ProductNotFoundError("No products found with the given criteria.")
         return [ProductSchema.model_validate(product) for product in products]
 
+    async def get_products_page(self,
+                                filters_query: Annotated[ProductsFilterParams, Query()],
+                                with_relations: bool = False) -> ProductPage | DetailedProductPage:
+        """
+        One keyset page of products, newest first unless sort_by says otherwise.
+        One extra row is fetched to tell whether a next page exists; an empty page is not an error.
+        """
+        params = self.filter_parser.parse_filter_params(
+            filter_query=filters_query, search_fields=self.product_search_fileds,
+        )
+        params["sort_by"] = params["sort_by"] or "date_created"
+        params["limit"] = filters_query.limit + 1
+        if with_relations:
+            params["load_relations"] = self.product_relations
+        products = await self.repository.get_all(**params)
+
+        next_cursor = None
+        if len(products) > filters_query.limit:
+            products = products[:filters_query.limit]
+            next_cursor = self.repository.cursor_for(products[-1], params["sort_by"], params["sort_order"])
+        if with_relations:
+            return DetailedProductPage(
+                items=[ProductSchema.model_validate(product) for product in products], next_cursor=next_cursor,
+            )
+        return ProductPage(items=[ProductBase.model_validate(product) for product in products], next_cursor=next_cursor)
+
     async def get_product_by_name(self, name: str) -> ProductBase:
         db_product = await self.repository.get_by_field("name", name.lower())
         if not db_product:
@@ -331,11 +298,16 @@ class ProductService:
                     + requested_item.quantity
                 )
 
-        for item in items:
-            product = await self.repository.get_by_id(
-                item.product_id,
+        # Every product and its variants in two queries, whatever the number of lines.
+        products = {
+            product.id: product
+            for product in await self.repository.get_by_ids(
+                list(requested_products),
                 load_relations=["variants"],
             )
+        }
+        for item in items:
+            product = products.get(item.product_id)
             if product is None:
                 raise ProductNotFoundError(f"Product with id {item.product_id} not found")
             if (
@@ -74,7 +74,7 @@ from schemas.image_generation_schema import GenerateImageResponse, ImageGenerati
 from shared.contracts.artwork import GeneratedArtworkAsset
 
 
-from shared.testing.helpers import allow_testserver_host
+from shared.testing.helpers import allow_testserver_host, skip_benchmarks_unless_enabled
 
 
 settings = get_settings()
@@ -89,6 +89,14 @@ class _AsyncContextManagerMock:
         return None
 
 
+# ---------------------------------------------------------------------------
+# Opt-in benchmarks (RUN_BENCHMARKS=1)
+# ---------------------------------------------------------------------------
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    skip_benchmarks_unless_enabled(items)
+
+
 # ---------------------------------------------------------------------------
 # Host-validation bypass for ASGI test client
 # ---------------------------------------------------------------------------
@@ -230,7 +238,6 @@ def mock_product_repository() -> MagicMock:
     repo.create = AsyncMock()
     repo.get_all = AsyncMock()
     repo.get_by_id = AsyncMock(return_value=None)
-    repo.get_by_supplier_pid = AsyncMock(return_value=None)
     repo.update_by_id = AsyncMock()
     repo.delete_by_id = AsyncMock()
     repo.get_many_by_field = AsyncMock()
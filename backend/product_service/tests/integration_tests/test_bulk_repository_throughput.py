@@ -0,0 +1,128 @@
+"""
+Set-based BaseRepository write paths against the real test database.
+
+The pass/fail checks count statements: a set-based write of ROWS rows sends as
+many statements as a write of one row, while the per-row loop sends its
+statements once per row. The rows/s comparison is an opt-in benchmark
+(``RUN_BENCHMARKS=1 pytest -s``).
+"""
+from time import perf_counter
+from uuid import uuid4
+
+import pytest
+
+from database_layer.category_repository import CategoryRepository
+from database_layer.product_image_repository import ProductImageRepository
+from models.product_image_models import ProductImage
+from models.product_models import Product
+from shared.testing.helpers import count_statements
+
+# One page of BaseRepository.BULK_BATCH_SIZE, so every set-based write is a single batch.
+ROWS = 1000
+
+
+async def _seed_product(session) -> Product:
+    category_id = (await CategoryRepository(session).get_or_create_ids_by_names(["benchmark"]))["benchmark"]
+    product = Product(
+        id=uuid4(), name="benchmark product", category_id=category_id,
+        brand="bench", quantity=1, price=1, in_stock=True,
+    )
+    session.add(product)
+    await session.flush()
+    return product
+
+
+def _image_rows(product_id, rows: int) -> list[dict]:
+    return [{"product_id": product_id, "image_url": f"/{index}.jpg"} for index in range(rows)]
+
+
+async def create_each(repository, product_id, rows):
+    for row in _image_rows(product_id, rows):
+        await repository.create(ProductImage(**row))
+
+
+async def create_many(repository, product_id, rows):
+    await repository.create_many([ProductImage(**row) for row in _image_rows(product_id, rows)])
+
+
+async def bulk_create(repository, product_id, rows):
+    await repository.bulk_create(_image_rows(product_id, rows))
+
+
+async def update_each(repository, product_id, rows):
+    images = await repository.bulk_create(_image_rows(product_id, rows))
+    for image in images:
+        await repository.update_by_id(image.id, {"image_color": "red"})
+
+
+async def update_many(repository, product_id, rows):
+    images = await repository.bulk_create(_image_rows(product_id, rows))
+    await repository.update_many([{"id": image.id, "image_color": "red"} for image in images])
+
+
+async def _statements(test_database_session_manager, write, rows: int) -> int:
+    async with test_database_session_manager.transaction() as session:
+        product = await _seed_product(session)
+        repository = ProductImageRepository(session)
+        with count_statements(test_database_session_manager.async_engine) as statements:
+            await write(repository, product.id, rows)
+        await session.rollback()
+    return len(statements)
+
+
+async def _rows_per_second(test_database_session_manager, write) -> float:
+    async with test_database_session_manager.transaction() as session:
+        product = await _seed_product(session)
+        repository = ProductImageRepository(session)
+        started = perf_counter()
+        await write(repository, product.id, ROWS)
+        elapsed = perf_counter() - started
+        await session.rollback()
+    return ROWS / elapsed
+
+
+@pytest.mark.parametrize("write", [create_many, bulk_create, update_many])
+async def test_set_based_writes_send_a_fixed_number_of_statements(test_database_session_manager, write) -> None:
+    await test_database_session_manager.truncate_all_tables(Product.metadata)
+    try:
+        single = await _statements(test_database_session_manager, write, 1)
+        batch = await _statements(test_database_session_manager, write, ROWS)
+    finally:
+        await test_database_session_manager.truncate_all_tables(Product.metadata)
+
+    assert batch == single
+
+
+async def test_per_row_create_sends_statements_for_every_row(test_database_session_manager) -> None:
+    await test_database_session_manager.truncate_all_tables(Product.metadata)
+    try:
+        single = await _statements(test_database_session_manager, create_each, 1)
+        batch = await _statements(test_database_session_manager, create_each, ROWS)
+    finally:
+        await test_database_session_manager.truncate_all_tables(Product.metadata)
+
+    assert batch == single * ROWS
+
+
+@pytest.mark.benchmark
+async def test_bulk_primitives_outrun_per_row_writes(test_database_session_manager) -> None:
+    await test_database_session_manager.truncate_all_tables(Product.metadata)
+    try:
+        results = {
+            name: await _rows_per_second(test_database_session_manager, write)
+            for name, write in [
+                ("create (per row)", create_each),
+                ("create_many", create_many),
+                ("bulk_create", bulk_create),
+                ("update_by_id (per row)", update_each),
+                ("update_many", update_many),
+            ]
+        }
+    finally:
+        await test_database_session_manager.truncate_all_tables(Product.metadata)
+
+    for name, rows_per_second in results.items():
+        print(f"{name:<24} {rows_per_second:>10,.0f} rows/s")
+    assert results["bulk_create"] > results["create (per row)"]
+    assert results["create_many"] > results["create (per row)"]
+    assert results["update_many"] > results["update_by_id (per row)"]
@@ -0,0 +1,111 @@
+"""
+ProductService.quote_order_items against the real test database.
+
+Carts of 1 to 100 lines are quoted: every quote must be complete and correctly
+priced, and must send the same statements whatever the cart size. The opt-in
+benchmark (``RUN_BENCHMARKS=1 pytest -s``) prints median milliseconds for the
+batched quote and for the former per-line lookup (one get_by_id with variants
+per line), and on the largest cart the batched quote must be faster.
+"""
+from decimal import Decimal
+from statistics import median
+from time import perf_counter
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from database_layer.category_repository import CategoryRepository
+from database_layer.product_repository import ProductRepository
+from models.product_models import Product
+from models.product_variant_models import ProductVariant
+from schemas.product_schemas import OrderQuoteLineRequest
+from service_layer.product_service import ProductService
+from shared.testing.helpers import count_statements
+
+CART_SIZES = [1, 10, 25, 50, 100]
+ROUNDS = 5
+
+
+async def _seed_products(session, count: int) -> list[Product]:
+    category_id = (await CategoryRepository(session).get_or_create_ids_by_names(["benchmark"]))["benchmark"]
+    products = [
+        Product(
+            id=uuid4(), name=f"quote product {index}", category_id=category_id, brand="bench",
+            quantity=1000, price=Decimal("9.99"), in_stock=True,
+        )
+        for index in range(count)
+    ]
+    session.add_all(products)
+    session.add_all(
+        ProductVariant(product_id=product.id, vid=f"v-{index}-{variant}", inventory_num=1000)
+        for index, product in enumerate(products)
+        for variant in range(3)
+    )
+    await session.flush()
+    return products
+
+
+def _lines(products: list[Product], size: int) -> list[OrderQuoteLineRequest]:
+    return [OrderQuoteLineRequest(product_id=product.id, quantity=1) for product in products[:size]]
+
+
+async def _median_ms(quote, lines: list[OrderQuoteLineRequest]) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        started = perf_counter()
+        await quote(lines)
+        timings.append((perf_counter() - started) * 1000)
+    return median(timings)
+
+
+async def test_quote_sends_the_same_statements_for_every_cart_size(test_database_session_manager) -> None:
+    await test_database_session_manager.truncate_all_tables(Product.metadata)
+    try:
+        async with test_database_session_manager.transaction() as session:
+            products = await _seed_products(session, max(CART_SIZES))
+            service = ProductService(repository=ProductRepository(session), product_image_service=MagicMock())
+
+            statements = {}
+            for size in CART_SIZES:
+                # Every quote starts from an empty identity map, as it does per request.
+                session.expunge_all()
+                with count_statements(test_database_session_manager.async_engine) as sent:
+                    quote = await service.quote_order_items(_lines(products, size))
+                statements[size] = len(sent)
+                assert len(quote.items) == size
+                assert quote.total_amount == Decimal("9.99") * size
+    finally:
+        await test_database_session_manager.truncate_all_tables(Product.metadata)
+
+    assert set(statements.values()) == {statements[1]}
+
+
+@pytest.mark.benchmark
+async def test_batched_quote_latency_across_cart_sizes(test_database_session_manager) -> None:
+    await test_database_session_manager.truncate_all_tables(Product.metadata)
+    try:
+        async with test_database_session_manager.transaction() as session:
+            products = await _seed_products(session, max(CART_SIZES))
+            repository = ProductRepository(session)
+            service = ProductService(repository=repository, product_image_service=MagicMock())
+
+            async def per_line_lookup(lines):
+                for line in lines:
+                    await repository.get_by_id(line.product_id, load_relations=["variants"])
+
+            results = {}
+            for size in CART_SIZES:
+                lines = _lines(products, size)
+                results[size] = (
+                    await _median_ms(service.quote_order_items, lines),
+                    await _median_ms(per_line_lookup, lines),
+                )
+    finally:
+        await test_database_session_manager.truncate_all_tables(Product.metadata)
+
+    print(f"{'lines':>5} {'batched ms':>11} {'per-line ms':>12}")
+    for size, (batched, per_line) in results.items():
+        print(f"{size:>5} {batched:>11.2f} {per_line:>12.2f}")
+    batched_100, per_line_100 = results[max(CART_SIZES)]
+    assert batched_100 < per_line_100
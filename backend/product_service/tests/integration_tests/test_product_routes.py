@@ -11,6 +11,9 @@ from decimal import Decimal
 import pytest
 from fastapi import status
 from httpx import AsyncClient
+from sqlalchemy import update
+
+from models.product_models import Product
 
 TEST_API = "/api/v1"
 
@@ -145,6 +148,101 @@ class TestGetAllProducts:
         assert all(p["in_stock"] for p in body)
 
 
+class TestSearchProducts:
+    async def test_search_matches_word_forms_in_description(self, integration_client: AsyncClient):
+        category = await _create_category(integration_client)
+        await _setup_product(integration_client, category["id"], name="trail shoe", description="Running shoes for rocky trails")
+        await _setup_product(integration_client, category["id"], name="desk lamp", description="Warm light for reading")
+
+        response = await integration_client.get(f"{TEST_API}/products", params={"search_term": "run"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["name"] for p in response.json()] == ["trail shoe"]
+
+    async def test_search_tolerates_partial_words(self, integration_client: AsyncClient):
+        category = await _create_category(integration_client)
+        await _setup_product(integration_client, category["id"], name="gaming laptop")
+
+        response = await integration_client.get(f"{TEST_API}/products", params={"search_term": "lapt"})
+        assert response.status_code == status.HTTP_200_OK
+        assert [p["name"] for p in response.json()] == ["gaming laptop"]
+
+    async def test_name_matches_rank_above_description_matches(self, integration_client: AsyncClient):
+        category = await _create_category(integration_client)
+        await _setup_product(integration_client, category["id"], name="laptop sleeve", description="Fits any laptop")
+        await _setup_product(integration_client, category["id"], name="ultrabook laptop", description="A thin laptop")
+        await _setup_product(integration_client, category["id"], name="usb hub", description="Adds ports to a laptop")
+
+        response = await integration_client.get(f"{TEST_API}/products", params={"search_term": "laptop"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()[-1]["name"] == "usb hub"
+
+
+# ===========================================================================
+# GET /api/v1/products/page
+# ===========================================================================
+
+class TestGetProductsPage:
+    async def test_cursor_walks_every_product_once(self, integration_client: AsyncClient):
+        category = await _create_category(integration_client)
+        for index, price in enumerate(["10.00", "20.00", "20.00", "30.00", "40.00"]):
+            await _setup_product(integration_client, category["id"], name=f"product {index}", price=price)
+
+        seen: list[str] = []
+        params = {"limit": 2, "sort_by": "price", "sort_order": "asc"}
+        while True:
+            response = await integration_client.get(f"{TEST_API}/products/page", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            seen.extend(product["id"] for product in page["items"])
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+
+        assert len(seen) == len(set(seen)) == 5
+
+    @pytest.mark.parametrize("sort_order", ["asc", "desc"])
+    async def test_cursor_pages_through_null_sort_values(
+        self, integration_client: AsyncClient, test_database_session_manager, sort_order: str
+    ):
+        category = await _create_category(integration_client)
+        ids = [
+            (await _setup_product(integration_client, category["id"], name=f"product {index}"))["id"]
+            for index in range(5)
+        ]
+        async with test_database_session_manager.transaction() as session:
+            await session.execute(
+                update(Product).where(Product.id.in_(ids[1:4])).values(date_updated=None)
+            )
+
+        seen: list[str] = []
+        params = {"limit": 2, "sort_by": "date_updated", "sort_order": sort_order}
+        while True:
+            response = await integration_client.get(f"{TEST_API}/products/page", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            seen.extend(product["id"] for product in page["items"])
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+
+        assert sorted(seen) == sorted(ids)
+
+    async def test_cursor_from_another_sort_is_rejected(self, integration_client: AsyncClient):
+        category = await _create_category(integration_client)
+        for index in range(2):
+            await _setup_product(integration_client, category["id"], name=f"product {index}")
+        first = (await integration_client.get(f"{TEST_API}/products/page", params={"limit": 1})).json()
+
+        response = await integration_client.get(
+            f"{TEST_API}/products/page", params={"cursor": first["next_cursor"], "sort_by": "price"}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def test_garbage_cursor_is_rejected(self, integration_client: AsyncClient):
+        response = await integration_client.get(f"{TEST_API}/products/page", params={"cursor": "not-a-cursor"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 # ===========================================================================
 # GET /api/v1/products/{product_id}
 # ===========================================================================
@@ -62,6 +62,29 @@ class TestCreateCategory:
         assert created.name == "home appliances"
 
 
+# ---------------------------------------------------------------------------
+# get_or_create_by_names
+# ---------------------------------------------------------------------------
+
+class TestGetOrCreateByNames:
+    async def test_resolves_a_batch_with_one_repository_call(
+        self,
+        category_service_unit,
+        mock_category_repository: MagicMock,
+    ) -> None:
+        shirts, default = uuid4(), uuid4()
+        mock_category_repository.get_or_create_ids_by_names = AsyncMock(
+            return_value={"t-shirts": shirts, "cjdropshipping": default}
+        )
+
+        result = await category_service_unit.get_or_create_by_names([" T-Shirts ", None, "t-shirts", ""])
+
+        assert result == {" T-Shirts ": shirts, None: default, "t-shirts": shirts, "": default}
+        mock_category_repository.get_or_create_ids_by_names.assert_awaited_once_with(
+            ["cjdropshipping", "t-shirts"]
+        )
+
+
 # ---------------------------------------------------------------------------
 # get_all_categories
 # ---------------------------------------------------------------------------
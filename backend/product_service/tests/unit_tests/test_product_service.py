@@ -47,8 +47,8 @@ class TestOrderQuote:
         mock_product_orm.price = Decimal("999.99")
         mock_product_orm.quantity = 5
         mock_product_orm.variants = [variant]
-        product_service_unit.repository.get_by_id = AsyncMock(
-            return_value=mock_product_orm
+        product_service_unit.repository.get_by_ids = AsyncMock(
+            return_value=[mock_product_orm]
         )
 
         quote = await product_service_unit.quote_order_items(
@@ -69,8 +69,8 @@ class TestOrderQuote:
     ) -> None:
         mock_product_orm.supplier_id = "cjdropshipping"
         mock_product_orm.variants = []
-        product_service_unit.repository.get_by_id = AsyncMock(
-            return_value=mock_product_orm
+        product_service_unit.repository.get_by_ids = AsyncMock(
+            return_value=[mock_product_orm]
         )
 
         with pytest.raises(ProductNotFoundError, match="no active variants"):
@@ -87,14 +87,48 @@ class TestOrderQuote:
         self, product_service_unit, mock_product_orm
     ) -> None:
         mock_product_orm.quantity = 3
-        product_service_unit.repository.get_by_id = AsyncMock(
-            return_value=mock_product_orm
+        product_service_unit.repository.get_by_ids = AsyncMock(
+            return_value=[mock_product_orm]
         )
         line = OrderQuoteLineRequest(product_id=mock_product_orm.id, quantity=2)
 
         with pytest.raises(ProductNotFoundError, match="Insufficient inventory"):
             await product_service_unit.quote_order_items([line, line])
 
+    async def test_quote_loads_every_line_with_one_repository_call(
+        self, product_service_unit, mock_product_orm
+    ) -> None:
+        other = SimpleNamespace(
+            id=uuid4(), name="second product", price=Decimal("4.00"), quantity=10,
+            in_stock=True, supplier_id=None, variants=[],
+        )
+        mock_product_orm.price = Decimal("10.00")
+        product_service_unit.repository.get_by_ids = AsyncMock(
+            return_value=[other, mock_product_orm]
+        )
+
+        quote = await product_service_unit.quote_order_items(
+            [
+                OrderQuoteLineRequest(product_id=mock_product_orm.id, quantity=1),
+                OrderQuoteLineRequest(product_id=other.id, quantity=2),
+                OrderQuoteLineRequest(product_id=mock_product_orm.id, quantity=3),
+            ]
+        )
+
+        product_service_unit.repository.get_by_ids.assert_awaited_once_with(
+            [mock_product_orm.id, other.id], load_relations=["variants"]
+        )
+        assert [line.product_id for line in quote.items] == [mock_product_orm.id, other.id, mock_product_orm.id]
+        assert quote.total_amount == Decimal("48.00")
+
+    async def test_quote_rejects_unknown_product(self, product_service_unit) -> None:
+        product_service_unit.repository.get_by_ids = AsyncMock(return_value=[])
+
+        with pytest.raises(ProductNotFoundError, match="not found"):
+            await product_service_unit.quote_order_items(
+                [OrderQuoteLineRequest(product_id=uuid4(), quantity=1)]
+            )
+
 
 # ---------------------------------------------------------------------------
 # create_product_item
@@ -245,6 +279,21 @@ class TestGetAllProducts:
         assert len(result) == 1
         assert result[0].id == mock_product_orm.id
 
+    async def test_search_covers_the_product_search_fields(
+        self,
+        product_service_unit,
+        mock_product_repository: MagicMock,
+        mock_product_orm: MagicMock,
+    ) -> None:
+        mock_product_repository.get_all.return_value = [mock_product_orm]
+
+        from schemas.product_schemas import ProductsFilterParams
+        await product_service_unit.get_all_products_without_relations(ProductsFilterParams(search_term="laptop"))
+
+        params = mock_product_repository.get_all.await_args.kwargs
+        assert params["search_term"] == "laptop"
+        assert params["search_fields"] == ["name", "description", "brand"]
+
     async def test_raises_when_no_products_found(
         self,
         product_service_unit,
@@ -257,6 +306,47 @@ class TestGetAllProducts:
             await product_service_unit.get_all_products_without_relations(ProductsFilterParams())
 
 
+class TestGetProductsPage:
+    async def test_extra_row_becomes_the_next_cursor(
+        self,
+        product_service_unit,
+        mock_product_repository: MagicMock,
+        mock_product_orm: MagicMock,
+    ) -> None:
+        mock_product_repository.get_all.return_value = [mock_product_orm, mock_product_orm, mock_product_orm]
+        mock_product_repository.cursor_for = MagicMock(return_value="next-page")
+
+        from schemas.product_schemas import ProductsFilterParams
+        page = await product_service_unit.get_products_page(ProductsFilterParams(limit=2, sort_by="price"))
+
+        assert len(page.items) == 2
+        assert page.next_cursor == "next-page"
+        assert mock_product_repository.get_all.await_args.kwargs["limit"] == 3
+        mock_product_repository.cursor_for.assert_called_once_with(mock_product_orm, "price", None)
+
+    async def test_last_page_has_no_cursor_and_defaults_to_newest_first(
+        self,
+        product_service_unit,
+        mock_product_repository: MagicMock,
+    ) -> None:
+        mock_product_repository.get_all.return_value = []
+
+        from schemas.product_schemas import ProductsFilterParams
+        page = await product_service_unit.get_products_page(ProductsFilterParams(cursor="abc"))
+
+        assert page.items == []
+        assert page.next_cursor is None
+        params = mock_product_repository.get_all.await_args.kwargs
+        assert params["sort_by"] == "date_created"
+        assert params["cursor"] == "abc"
+
+    def test_cursor_and_offset_are_exclusive(self) -> None:
+        from pydantic import ValidationError
+        from schemas.product_schemas import ProductsFilterParams
+        with pytest.raises(ValidationError):
+            ProductsFilterParams(cursor="abc", offset=20)
+
+
 # ---------------------------------------------------------------------------
 # update_product
 # ---------------------------------------------------------------------------
@@ -474,58 +564,61 @@ class TestReleaseInventory:
 
 
 class TestSupplierReconciliation:
-    async def test_sync_variants_preserves_ids_and_deactivates_missing(self) -> None:
-        product_id = uuid4()
-        retained = SimpleNamespace(id=uuid4(), vid="v1", active=True)
-        removed = SimpleNamespace(id=uuid4(), vid="v2", active=True)
+    async def test_bulk_upsert_writes_the_batch_with_set_based_calls(self) -> None:
+        category_id = uuid4()
+        existing_id, new_id = uuid4(), uuid4()
+        repository = MagicMock(session=MagicMock())
+        repository.upsert_by_supplier_pid = AsyncMock(return_value=[
+            SimpleNamespace(id=existing_id, supplier_id="cj", pid="p1", inserted=False),
+            SimpleNamespace(id=new_id, supplier_id="cj", pid="p2", inserted=True),
+        ])
         variant_repository = MagicMock()
-        variant_repository.get_by_product_id = AsyncMock(return_value=[retained, removed])
-        variant_repository.create = AsyncMock()
-        variant_repository.update = AsyncMock()
+        variant_repository.sync_supplier_variants = AsyncMock()
         image_repository = MagicMock()
-        image_repository.get_by_product_id = AsyncMock(return_value=[])
-
+        image_repository.sync_images = AsyncMock()
         service = ProductService(
-            repository=MagicMock(session=MagicMock()),
+            repository=repository,
             product_image_service=MagicMock(),
             variant_repository=variant_repository,
             image_repository=image_repository,
         )
-        await service._sync_variants(
-            product_id,
-            [CreateProductVariant(vid="v1", variant_sku="updated")],
-        )
 
-        assert retained.id is not None
-        assert retained.variant_sku == "updated"
-        assert retained.active is True
-        assert removed.active is False
-        variant_repository.create.assert_not_awaited()
-        assert variant_repository.update.await_count == 2
-
-    async def test_sync_images_keeps_unchanged_rows(self) -> None:
-        product_id = uuid4()
-        kept = SimpleNamespace(id=uuid4(), image_url="https://example.com/keep.jpg")
-        removed = SimpleNamespace(id=uuid4(), image_url="https://example.com/remove.jpg")
-        image_repository = MagicMock()
-        image_repository.get_by_product_id = AsyncMock(return_value=[kept, removed])
-        image_repository.create_many = AsyncMock()
-        image_repository.delete = AsyncMock()
+        def supplier_product(pid: str | None, **overrides) -> CreateProduct:
+            return CreateProduct(
+                pid=pid, supplier_id="cj", name=f"product {pid}", category_id=category_id,
+                quantity=1, price=Decimal("5.00"), in_stock=True, **overrides,
+            )
 
+        results = await service.bulk_upsert_products([
+            supplier_product("p1", variants=[CreateProductVariant(vid="v1", variant_sku="stale")]),
+            supplier_product("p2", images=["https://example.com/a.jpg", "https://example.com/a.jpg", ""]),
+            supplier_product(None),
+            supplier_product("p1", variants=[CreateProductVariant(vid="v1", variant_sku="fresh")]),
+        ])
+
+        assert results == {"inserted": 1, "updated": 1, "failed": 1}
+        rows = repository.upsert_by_supplier_pid.await_args.args[0]
+        assert [row["pid"] for row in rows] == ["p1", "p2"]
+        product_ids, variant_rows = variant_repository.sync_supplier_variants.await_args.args
+        assert set(product_ids) == {existing_id, new_id}
+        assert [(row["product_id"], row["variant_sku"]) for row in variant_rows] == [(existing_id, "fresh")]
+        _, image_rows = image_repository.sync_images.await_args.args
+        assert [(row["product_id"], row["image_url"]) for row in image_rows] == [(new_id, "https://example.com/a.jpg")]
+
+    async def test_bulk_upsert_skips_the_database_when_nothing_is_valid(self) -> None:
+        repository = MagicMock(session=MagicMock())
+        repository.upsert_by_supplier_pid = AsyncMock()
         service = ProductService(
-            repository=MagicMock(session=MagicMock()),
+            repository=repository,
             product_image_service=MagicMock(),
             variant_repository=MagicMock(),
-            image_repository=image_repository,
-        )
-        await service._sync_images(
-            product_id,
-            ["https://example.com/keep.jpg", "https://example.com/new.jpg"],
+            image_repository=MagicMock(),
         )
 
-        created = image_repository.create_many.await_args.args[0]
-        assert [image.image_url for image in created] == ["https://example.com/new.jpg"]
-        image_repository.delete.assert_awaited_once_with(removed)
+        results = await service.bulk_upsert_products([])
+
+        assert results == {"inserted": 0, "updated": 0, "failed": 0}
+        repository.upsert_by_supplier_pid.assert_not_awaited()
 
 
 # ---------------------------------------------------------------------------
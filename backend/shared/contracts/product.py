@@ -1,8 +1,14 @@
-"""Minimal product API response contract consumed by supplier-service."""
+"""
+Product API contracts shared across services: the response shape consumed by
+supplier-service, and the listing query the gateway normalizes cache keys with.
+"""
 
+from datetime import datetime
+from decimal import Decimal
+from typing import ClassVar, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class ProductVariantLookup(BaseModel):
@@ -14,3 +20,89 @@ class ProductVariantLookup(BaseModel):
 class ProductWithVariants(BaseModel):
     pid: str | None = None
     variants: list[ProductVariantLookup] = Field(default_factory=list)
+
+
+class BaseFilters(BaseModel):
+    # String filters matched with ILIKE; their case does not change the result.
+    CASE_INSENSITIVE_FIELDS: ClassVar[frozenset[str]] = frozenset()
+
+    # Pagination
+    offset: int = Field(default=0, ge=0, description="Number of records to skip")
+    limit: int = Field(default=10, gt=0, le=100, description="Maximum number of records to return")
+
+    # Sorting
+    sort_order: Optional[str] = Field(None, pattern="^(asc|desc)$")
+
+
+class ProductsFilterParams(BaseFilters):
+    """Query parameters of GET /products and /products/detailed."""
+
+    CASE_INSENSITIVE_FIELDS: ClassVar[frozenset[str]] = frozenset({"name", "brand", "search_term"})
+
+    # Sorting options
+    sort_by: Optional[str] = Field(
+        None, pattern="^(name|price|date_created|date_updated|quantity)$"
+    )
+
+    # Filtering options
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    category_id: Optional[UUID] = None
+    search_term: Optional[str] = Field(None, min_length=3, max_length=50)
+    in_stock: Optional[bool] = None
+
+    # Price filters (exact and range)
+    price: Optional[Decimal] = None  # Exact price match
+    min_price: Optional[Decimal] = Field(None, ge=0)
+    max_price: Optional[Decimal] = Field(None, ge=0)
+
+    # Quantity filters (exact and range)
+    quantity: Optional[int] = None  # Exact quantity match
+    min_quantity: Optional[int] = Field(None, ge=0)
+    max_quantity: Optional[int] = Field(None, ge=0)
+
+    # Keyset pagination: the next_cursor of the previous page (replaces offset)
+    cursor: Optional[str] = Field(None, max_length=512)
+
+    # Date range filters
+    date_created_from: Optional[datetime] = None
+    date_created_to: Optional[datetime] = None
+    date_updated_from: Optional[datetime] = None
+    date_updated_to: Optional[datetime] = None
+
+    @field_validator("in_stock", mode="before")
+    @classmethod
+    def convert_in_stock(cls, value):
+        """Convert string 'true'/'false' to boolean"""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value.lower() == "true"
+        return value
+
+    @field_validator(
+        "date_created_from",
+        "date_created_to",
+        "date_updated_from",
+        "date_updated_to",
+        mode="before",
+    )
+    @classmethod
+    def parse_datetime(cls, value):
+        """Parse ISO datetime strings"""
+        if value is None:
+            return None
+        if isinstance(value, str):
+            try:
+                # Handle ISO format with 'Z' suffix
+                return datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return None
+        return value
+
+    @model_validator(mode="after")
+    def cursor_replaces_offset(self):
+        """A cursor already says where the page starts."""
+        if self.cursor and self.offset:
+            raise ValueError("Use either cursor or offset, not both")
+        return self
@@ -2,7 +2,10 @@ from uuid import UUID
 from typing import Generic, Optional, TypeVar, Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ColumnElement, Column, TableValuedAlias, any_, bindparam, column, delete, func, insert, select, update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.orm import DeclarativeBase, selectinload
 
 from shared.exceptions.base_exceptions import NoFieldInTheModelError
@@ -12,12 +15,32 @@ from shared.exceptions.base_exceptions import NoFieldInTheModelError
 ModelType = TypeVar("ModelType", bound=DeclarativeBase)
 
 
+def unnest_rows(columns: list[Column], rows: list[dict[str, Any]], name: str = "incoming") -> TableValuedAlias:
+    """
+    *rows* as a derived table ``unnest(:col1[], :col2[], ...) AS name(col1, col2, ...)``,
+    one typed array parameter per column. Select from it to insert, join or anti-join
+    any number of rows in one statement with a constant number of bind parameters.
+    """
+    arrays = [
+        bindparam(f"{name}_{col.key}", [row[col.key] for row in rows], type_=ARRAY(col.type))
+        for col in columns
+    ]
+    return (
+        func.unnest(*arrays)
+        .table_valued(*(column(col.key, col.type) for col in columns))
+        .render_derived(name=name)
+    )
+
+
 class BaseRepository(Generic[ModelType]):
     """
     Generic repository for basic CRUD operations.
     Can be used with any SQLAlchemy model.
     """
 
+    # Rows per INSERT ... VALUES page when bulk_create / upsert_many send many rows.
+    BULK_BATCH_SIZE: int = 1000
+
     def __init__(self, session: AsyncSession, model: type[ModelType]):
         self.session: AsyncSession = session
         self.model: type[ModelType] = model
@@ -31,11 +54,16 @@ class BaseRepository(Generic[ModelType]):
         return obj
 
     async def create_many(self, objects: list[ModelType]) -> list[ModelType]:
-        """Create multiply records"""
+        """Create multiply records, reloading them with one SELECT instead of a refresh per object"""
+        if not objects:
+            return objects
         self.session.add_all(objects)
         await self.session.flush()
-        for obj in objects:
-            await self.session.refresh(obj)
+        await self.session.execute(
+            select(self.model)
+            .where(self.model.id.in_([obj.id for obj in objects]))
+            .execution_options(populate_existing=True)
+        )
         return objects
 
     # ---------------- READ ----------------
@@ -52,6 +80,25 @@ class BaseRepository(Generic[ModelType]):
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_by_ids(self,
+                         item_ids: list[UUID],
+                         load_relations: None | list[str] = None) -> list[ModelType]:
+        """
+        Get the records with the given IDs (missing ones are skipped) in one
+        ``WHERE id = ANY(:ids)`` query, plus one query per loaded relation.
+        """
+        if not item_ids:
+            return []
+        query = select(self.model)
+        if load_relations:
+            for relation in load_relations:
+                if hasattr(self.model, relation):
+                    query = query.options(selectinload(getattr(self.model, relation)))
+        # One array parameter keeps a single statement shape whatever the number of IDs.
+        ids = bindparam("item_ids", list(item_ids), type_=ARRAY(self.model.__table__.c.id.type))
+        result = await self.session.execute(query.where(self.model.id == any_(ids)))
+        return list(result.scalars().all())
+
     async def get_all(self,
                       filters: dict[str, Any] | None = None,
                       sort_by: Optional[str] = None,
@@ -135,14 +182,28 @@ class BaseRepository(Generic[ModelType]):
         return await self.update(existing_obj)
 
     async def update_by_id(self, item_id: UUID, data: dict[str, Any]) -> ModelType | None:
-        """Update a record by ID with new values"""
-        existing_obj = await self.get_by_id(item_id)
-        if not existing_obj:
-            return None
-        for field, value in data.items():
-            if hasattr(existing_obj, field):
-                setattr(existing_obj, field, value)
-        return await self.update(existing_obj)
+        """Update a record by ID with new values in one UPDATE ... RETURNING"""
+        columns = self._column_keys()
+        values = {field: value for field, value in data.items() if field in columns}
+        if any(hasattr(self.model, field) for field in data.keys() - values.keys()):
+            # Relationship or other non-column attributes go through the unit of work.
+            existing_obj = await self.get_by_id(item_id)
+            if not existing_obj:
+                return None
+            for field, value in data.items():
+                if hasattr(existing_obj, field):
+                    setattr(existing_obj, field, value)
+            return await self.update(existing_obj)
+        if not values:
+            return await self.get_by_id(item_id)
+        result = await self.session.scalars(
+            update(self.model)
+            .where(self.model.id == item_id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        return result.one_or_none()
 
 
     #  ---------------- DELETE ----------------
@@ -160,6 +221,11 @@ class BaseRepository(Generic[ModelType]):
 
     async def delete_many_by_field(self, field_name: str, value: str | UUID) -> None:
         """Delete multiple records by field value"""
+        if not hasattr(self.model, field_name):
+            return None
+        if not self._cascades_deletes():
+            await self.delete_where(getattr(self.model, field_name) == value)
+            return None
         objects_to_delete = await self.get_many_by_field(field_name, value)
         if objects_to_delete:
             for obj in objects_to_delete:
@@ -167,5 +233,83 @@ class BaseRepository(Generic[ModelType]):
 
     async def delete_many(self, objects: list[ModelType]) -> None:
         """Delete multiple records"""
+        if objects and not self._cascades_deletes():
+            await self.delete_where(self.model.id.in_([obj.id for obj in objects]))
+            return
         for obj in objects:
             await self.session.delete(obj)
+
+    # ---------------- BULK ----------------
+    # Set-based statements: rows go to the database in executemany batches or as a
+    # single predicate, without loading ORM objects first. ORM-level cascades and
+    # attribute events do not run; database constraints and defaults still apply.
+
+    async def bulk_create(self, rows: list[dict[str, Any]], returning: bool = True) -> list[ModelType]:
+        """
+        INSERT *rows* in pages of BULK_BATCH_SIZE; with *returning*, the created
+        records come back from INSERT ... RETURNING in the same round trips.
+        """
+        if not rows:
+            return []
+        statement = insert(self.model).execution_options(insertmanyvalues_page_size=self.BULK_BATCH_SIZE)
+        if not returning:
+            await self.session.execute(statement, rows)
+            return []
+        result = await self.session.scalars(statement.returning(self.model), rows)
+        return list(result.all())
+
+    async def upsert_many(self,
+                          rows: list[dict[str, Any]],
+                          conflict_fields: list[str],
+                          update_fields: list[str] | None = None) -> list[ModelType]:
+        """
+        INSERT ... ON CONFLICT (*conflict_fields*) DO UPDATE for *rows*, returning the
+        inserted or updated records. *update_fields* default to every given field
+        outside the conflict target and primary key; an empty list means DO NOTHING,
+        in which case only newly inserted records are returned.
+        """
+        if not rows:
+            return []
+        statement = pg_insert(self.model).execution_options(
+            insertmanyvalues_page_size=self.BULK_BATCH_SIZE, populate_existing=True,
+        )
+        if update_fields is None:
+            primary_keys = {col.key for col in self.model.__table__.primary_key}
+            update_fields = [field for field in rows[0] if field not in conflict_fields and field not in primary_keys]
+        if update_fields:
+            set_: dict[str, Any] = {field: statement.excluded[field] for field in update_fields}
+            # ON CONFLICT DO UPDATE skips column onupdate defaults; apply SQL ones (date_updated).
+            for col in self.model.__table__.columns:
+                if col.key not in set_ and col.onupdate is not None and col.onupdate.is_clause_element:
+                    set_[col.key] = col.onupdate.arg
+            statement = statement.on_conflict_do_update(index_elements=conflict_fields, set_=set_)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=conflict_fields)
+        result = await self.session.scalars(statement.returning(self.model), rows)
+        return list(result.all())
+
+    async def update_many(self, rows: list[dict[str, Any]]) -> None:
+        """UPDATE many records by primary key in one executemany; each row holds the key plus new values."""
+        if rows:
+            await self.session.execute(update(self.model), rows)
+
+    async def update_where(self, values: dict[str, Any], *criteria: ColumnElement[bool]) -> int:
+        """UPDATE every record matching *criteria* with *values*; returns the number of rows updated."""
+        if not criteria:
+            raise ValueError("update_where() needs at least one criterion")
+        result = await self.session.execute(update(self.model).where(*criteria).values(**values))
+        return result.rowcount
+
+    async def delete_where(self, *criteria: ColumnElement[bool]) -> int:
+        """DELETE every record matching *criteria*; returns the number of rows deleted."""
+        if not criteria:
+            raise ValueError("delete_where() needs at least one criterion")
+        result = await self.session.execute(delete(self.model).where(*criteria))
+        return result.rowcount
+
+    def _column_keys(self) -> set[str]:
+        return {attr.key for attr in self.model.__mapper__.column_attrs}
+
+    def _cascades_deletes(self) -> bool:
+        """True when deleting a record must also delete children through ORM cascades."""
+        return any(rel.cascade.delete for rel in self.model.__mapper__.relationships)
@@ -1,12 +1,16 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
 from datetime import datetime
+from decimal import Decimal
+from json import JSONDecodeError, dumps, loads
 from typing import Generic, Optional, TypeVar, Any
 from uuid import UUID
 
-from sqlalchemy import asc, desc, func, or_, select
+from sqlalchemy import ColumnElement, Select, and_, asc, desc, func, literal, or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase, selectinload
 
-from shared.exceptions.base_exceptions import NoFieldInTheModelError
+from shared.exceptions.base_exceptions import InvalidCursorError, NoFieldInTheModelError
 
 
 ModelType = TypeVar("ModelType", bound=DeclarativeBase)
@@ -62,6 +66,55 @@ class LockableRepositoryMixin(Generic[ModelType]):
         return list(result.scalars().all())
 
 
+def _encode_cursor(position: list[Any]) -> str:
+    payload = dumps(position, default=str, separators=(",", ":")).encode()
+    return urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> list[Any]:
+    try:
+        position = loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (Base64Error, JSONDecodeError, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError()
+    if not isinstance(position, list) or len(position) != 4:
+        raise InvalidCursorError()
+    return position
+
+
+def _coerce_cursor_value(column: Any, value: Any) -> Any:
+    """Turn a JSON-decoded cursor value back into *column*'s Python type."""
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type in (Decimal, UUID, int, str):
+            return python_type(value)
+    except (TypeError, ValueError, ArithmeticError):
+        raise InvalidCursorError()
+    return value
+
+
+def _after_position(column: Any, id_column: Any, value: Any, item_id: Any, order: str) -> ColumnElement[bool]:
+    """
+    Rows after (value, item_id) in ``ORDER BY column, id`` under PostgreSQL's default
+    null placement: NULLS LAST ascending, NULLS FIRST descending. A row comparison
+    against NULL is NULL, so the NULL band of a nullable column is handled explicitly.
+    """
+    later_id = id_column > item_id if order == "asc" else id_column < item_id
+    if value is None:
+        # Inside the NULL band only the id moves on; descending, every non-NULL row still follows.
+        in_null_band = and_(column.is_(None), later_id)
+        return in_null_band if order == "asc" else or_(in_null_band, column.is_not(None))
+    key = tuple_(column, id_column)
+    after = tuple_(literal(value, column.type), literal(item_id, id_column.type))
+    if order == "desc":
+        return key < after
+    # Ascending, the NULL band comes after every non-NULL value.
+    return or_(key > after, column.is_(None)) if column.expression.nullable else key > after
+
+
 class AdvancedQueryMixin(Generic[ModelType]):
     """Mixin for repositories that need rich filtering, search and ranges."""
 
@@ -84,6 +137,7 @@ class AdvancedQueryMixin(Generic[ModelType]):
         search_fields: Optional[list[str]] = None,
         load_relations: Optional[list[str]] = None,
         range_filters: Optional[dict[str, tuple]] = None,
+        cursor: Optional[str] = None,
     ) -> list[ModelType]:
         """
         Rich 'get all' query builder with:
@@ -93,6 +147,13 @@ class AdvancedQueryMixin(Generic[ModelType]):
         - Date range filters
         - Relationship loading
         - Sorting and pagination
+
+        Sorting is by (sort_by, id), so rows with equal sort values keep a stable order.
+        With a *cursor* (see cursor_for), the page starts right after the row it points
+        at: ``WHERE (sort_by, id) > (value, id)`` walks an index on (…, sort_by, id)
+        instead of reading and discarding *offset* rows, so every page costs the same.
+        Rows whose sort_by is NULL are paged too (last ascending, first descending).
+        The cursor must come from the same sort_by / sort_order.
         """
         query = select(self.model)
 
@@ -126,15 +187,10 @@ class AdvancedQueryMixin(Generic[ModelType]):
                 elif max_value is not None:
                     query = query.where(column <= max_value)
 
-        # Search across multiple fields
+        # Search across multiple fields (ranked by relevance unless an explicit order is asked for)
         if search_term and search_fields:
-            conditions = [
-                getattr(self.model, field).ilike(f"%{search_term}%")
-                for field in search_fields
-                if hasattr(self.model, field)
-            ]
-            if conditions:
-                query = query.where(or_(*conditions))
+            ranked = not cursor and not (sort_by and hasattr(self.model, sort_by))
+            query = self._apply_search(query, search_term, search_fields, ranked=ranked)
 
         # Date range filters
         if date_filters:
@@ -155,16 +211,52 @@ class AdvancedQueryMixin(Generic[ModelType]):
                 elif end:
                     query = query.where(column <= end)
 
-        # Sorting
-        if sort_by and hasattr(self.model, sort_by):
-            order_func = asc if sort_order == "asc" else desc
-            query = query.order_by(order_func(getattr(self.model, sort_by)))
+        # Sorting, with id as the tie-breaker
+        sort_by = sort_by if sort_by and hasattr(self.model, sort_by) else None
+        order = "asc" if sort_order == "asc" else "desc"
+        order_func = asc if order == "asc" else desc
+        sort_columns = [getattr(self.model, sort_by), self.model.id] if sort_by else [self.model.id]
+        if sort_by or cursor:
+            query = query.order_by(*(order_func(column) for column in sort_columns))
 
         # Pagination
-        if offset is not None:
+        if cursor:
+            cursor_sort_by, cursor_order, value, item_id = _decode_cursor(cursor)
+            if cursor_sort_by != sort_by or cursor_order != order:
+                raise InvalidCursorError("Cursor was issued for a different sort order")
+            item_id = _coerce_cursor_value(self.model.id, item_id)
+            if sort_by:
+                sort_column = sort_columns[0]
+                value = _coerce_cursor_value(sort_column, value)
+                query = query.where(_after_position(sort_column, self.model.id, value, item_id, order))
+            else:
+                query = query.where(self.model.id > item_id if order == "asc" else self.model.id < item_id)
+        elif offset is not None:
             query = query.offset(offset)
         if limit:
             query = query.limit(limit)
 
         result = await self.session.execute(query)
         return list(result.scalars().all())
+
+    def _apply_search(self, query: Select, search_term: str, search_fields: list[str], ranked: bool) -> Select:
+        """
+        Filter *query* to rows where any of *search_fields* contains *search_term* (ILIKE).
+        Repositories with a full-text index override this; *ranked* allows them to order
+        by relevance (ILIKE has no notion of it).
+        """
+        conditions = [
+            getattr(self.model, field).ilike(f"%{search_term}%")
+            for field in search_fields
+            if hasattr(self.model, field)
+        ]
+        if conditions:
+            query = query.where(or_(*conditions))
+        return query
+
+    def cursor_for(self, item: ModelType, sort_by: Optional[str] = None, sort_order: Optional[str] = "asc") -> str:
+        """Opaque get_all() cursor for the page that follows *item* under the same sort."""
+        sort_by = sort_by if sort_by and hasattr(self.model, sort_by) else None
+        order = "asc" if sort_order == "asc" else "desc"
+        value = getattr(item, sort_by) if sort_by else None
+        return _encode_cursor([sort_by, order, value, item.id])
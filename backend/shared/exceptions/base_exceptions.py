@@ -43,6 +43,11 @@ class NoFieldInTheModelError(BaseAPIException):
         detail = f"Model: '{model_name}' has no field: '{field_name}'"
         super().__init__(detail=detail, status_code=400)
 
+class InvalidCursorError(BaseAPIException):
+    """Raised when a pagination cursor cannot be decoded or belongs to another sort order"""
+    def __init__(self, detail: str = "Invalid pagination cursor"):
+        super().__init__(detail=detail, status_code=400)
+
 
 
 #---------Email Service Errors-------
@@ -1,10 +1,24 @@
+import asyncio
+from collections.abc import Callable
 from typing import Any, Optional
 from functools import wraps
 
 from orjson import loads, dumps, JSONDecodeError
-from fastapi import Request
+from fastapi import Request, Response
+from pydantic import BaseModel
+from redis import asyncio as aioredis
+from shared.contracts.product import ProductsFilterParams
 from shared.exceptions.base_exceptions import BaseAPIException
-from shared.utils.customized_json_response import JSONResponse
+from shared.utils.cache_entry import (
+    METADATA_READ_BYTES,
+    CachedResponse,
+    CacheEntryFormatError,
+    CacheEntryMetadata,
+)
+from shared.managers.local_cache import LocalResponseCache
+from shared.utils.cache_key import QueryNormalizer, canonical_path, key_query
+from shared.utils.compression import negotiate_encoding
+from shared.utils.route_policy import ROUTE_POLICY_SCOPE_KEY, RoutePolicy, RoutePolicyMatcher
 from shared.managers.redis_base import RedisBase
 
 
@@ -12,15 +26,31 @@ class CacheManager(RedisBase):
     """
     Caching layer: key generation, read-through, write-through, namespace invalidation,
     and a @cached decorator for individual route handlers.
+
+    Namespaces are invalidated by bumping a per-namespace generation counter that is
+    part of every cache key, rather than by scanning and deleting keys.
+
+    When a LocalResponseCache is supplied, it is used as an in-process L1 tier in
+    front of Redis. Invalidations are published on a Redis channel so every worker
+    holding an L1 tier drops the same keys and learns the new generation.
+
+    The rule tables below are compiled once into a RoutePolicyMatcher (paths are
+    relative to the API version; the most specific rule wins). The resolved policy
+    is kept on the request scope, so each request is matched only once.
+
+    Routes in _QUERY_SCHEMAS get schema-normalized keys (see QueryNormalizer). With
+    cardinality_refresh_seconds set, every fill also records its key and query values
+    in per-namespace Redis HyperLogLogs; their counts are read back periodically
+    (key_cardinality, on_cardinality), and a query parameter seen with more than
+    param_cardinality_cap distinct values is no longer cached until the window resets.
     """
-    # Ordered most-specific → least-specific so the first match wins.
     # Values are lists to allow a single mutation to invalidate multiple namespaces.
     # e.g. updating a category also stales cached product-detail responses that embed category data.
     _INVALIDATION_NAMESPACE_MAP: list[tuple[str, list[str]]] = [
-        ("products/detailed", ["products"]),
         ("/products", ["products"]),
         ("/categories", ["categories", "products"]),   # category change → stale embedded product data
         ("/images", ["images", "products"]),            # image change → stale embedded product data
+        ("/*/images", ["images", "products"]),          # /{product_id}/images
         ("/reviews", ["reviews", "products"]),          # review change → stale embedded product data
         ("/orders", ["orders"]),
         ("/carts", ["carts"]),
@@ -30,28 +60,85 @@ class CacheManager(RedisBase):
         ("/notifications", ["notifications"]),
     ]
 
-    _CACHE_TTL_MAP: list[tuple[str, int]] = [
-        ("/products/detailed", 600),
-        ("/products", 300),
-        ("/categories", 300),
-        ("/images", 300),
-        ("/reviews", 300),
-        ("/carts", 300),
-        ("/wishlists", 300),
-        ("/shipping", 300),
+    # (segment, fresh TTL, stale TTL) in seconds. Entries are served as-is while fresh;
+    # after that, and until the stale TTL (when Redis expires them), they are served
+    # stale while a background refresh runs, or in place of an upstream error.
+    _CACHE_TTL_MAP: list[tuple[str, int, int]] = [
+        ("/products/detailed", 600, 3600),
+        ("/products", 300, 1800),
+        ("/categories", 300, 1800),
+        ("/images", 300, 1800),
+        ("/*/images", 300, 1800),
+        ("/reviews", 300, 1800),
+        ("/users/*/reviews", 300, 1800),
+        ("/carts", 300, 900),
+        ("/wishlists", 300, 900),
+        ("/shipping", 300, 900),
     ]
 
     # Paths whose responses must never be cached (monitoring + dynamic job-status polls).
     _SKIP_CACHE_PATHS: list[str] = [
         "/health", "/metrics", "/ping", "/ready", "/live",
         "/images/generations/",  # job status poll — result changes between requests
+        "/media/",  # byte ranges; cached on disk by the gateway's MediaProxy instead
     ]
 
+    # Query schemas of routes (exact paths, relative to the API version) whose cache keys keep
+    # only the schema's non-default parameters, in canonical form.
+    _QUERY_SCHEMAS: list[tuple[str, type[BaseModel]]] = [
+        ("/products", ProductsFilterParams),
+        ("/products/detailed", ProductsFilterParams),
+        ("/products/page", ProductsFilterParams),
+        ("/products/detailed/page", ProductsFilterParams),
+    ]
+
+    # Distinct keys / values are counted over a fixed window starting at the first fill in it.
+    _CARDINALITY_WINDOW_SECONDS: int = 24 * 3600
+
     DEFAULT_TTL: int = 300
+    DEFAULT_STALE_TTL: int = 900
 
-    def __init__(self, service_api_version: str, **kwargs):
+    # Delay before re-subscribing after the invalidation pub/sub connection drops.
+    _LISTENER_RETRY_SECONDS: float = 1.0
+
+    # Compare-and-delete, so a worker never releases a fill lock that expired and was re-acquired.
+    _RELEASE_LOCK_SCRIPT: str = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        service_api_version: str,
+        local_cache: LocalResponseCache | None = None,
+        route_matcher: RoutePolicyMatcher | None = None,
+        param_cardinality_cap: int = 0,
+        cardinality_refresh_seconds: float | None = None,
+        on_cardinality: Callable[[str, str | None, int], None] | None = None,
+        **kwargs,
+    ):
         super().__init__(**kwargs)
         self.service_api_version: str = service_api_version
+        self.local_cache: LocalResponseCache | None = local_cache
+        self.route_matcher: RoutePolicyMatcher = route_matcher or self.build_route_matcher(service_api_version)
+        self._query_normalizers: dict[str, QueryNormalizer] = {
+            f"{service_api_version.rstrip('/')}/{pattern.lstrip('/')}": QueryNormalizer(schema)
+            for pattern, schema in self._QUERY_SCHEMAS
+        }
+        # 0 = never stop caching a parameter; None = cardinality is not tracked.
+        self.param_cardinality_cap: int = param_cardinality_cap
+        self.cardinality_refresh_seconds: float | None = cardinality_refresh_seconds
+        # Called with (namespace, parameter or None for whole keys, distinct count) on each refresh.
+        self.on_cardinality: Callable[[str, str | None, int], None] | None = on_cardinality
+        # (namespace, parameter or None) → distinct values cached in the current window.
+        self.key_cardinality: dict[tuple[str, str | None], int] = {}
+        self._cardinality_refresher: asyncio.Task[None] | None = None
+        self._invalidation_listener: asyncio.Task[None] | None = None
+        self._binary_redis: aioredis.Redis | None = None
+        # Namespace → last known generation; only trusted while the invalidation listener runs.
+        self._generations: dict[str, int] = {}
         self.http_methods: list[str] = ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS", "HEAD"]
         self.namespaces: list[str] = [
             "users", "products", "categories", "orders",
@@ -59,16 +146,176 @@ class CacheManager(RedisBase):
             "wishlists", "shipping",
         ]
 
+    # ---- lifecycle ----
+
+    @property
+    def binary_redis(self) -> aioredis.Redis:
+        """
+        Lazy Redis connection without response decoding.
+        Cached response entries are raw bytes and must not go through the utf-8 decoder.
+        """
+        if self._binary_redis is None:
+            try:
+                self._binary_redis = aioredis.from_url(self.redis_url, decode_responses=False)
+            except Exception as e:
+                self.logger.error(f"Failed to initialize binary Redis connection: {str(e)}")
+                raise RuntimeError(f"Failed to initialize binary Redis connection: {str(e)}")
+        return self._binary_redis
+
+    async def connect(self) -> None:
+        """
+        Verify Redis and, when an L1 tier is configured, start the invalidation listener
+        (and the cardinality refresher when cardinality is tracked).
+        """
+        await super().connect()
+        if self.local_cache is not None and self._invalidation_listener is None:
+            self._invalidation_listener = asyncio.create_task(self._listen_for_invalidations())
+        if self.cardinality_refresh_seconds is not None and self._cardinality_refresher is None:
+            self._cardinality_refresher = asyncio.create_task(self._refresh_key_cardinality())
+
+    async def close(self) -> None:
+        """Stop the background tasks before closing the Redis connection."""
+        for task in (self._invalidation_listener, self._cardinality_refresher):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._invalidation_listener = None
+        self._cardinality_refresher = None
+        if self._binary_redis is not None:
+            await self._binary_redis.close()
+            self._binary_redis = None
+        await super().close()
+
+    # ---- cross-worker invalidation ----
+
+    @property
+    def invalidation_channel(self) -> str:
+        return f"{self.service_prefix}:cache:invalidations"
+
+    def _remember_generation(self, namespace: str, generation: int) -> None:
+        """Keep the newest known generation; messages may arrive out of order."""
+        if generation > self._generations.get(namespace, -1):
+            self._generations[namespace] = generation
+
+    async def _publish_invalidation(
+        self,
+        key_prefix: str,
+        namespace: str | None = None,
+        generation: int | None = None) -> None:
+        """Apply an invalidation to this worker's L1 tier and tell every other worker to do the same."""
+        if self.local_cache is not None:
+            self.local_cache.invalidate_prefix(key_prefix)
+        if namespace is not None and generation is not None:
+            self._remember_generation(namespace, generation)
+        try:
+            message = {"prefix": key_prefix, "namespace": namespace, "generation": generation}
+            await self.redis.publish(self.invalidation_channel, dumps(message))
+        except Exception as e:
+            self.logger.error(f"Failed to publish cache invalidation for '{key_prefix}': {str(e)}")
+
+    async def _listen_for_invalidations(self) -> None:
+        """
+        Apply invalidations published by any process sharing this Redis cache.
+        After a (re)subscription the L1 tier and the known generations are dropped,
+        since messages may have been missed while disconnected.
+        """
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.invalidation_channel)
+                self._generations.clear()
+                if self.local_cache is not None:
+                    self.local_cache.clear()
+                self.logger.info(f"Subscribed to cache invalidations on '{self.invalidation_channel}'")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        invalidation = loads(message["data"])
+                    except JSONDecodeError:
+                        self.logger.warning(f"Ignoring malformed cache invalidation: {message['data']!r}")
+                        continue
+                    if invalidation.get("namespace") and invalidation.get("generation") is not None:
+                        self._remember_generation(invalidation["namespace"], int(invalidation["generation"]))
+                    if self.local_cache is not None:
+                        removed = self.local_cache.invalidate_prefix(invalidation["prefix"])
+                        self.logger.debug(f"Dropped {removed} local cache entries for '{invalidation['prefix']}'")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Cache invalidation listener failed: {str(e)}")
+                self._generations.clear()
+                if self.local_cache is not None:
+                    self.local_cache.clear()
+                await asyncio.sleep(self._LISTENER_RETRY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
     # ---- key generation ----
 
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.service_prefix}:cache:generation:{namespace}"
+
+    def _namespace_key_prefix(self, namespace: str, method: str = "GET") -> str:
+        """Common prefix of every cache key in *namespace* (used to drop L1 entries)."""
+        versioned_path = f"{self.service_api_version.rstrip('/')}/{namespace.lstrip('/')}"
+        return f"{self.service_prefix}:cache:{method}:{versioned_path}"
+
+    def namespace_for(self, path: str) -> str | None:
+        """The cache namespace of a request path, or None when it has none."""
+        return self._resolve_namespace(path)
+
+    def _resolve_namespace(self, path: str) -> str | None:
+        """Return the cache namespace a request path belongs to (its first segment after the API version)."""
+        api_version = self.service_api_version.rstrip("/")
+        if path.startswith(api_version):
+            path = path[len(api_version):]
+        segment = path.lstrip("/").split("/", 1)[0]
+        return segment if segment in self.namespaces else None
+
+    async def _get_namespace_generation(self, namespace: str) -> int:
+        """
+        Current generation of *namespace*.
+        While the invalidation listener runs, generations are kept in memory and updated
+        from pub/sub, so the hot path does not pay a Redis round trip for them.
+        """
+        if self._invalidation_listener is not None and namespace in self._generations:
+            return self._generations[namespace]
+        raw_generation = await self.redis.get(self._generation_key(namespace))
+        generation = int(raw_generation or 0)
+        if self._invalidation_listener is not None:
+            self._remember_generation(namespace, generation)
+        return generation
+
+    def _query_params(self, request: Request) -> list[tuple[str, str]]:
+        """
+        The (name, value) pairs that identify *request*'s result: schema-normalized for
+        routes in _QUERY_SCHEMAS, otherwise every query parameter, sorted.
+        """
+        normalizer = self._query_normalizers.get(canonical_path(str(request.url.path)))
+        if normalizer is not None:
+            params = normalizer.normalize(request.query_params)
+            if params is not None:
+                return params
+        return sorted(request.query_params.items())
+
     def _generate_cache_key(
         self,
         request: Request,
-        pattern: str | None = None,
-        force_method: str | None = None) -> str | None:
+        generation: int | None = None,
+        force_method: str | None = None,
+        params: list[tuple[str, str]] | None = None) -> str | None:
         """
-        Generate cache key for a request or a namespace pattern.
-        Includes service_prefix, HTTP method, API version, path, and sorted query params.
+        Generate cache key for a request.
+        Includes service_prefix, HTTP method, API version, path (without a trailing slash),
+        the query params (see _query_params; hashed when long) and, for namespaced paths,
+        the namespace generation.
         """
         if force_method is not None and force_method not in self.http_methods:
             self.logger.error(
@@ -77,14 +324,12 @@ class CacheManager(RedisBase):
             return None
 
         method = force_method if force_method else str(request.method).upper()
-        path = str(request.url.path)
-        query_params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.items()))
+        path = canonical_path(str(request.url.path))
+        query_params = key_query(params if params is not None else self._query_params(request))
 
-        if pattern:
-            versioned_path = f"{self.service_api_version.rstrip('/')}/{pattern.lstrip('/')}"
-            cache_key = f"{self.service_prefix}:cache:{method}:{versioned_path}*"
-        else:
-            cache_key = f"{self.service_prefix}:cache:{method}:{path}:{query_params}"
+        cache_key = f"{self.service_prefix}:cache:{method}:{path}:{query_params}"
+        if generation is not None:
+            cache_key = f"{cache_key}:g{generation}"
 
         self.logger.debug(
             f"Generated cache key: {cache_key}, URL: {request.url}, "
@@ -92,6 +337,93 @@ class CacheManager(RedisBase):
         )
         return cache_key
 
+    async def _resolve_cache_key(self, request: Request, force_method: str | None = None) -> str | None:
+        """
+        Generate the cache key for *request*, folding in its namespace's current generation.
+        Returns None (i.e. bypass the cache) when the generation cannot be read, or when
+        the request sets a parameter over the cardinality cap.
+        """
+        namespace = self._resolve_namespace(str(request.url.path))
+        params = self._query_params(request)
+        if namespace and self._over_cardinality_cap(namespace, params):
+            return None
+        try:
+            generation = await self._get_namespace_generation(namespace) if namespace else None
+        except Exception as e:
+            self.logger.error(f"Cannot read cache generation for '{namespace}': {str(e)}")
+            return None
+        return self._generate_cache_key(
+            request=request, generation=generation, force_method=force_method, params=params,
+        )
+
+    # ---- key cardinality ----
+
+    def _cardinality_key(self, namespace: str) -> str:
+        return f"{self.service_prefix}:cache:cardinality:{namespace}"
+
+    def _over_cardinality_cap(self, namespace: str, params: list[tuple[str, str]]) -> bool:
+        if not self.param_cardinality_cap:
+            return False
+        for name, _ in params:
+            if self.key_cardinality.get((namespace, name), 0) > self.param_cardinality_cap:
+                self.logger.debug(f"Not caching {namespace} request: '{name}' is over the cardinality cap")
+                return True
+        return False
+
+    async def _record_key_cardinality(self, request: Request) -> None:
+        """Count the filled key (without its generation) and each query value in the namespace's HyperLogLogs."""
+        namespace = self._resolve_namespace(str(request.url.path))
+        if namespace is None:
+            return
+        params = self._query_params(request)
+        cache_key = self._generate_cache_key(request=request, params=params)
+        window = self._CARDINALITY_WINDOW_SECONDS
+        keys_key = self._cardinality_key(namespace)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.pfadd(keys_key, cache_key)
+            pipe.expire(keys_key, window, nx=True)
+            if params:
+                pipe.sadd(f"{keys_key}:params", *(name for name, _ in params))
+                pipe.expire(f"{keys_key}:params", window, nx=True)
+                for name, value in params:
+                    pipe.pfadd(f"{keys_key}:param:{name}", value)
+                    pipe.expire(f"{keys_key}:param:{name}", window, nx=True)
+            await pipe.execute()
+        except Exception as e:
+            self.logger.warning(f"Cannot record cache key cardinality for '{namespace}': {str(e)}")
+
+    async def read_key_cardinality(self) -> dict[tuple[str, str | None], int]:
+        """Distinct cached keys (parameter None) and values of each query parameter, per namespace."""
+        cardinality: dict[tuple[str, str | None], int] = {}
+        for namespace in self.namespaces:
+            keys_key = self._cardinality_key(namespace)
+            names = sorted(await self.redis.smembers(f"{keys_key}:params"))
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.pfcount(keys_key)
+            for name in names:
+                pipe.pfcount(f"{keys_key}:param:{name}")
+            counts = await pipe.execute()
+            if counts[0]:
+                cardinality[(namespace, None)] = counts[0]
+            for name, count in zip(names, counts[1:]):
+                cardinality[(namespace, name)] = count
+        return cardinality
+
+    async def _refresh_key_cardinality(self) -> None:
+        """Keep key_cardinality (which the cap is checked against) current, and report it."""
+        while True:
+            try:
+                self.key_cardinality = await self.read_key_cardinality()
+                if self.on_cardinality is not None:
+                    for (namespace, name), count in self.key_cardinality.items():
+                        self.on_cardinality(namespace, name, count)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Cannot read cache key cardinality: {str(e)}")
+            await asyncio.sleep(self.cardinality_refresh_seconds)
+
     # ---- namespace invalidation ----
 
     async def clear_cache_namespace(
@@ -99,101 +431,152 @@ class CacheManager(RedisBase):
         request: Request,
         namespace: str,
         force_method: str | None = "GET") -> None:
-        """Clear all keys in a namespace using Redis SCAN (requires an HTTP Request)."""
+        """Invalidate a namespace from an HTTP request context. See invalidate_namespace."""
         if namespace not in self.namespaces:
             self.logger.error("Namespace is missing or incorrect for clearing cache.")
             return
-
-        pattern_key = self._generate_cache_key(
-            request=request,
-            pattern=namespace,
-            force_method=force_method,
-        )
-        if not pattern_key:
-            self.logger.error(f"Failed to generate cache key for namespace: {namespace}")
+        if force_method is not None and force_method not in self.http_methods:
+            self.logger.error(
+                f"Invalid force_method: {force_method}. Must be one of: {self.http_methods}"
+            )
             return
-
-        deleted_count = 0
-        try:
-            async for key in self.redis.scan_iter(match=pattern_key, count=1000):
-                await self.redis.delete(key)
-                deleted_count += 1
-            self.logger.info(f"Cleared {deleted_count} keys in namespace: '{namespace}'")
-        except Exception as e:
-            self.logger.error(f"Error clearing namespace '{namespace}': {str(e)}", exc_info=True)
+        await self.invalidate_namespace(namespace, method=force_method or "GET")
 
     async def invalidate_namespace(self, namespace: str, method: str = "GET") -> None:
         """
-        Clear all cached keys for a namespace without requiring an HTTP Request.
-        Intended for background consumers (e.g. FastStream) that mutate data.
+        Invalidate every cached response in a namespace with a single INCR.
+        Intended for HTTP mutations and background consumers (e.g. FastStream) alike.
 
-        Key pattern: {service_prefix}:cache:{method}:{api_version}/{namespace}*
+        Cache keys embed the namespace generation, so bumping it makes every existing
+        entry unreachable; those entries then age out through their own TTL.
         """
         if namespace not in self.namespaces:
             self.logger.error(f"Unknown namespace '{namespace}' — skipping cache invalidation.")
             return
 
-        versioned_path = f"{self.service_api_version.rstrip('/')}/{namespace.lstrip('/')}"
-        pattern_key = f"{self.service_prefix}:cache:{method}:{versioned_path}*"
-
-        deleted_count = 0
         try:
-            async for key in self.redis.scan_iter(match=pattern_key, count=1000):
-                await self.redis.delete(key)
-                deleted_count += 1
-            self.logger.info(f"Invalidated {deleted_count} keys in namespace: '{namespace}'")
+            generation = await self.redis.incr(self._generation_key(namespace))
+            self.logger.info(f"Invalidated namespace '{namespace}' (generation {generation})")
         except Exception as e:
             self.logger.error(f"Error invalidating namespace '{namespace}': {str(e)}", exc_info=True)
+            return
+        await self._publish_invalidation(
+            self._namespace_key_prefix(namespace, method),
+            namespace=namespace,
+            generation=generation,
+        )
 
     # ---- response caching ----
 
-    async def cache_response(self, request: Request, body: bytes, status_code: int, ttl: int = 300) -> None:
+    def build_response(self, entry: CachedResponse, accept_encoding: str | None = None) -> Response:
         """
-        Cache a response body for a given request.
+        Serve a cached entry's body bytes as-is — no JSON decode or re-encode.
+        When the entry carries pre-compressed variants, the one *accept_encoding* asks for
+        is sent instead, under a weak ETag (same content, different bytes).
+        """
+        headers = {"ETag": entry.etag}
+        body = entry.body
+        if entry.encoded:
+            headers["Vary"] = "Accept-Encoding"
+            encoding = negotiate_encoding(accept_encoding, tuple(entry.encoded))
+            if encoding is not None:
+                body = entry.encoded[encoding]
+                headers["Content-Encoding"] = encoding
+                headers["ETag"] = f"W/{entry.etag}"
+        return Response(
+            content=body,
+            status_code=entry.status_code,
+            media_type=entry.content_type,
+            headers=headers,
+        )
+
+    def build_not_modified(self, etag: str) -> Response:
+        """304 for a conditional GET whose validator matches the cached entry."""
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async def _read_entry(self, cache_key: str) -> tuple[CachedResponse | None, int]:
+        """Fetch an entry and its remaining Redis TTL in one round trip."""
+        pipe = self.binary_redis.pipeline()
+        pipe.get(cache_key)
+        pipe.ttl(cache_key)
+        cached_data, remaining_ttl = await pipe.execute()
+        if not cached_data:
+            return None, 0
+        try:
+            return CachedResponse.from_bytes(cached_data), remaining_ttl
+        except CacheEntryFormatError as e:
+            self.logger.warning(f"Ignoring unreadable cache entry {cache_key}: {e}")
+            return None, 0
+
+    async def _read_metadata(self, cache_key: str) -> CacheEntryMetadata | None:
+        """Fetch only the header and ETag of an entry (GETRANGE), leaving the body in Redis."""
+        data = await self.binary_redis.getrange(cache_key, 0, METADATA_READ_BYTES - 1)
+        if not data:
+            return None
+        try:
+            return CacheEntryMetadata.from_bytes(data)
+        except CacheEntryFormatError as e:
+            self.logger.warning(f"Ignoring unreadable cache entry {cache_key}: {e}")
+            return None
+
+    async def get_cache_key(self, request: Request) -> str | None:
+        """Public accessor for the (generation-aware) cache key of *request*."""
+        return await self._resolve_cache_key(request=request)
+
+    async def cache_response(
+        self,
+        request: Request,
+        body: bytes,
+        status_code: int,
+        ttl: int = 300,
+        content_type: str | None = None,
+        stale_ttl: int | None = None,
+        encodings: tuple[str, ...] = ()) -> CachedResponse | None:
+        """
+        Cache a response body for a given request and return the stored entry.
         Accepts pre-read body bytes (required because call_next() returns a streaming
         response whose body_iterator must be consumed at the middleware level).
-        Default TTL is 5 minutes.
+        The bytes are stored untouched, next to a small binary header and a copy
+        compressed with each of *encodings*.
+        Default TTL is 5 minutes. When *stale_ttl* is given, the entry is kept until
+        then so it can be served stale (see is_fresh).
         """
-        if any(p in request.url.path for p in self._SKIP_CACHE_PATHS):
-            return
+        if not self.route_policy(request).cacheable:
+            return None
 
         if request.method != "GET" or not (200 <= status_code < 300):
             self.logger.debug(
                 f"Skipping cache: method={request.method}, status={status_code}, "
                 f"path={request.url.path}"
             )
-            return
+            return None
 
         try:
-            cache_key = self._generate_cache_key(request=request)
+            cache_key = await self._resolve_cache_key(request=request)
             if not cache_key:
-                self.logger.error("Cannot generate cache key for caching response, skipping.")
-                return
+                self.logger.debug("No cache key for response (generation unreadable or parameter capped), skipping.")
+                return None
 
             if not body:
                 self.logger.warning(f"Response body is empty, skipping cache for: {cache_key}")
-                return
-
-            response_body = body.decode("utf-8") if isinstance(body, bytes) else body
+                return None
 
-            try:
-                content = loads(response_body)
-            except JSONDecodeError as e:
-                self.logger.warning(f"Response not JSON serializable, skipping cache: {cache_key} — {e}")
-                return
-
-            await self.set_response_for_caching(
-                key=cache_key,
-                seconds=ttl,
-                value={"content": content, "status_code": status_code},
-            )
+            entry = CachedResponse.from_upstream(body, status_code, content_type, encodings=encodings)
+            expires_in = max(ttl, stale_ttl or 0)
+            await self.set_response_for_caching(key=cache_key, seconds=expires_in, entry=entry)
+            if self.local_cache is not None:
+                self.local_cache.set(cache_key, entry, ttl=expires_in)
+            if self.cardinality_refresh_seconds is not None:
+                await self._record_key_cardinality(request)
             self.logger.debug(f"Cached response for: {cache_key}")
+            return entry
         except Exception as e:
             self.logger.error(f"Error caching response: {str(e)}")
+            return None
 
-    async def get_cached_response(self, request: Request, is_public: bool = False) -> Optional[JSONResponse]:
+    def is_cache_readable(self, request: Request, is_public: bool = False) -> bool:
         """
-        Return a cached response if available, or None.
+        Whether *request* may be answered from the cache.
 
         For protected endpoints: skips cache when auth credentials are present
         (Authorization header or access_token cookie) to avoid cross-user data leaks.
@@ -201,11 +584,11 @@ class CacheManager(RedisBase):
         """
         if request.method != "GET":
             self.logger.info("Skipping cache lookup: non-GET request.")
-            return None
+            return False
 
         # Never serve stale responses for dynamic paths (e.g. job-status polls).
-        if any(p in request.url.path for p in self._SKIP_CACHE_PATHS):
-            return None
+        if not self.route_policy(request).cacheable:
+            return False
 
         if not is_public:
             is_authenticated = (
@@ -214,29 +597,110 @@ class CacheManager(RedisBase):
             )
             if is_authenticated:
                 self.logger.info("Skipping cache lookup: authenticated request to protected endpoint.")
-                return None
+                return False
+        return True
+
+    async def get_cached_entry(self, request: Request, is_public: bool = False) -> CachedResponse | None:
+        """
+        Return the cached entry for *request* if available, or None.
+        The entry may be stale — check it with is_fresh before serving it as a hit.
+        The L1 tier (if configured) is checked first; a stale L1 entry is re-read from
+        Redis in case another worker already refreshed it. Redis hits are promoted into L1.
+        """
+        if not self.is_cache_readable(request, is_public=is_public):
+            return None
 
-        cache_key = self._generate_cache_key(request=request)
+        cache_key = await self._resolve_cache_key(request=request)
         if not cache_key:
             self.logger.error("Cannot generate cache key, skipping cache retrieval.")
             return None
 
-        cached_data: bytes | None = await self.redis.get(cache_key)
-        if cached_data:
-            cached_dict = loads(cached_data)
+        local_entry = None
+        if self.local_cache is not None:
+            local_entry = self.local_cache.get(cache_key)
+            if local_entry is not None and self.is_fresh(local_entry, request.url.path, self.route_policy(request)):
+                self.logger.debug(f"Local cache hit for: {cache_key}")
+                return local_entry
+
+        entry, remaining_ttl = await self._read_entry(cache_key)
+        if entry is not None:
             self.logger.debug(f"Cache hit for: {cache_key}")
-            return JSONResponse(
-                content=cached_dict["content"],
-                status_code=cached_dict["status_code"],
-            )
+            if self.local_cache is not None and remaining_ttl > 0:
+                self.local_cache.set(cache_key, entry, ttl=remaining_ttl)
+            return entry
 
+        if local_entry is not None:
+            return local_entry
         self.logger.debug(f"Cache miss for: {cache_key}")
         return None
 
-    async def set_response_for_caching(self, key: str, seconds: int, value: dict[str, Any]) -> None:
-        """Set a response in Redis with a TTL."""
+    async def get_cached_metadata(self, request: Request, is_public: bool = False) -> CacheEntryMetadata | None:
+        """
+        Like get_cached_entry, but returns only the entry's status, ETag and age.
+        Used to answer If-None-Match without transferring the cached body.
+        """
+        if not self.is_cache_readable(request, is_public=is_public):
+            return None
+
+        cache_key = await self._resolve_cache_key(request=request)
+        if not cache_key:
+            return None
+
+        local_entry = None
+        if self.local_cache is not None:
+            local_entry = self.local_cache.get(cache_key)
+            if local_entry is not None and self.is_fresh(local_entry, request.url.path, self.route_policy(request)):
+                return local_entry.metadata
+
+        metadata = await self._read_metadata(cache_key)
+        if metadata is None and local_entry is not None:
+            return local_entry.metadata
+        return metadata
+
+    def is_fresh(
+        self,
+        entry: CachedResponse | CacheEntryMetadata,
+        path: str,
+        policy: RoutePolicy | None = None) -> bool:
+        """Whether *entry* is still within the fresh TTL configured for *path* (or its resolved *policy*)."""
+        ttl = policy.ttl if policy is not None else self.get_cache_ttl(path)
+        return entry.age <= ttl
+
+    async def get_cached_response(self, request: Request, is_public: bool = False) -> Optional[Response]:
+        """Return a cached response if available, or None. See get_cached_entry."""
+        entry = await self.get_cached_entry(request, is_public=is_public)
+        if entry is None:
+            return None
+        return self.build_response(entry, request.headers.get("accept-encoding"))
+
+    # ---- cache-fill locks ----
+
+    def _fill_lock_key(self, cache_key: str) -> str:
+        return f"{cache_key}:fill-lock"
+
+    async def acquire_fill_lock(self, cache_key: str, token: str, ttl_ms: int) -> bool:
+        """
+        Try to become the only worker filling *cache_key* (SET NX PX).
+        Fails open: on Redis errors the caller is told to go ahead and fill.
+        """
+        try:
+            acquired = await self.redis.set(self._fill_lock_key(cache_key), token, nx=True, px=ttl_ms)
+            return bool(acquired)
+        except Exception as e:
+            self.logger.error(f"Error acquiring cache fill lock for {cache_key}: {str(e)}")
+            return True
+
+    async def release_fill_lock(self, cache_key: str, token: str) -> None:
+        """Release the fill lock only if this worker still owns it."""
+        try:
+            await self.redis.eval(self._RELEASE_LOCK_SCRIPT, 1, self._fill_lock_key(cache_key), token)
+        except Exception as e:
+            self.logger.error(f"Error releasing cache fill lock for {cache_key}: {str(e)}")
+
+    async def set_response_for_caching(self, key: str, seconds: int, entry: CachedResponse) -> None:
+        """Set a binary response entry in Redis with a TTL."""
         try:
-            await self.redis.setex(name=key, time=seconds, value=dumps(value))
+            await self.binary_redis.setex(name=key, time=seconds, value=entry.to_bytes())
             self.logger.debug(f"Set cache key: {key}")
         except Exception as e:
             self.logger.error(f"Error setting cache: {str(e)}")
@@ -246,11 +710,13 @@ class CacheManager(RedisBase):
         if not request:
             self.logger.error("Request must be provided for cache invalidation.")
             return False
-        cache_key = self._generate_cache_key(request=request)
+        cache_key = await self._resolve_cache_key(request=request)
         if not cache_key:
             self.logger.error("Cache key generation failed, skipping invalidation.")
             return False
         success = await self.redis.delete(cache_key)
+        if self.local_cache is not None:
+            self.local_cache.delete(cache_key)
         if success:
             self.logger.info(f"Invalidated cache key: {cache_key}")
             return True
@@ -262,7 +728,7 @@ class CacheManager(RedisBase):
     def cached(self, ttl: int):
         """
         Decorator for caching endpoint responses.
-        Only caches successful JSONResponse objects.
+        Only caches successful responses that carry a rendered body.
         Note: has no effect when gateway_middleware also caches the same key.
         """
         def decorator(func):
@@ -276,37 +742,32 @@ class CacheManager(RedisBase):
                     self.logger.error(f"No Request object. Skipping cache for: {func.__name__}")
                     return await func(*args, **kwargs)
 
-                cache_key = self._generate_cache_key(request=request)
-                if not cache_key:
-                    self.logger.error(f"Cannot generate cache key. Skipping cache for {func.__name__}")
-                    return await func(*args, **kwargs)
-
                 try:
-                    cached_data = await self.redis.get(cache_key)
-                    if cached_data:
-                        cached_dict = loads(cached_data)
+                    cache_key = await self._resolve_cache_key(request=request)
+                    if not cache_key:
+                        self.logger.error(f"Cannot generate cache key. Skipping cache for {func.__name__}")
+                        return await func(*args, **kwargs)
+
+                    entry, _ = await self._read_entry(cache_key)
+                    if entry is not None:
                         self.logger.debug(f"Cache hit in {func.__name__}: {cache_key}")
-                        return JSONResponse(
-                            content=cached_dict["content"],
-                            status_code=cached_dict["status_code"],
-                        )
+                        return self.build_response(entry, request.headers.get("accept-encoding"))
 
                     response = await func(*args, **kwargs)
 
-                    if isinstance(response, JSONResponse) and 200 <= response.status_code < 300:
+                    if isinstance(response, Response) and 200 <= response.status_code < 300:
                         response_body = getattr(response, "body", None)
                         if response_body:
-                            body_str = response_body.decode("utf-8") if isinstance(response_body, bytes) else response_body
-                            try:
-                                content = loads(body_str)
-                                await self.set_response_for_caching(
-                                    key=cache_key,
-                                    seconds=ttl,
-                                    value={"content": content, "status_code": response.status_code},
-                                )
-                                self.logger.debug(f"Cached via decorator in {func.__name__}: {cache_key}")
-                            except JSONDecodeError:
-                                self.logger.warning(f"Response not JSON serializable in {func.__name__}")
+                            await self.set_response_for_caching(
+                                key=cache_key,
+                                seconds=ttl,
+                                entry=CachedResponse.from_upstream(
+                                    response_body,
+                                    response.status_code,
+                                    response.headers.get("content-type"),
+                                ),
+                            )
+                            self.logger.debug(f"Cached via decorator in {func.__name__}: {cache_key}")
                     return response
 
                 except BaseAPIException:
@@ -319,18 +780,40 @@ class CacheManager(RedisBase):
         return decorator
 
 
+    @classmethod
+    def build_route_matcher(
+        cls,
+        service_api_version: str,
+        public_endpoints: dict[str, list[str] | None] | None = None,
+    ) -> RoutePolicyMatcher:
+        """Compile this cache's rule tables (plus optional public endpoints) into one matcher."""
+        return RoutePolicyMatcher.build(
+            api_version=service_api_version,
+            public_endpoints=public_endpoints,
+            cache_ttls=cls._CACHE_TTL_MAP,
+            invalidation_namespaces=cls._INVALIDATION_NAMESPACE_MAP,
+            skip_cache_paths=cls._SKIP_CACHE_PATHS,
+            default_ttl=cls.DEFAULT_TTL,
+            default_stale_ttl=cls.DEFAULT_STALE_TTL,
+        )
+
+    def route_policy(self, request: Request) -> RoutePolicy:
+        """The request's RoutePolicy: reused from the request scope, or matched once and stored there."""
+        policy = request.scope.get(ROUTE_POLICY_SCOPE_KEY)
+        if not isinstance(policy, RoutePolicy):
+            policy = self.route_matcher.match(request.url.path)
+            request.scope[ROUTE_POLICY_SCOPE_KEY] = policy
+        return policy
+
     def get_invalidation_namespaces(self, path: str) -> list[str]:
         """Return all cache namespaces to invalidate after a successful mutation on *path*."""
-        path_lower = path.lower()
-        for segment, namespaces in self._INVALIDATION_NAMESPACE_MAP:
-            if segment in path_lower:
-                return namespaces
-        return []
+        return list(self.route_matcher.match(path).invalidation_namespaces)
+
+    def get_cache_ttls(self, path: str) -> tuple[int, int]:
+        """Return the (fresh, stale) TTLs in seconds for caching a GET response for *path*."""
+        policy = self.route_matcher.match(path)
+        return policy.ttl, policy.stale_ttl
 
     def get_cache_ttl(self, path: str) -> int:
-        """Return the TTL (seconds) to use when caching a GET response for *path*."""
-        path_lower = path.lower()
-        for segment, ttl in self._CACHE_TTL_MAP:
-            if segment in path_lower:
-                return ttl
-        return self.DEFAULT_TTL
\ No newline at end of file
+        """Return the fresh TTL (seconds) to use when caching a GET response for *path*."""
+        return self.route_matcher.match(path).ttl
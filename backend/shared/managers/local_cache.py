@@ -0,0 +1,81 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+
+from shared.utils.cache_entry import CachedResponse
+
+
+@dataclass(slots=True)
+class _LocalSlot:
+    entry: CachedResponse
+    expires_at: float
+
+
+class LocalResponseCache:
+    """
+    Per-worker, byte-bounded LRU cache that sits in front of the Redis response cache.
+
+    Entries are keyed by the same cache keys CacheManager stores in Redis, so a
+    namespace invalidation (a key prefix) can be applied to both tiers.
+    Not shared between processes — cross-worker consistency is handled by the
+    pub/sub invalidation listener in CacheManager.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self.max_entry_bytes: int = max_entry_bytes
+        self._slots: OrderedDict[str, _LocalSlot] = OrderedDict()
+        self._current_bytes: int = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def get(self, key: str) -> CachedResponse | None:
+        """Return a live entry and mark it most-recently-used, or None."""
+        slot = self._slots.get(key)
+        if slot is None:
+            return None
+        if slot.expires_at <= monotonic():
+            self._remove(key)
+            return None
+        self._slots.move_to_end(key)
+        return slot.entry
+
+    def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        """Store *entry* for *ttl* seconds, evicting least-recently-used entries to fit."""
+        size = entry.size
+        if ttl <= 0 or size > self.max_entry_bytes or size > self.max_bytes:
+            return
+
+        if key in self._slots:
+            self._remove(key)
+
+        self._slots[key] = _LocalSlot(entry=entry, expires_at=monotonic() + ttl)
+        self._current_bytes += size
+
+        while self._current_bytes > self.max_bytes:
+            oldest_key = next(iter(self._slots))
+            self._remove(oldest_key)
+
+    def delete(self, key: str) -> None:
+        if key in self._slots:
+            self._remove(key)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop every entry whose key starts with *prefix*. Returns the number removed."""
+        stale_keys = [key for key in self._slots if key.startswith(prefix)]
+        for key in stale_keys:
+            self._remove(key)
+        return len(stale_keys)
+
+    def clear(self) -> None:
+        self._slots.clear()
+        self._current_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        slot = self._slots.pop(key)
+        self._current_bytes -= slot.entry.size
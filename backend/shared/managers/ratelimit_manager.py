@@ -1,18 +1,55 @@
 from typing import Any
 from functools import wraps
-from time import perf_counter
 from math import ceil
 
 from fastapi import Request
+from redis.commands.core import AsyncScript
 
 from shared.exceptions.base_exceptions import RateLimitExceededError
 from shared.managers.redis_base import RedisBase
 
 
 class RateLimitManager(RedisBase):
-    """Rate limiting layer: sliding-window rate limiter and @ratelimiter decorator."""
+    """Rate limiting layer: GCRA rate limiter (one atomic Lua call per check) and @ratelimiter decorator."""
 
-    def _get_client_ip(self, request: Request) -> str:
+    # Generic cell rate algorithm: the key holds one number, the theoretical arrival
+    # time (TAT) of the next request in microseconds of Redis server time, so state
+    # is O(1) per key and every worker shares the same clock.
+    # ARGV[1] = emission interval (period / limit), ARGV[2] = period, both in µs;
+    # ARGV[3] = tokens wanted. Grants as many of them as the limit allows right now.
+    # Returns {tokens granted, 0}, or {0, µs until the next token is available}.
+    _GCRA_SCRIPT: str = """
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+    local interval = tonumber(ARGV[1])
+    local period = tonumber(ARGV[2])
+    local wanted = tonumber(ARGV[3])
+    local tat = tonumber(redis.call('GET', KEYS[1])) or now
+    if tat < now then
+        tat = now
+    end
+    local available = math.floor((now + period - tat) / interval)
+    if available < 1 then
+        return {0, tat + interval - period - now}
+    end
+    local granted = math.min(wanted, available)
+    local new_tat = tat + granted * interval
+    redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil((new_tat - now) / 1000))
+    return {granted, 0}
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._gcra_script: AsyncScript | None = None
+
+    @property
+    def gcra_script(self) -> AsyncScript:
+        """The GCRA script registered on the current client; redis-py runs it with EVALSHA."""
+        if self._gcra_script is None or self._gcra_script.registered_client is not self.redis:
+            self._gcra_script = self.redis.register_script(self._GCRA_SCRIPT)
+        return self._gcra_script
+
+    def get_client_ip(self, request: Request) -> str:
         """Extract client IP from request, safely handling proxies if configured."""
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
@@ -22,43 +59,28 @@ class RateLimitManager(RedisBase):
             return request.client.host
         return "unknown"
 
-    def _generate_rate_limit_key(self, request: Request, identifier: str | None = None) -> str:
+    def generate_rate_limit_key(self, request: Request, identifier: str | None = None) -> str:
         """Generate a unique rate limit key based on client IP/identifier and endpoint."""
-        client_ip = self._get_client_ip(request)
+        client_ip = self.get_client_ip(request)
         endpoint = request.url.path
         if identifier:
             return f"{self.service_prefix}:ratelimit:{client_ip}:{identifier}:{endpoint}"
         return f"{self.service_prefix}:ratelimit:{client_ip}:{endpoint}"
 
     async def is_rate_limited(self, request: Request, times: int = 100, seconds: int = 60, identifier: str | None = None) -> bool:
-        """Check if the rate limit is exceeded using a sliding window."""
+        """
+        Check the rate limit with GCRA: up to *times* requests per *seconds*,
+        spread evenly once the burst of *times* is used up.
+        """
         try:
             self.logger.debug(f"Checking rate limit for: {request.url}")
-            key = self._generate_rate_limit_key(request, identifier=identifier)
-            pipe = self.redis.pipeline()
-            now = perf_counter()
-
-            pipe.zadd(key, {str(now): now})
-            pipe.zremrangebyscore(key, 0, now - seconds)
-            pipe.zcard(key)
-            pipe.expire(key, seconds)
-            pipe.zrange(key, 0, 0)
-
-            results = await pipe.execute()
-            request_count = results[2]
-            oldest = results[4]
-
-            if request_count <= times:
+            key = self.generate_rate_limit_key(request, identifier=identifier)
+            granted, retry_after = await self.claim_tokens(key, times=times, seconds=seconds)
+            if granted:
                 return False
 
-            if oldest:
-                oldest_ts = float(oldest[0])
-                retry_after = max(ceil((oldest_ts + seconds) - now), 1)
-            else:
-                retry_after = seconds
-
             self.logger.warning(f"Rate limit exceeded for: {key}")
-            client_ip = self._get_client_ip(request)
+            client_ip = self.get_client_ip(request)
             raise RateLimitExceededError(client_ip=client_ip, retry_after=retry_after)
 
         except RateLimitExceededError:
@@ -67,6 +89,19 @@ class RateLimitManager(RedisBase):
             self.logger.error(f"Rate limit check failed: {str(e)}")
             return False  # fail-open
 
+    async def claim_tokens(self, key: str, times: int, seconds: int, count: int = 1) -> tuple[int, int]:
+        """
+        Take up to *count* tokens from the GCRA limit of *key* in one atomic call.
+        Returns (tokens granted, 0), or (0, seconds until a token is available).
+        Redis errors propagate; callers decide whether to fail open.
+        """
+        period_us = seconds * 1_000_000
+        interval_us = ceil(period_us / times)
+        granted, retry_after_us = await self.gcra_script(keys=[key], args=[interval_us, period_us, count])
+        if granted:
+            return int(granted), 0
+        return 0, max(ceil(int(retry_after_us) / 1_000_000), 1)
+
     def ratelimiter(self, times: int, seconds: int, identifier_param: str | None = None):
         """
         Decorator to apply rate limiting to a FastAPI route.
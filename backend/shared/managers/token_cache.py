@@ -0,0 +1,49 @@
+from collections import OrderedDict
+from hashlib import sha256
+from time import time
+
+from shared.contracts.auth import TokenClaims
+
+
+class VerifiedTokenCache:
+    """
+    Per-worker, entry-bounded LRU of JWTs whose signature and claims were already verified.
+
+    Keyed by a SHA-256 digest of the token plus the required purpose, so raw tokens are
+    never kept in memory. An entry expires at the token's own `exp`, which means a
+    cache hit never accepts a token that a full decode would reject as expired.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[bytes, tuple[TokenClaims, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str, purpose: str) -> bytes:
+        return sha256(f"{purpose}:{token}".encode()).digest()
+
+    def get(self, token: str, purpose: str) -> TokenClaims | None:
+        """Return the verified claims of a live token and mark it most-recently-used, or None."""
+        key = self._key(token, purpose)
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        claims, expires_at = cached
+        if expires_at <= time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def set(self, token: str, purpose: str, claims: TokenClaims, expires_at: float) -> None:
+        """Remember verified *claims* until *expires_at* (epoch seconds), evicting the least-recently-used entry."""
+        if self.max_entries <= 0 or expires_at <= time():
+            return
+        key = self._key(token, purpose)
+        self._entries[key] = (claims, expires_at)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
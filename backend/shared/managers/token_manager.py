@@ -1,5 +1,6 @@
 # shared/token_manager.py
 from datetime import timedelta, datetime, timezone
+from typing import Any, Literal
 from uuid import UUID
 
 from jose import jwt, JWTError
@@ -8,15 +9,36 @@ from pydantic import EmailStr
 
 from shared.settings import Settings
 from shared.contracts.auth import TokenClaims
+from shared.managers.token_cache import VerifiedTokenCache
+
+
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT is an optional, faster decoding backend
+    pyjwt = None
+
+
+JwtBackend = Literal["jose", "pyjwt"]
 
 
 class TokenManager:
     """
     Handles JWT token creation and validation.
+
+    With verified_cache_size > 0, decoded access/refresh claims are kept in a
+    per-worker VerifiedTokenCache until the token's `exp`, so a token pays for
+    signature verification once per worker instead of once per request.
+    Decoding uses python-jose, or PyJWT when backend="pyjwt" (must be installed).
     """
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, verified_cache_size: int = 0, backend: JwtBackend = "jose"):
         self.settings: Settings = settings
+        if backend == "pyjwt" and pyjwt is None:
+            raise RuntimeError("JWT backend 'pyjwt' requested but PyJWT is not installed")
+        self.backend: JwtBackend = backend
+        self.verified_cache: VerifiedTokenCache | None = (
+            VerifiedTokenCache(max_entries=verified_cache_size) if verified_cache_size > 0 else None
+        )
 
     def create_access_token(self,
                             email: EmailStr,
@@ -77,12 +99,13 @@ class TokenManager:
         Raises:
             HTTPException: If token is invalid or purpose doesn't match
         """
+        if self.verified_cache is not None:
+            cached = self.verified_cache.get(token, required_purpose)
+            if cached is not None:
+                return cached
+
         try:
-            payload = jwt.decode(
-                token,
-                self.settings.SECRET_KEY,
-                algorithms=[self.settings.ALGORITHM]
-            )
+            payload = self._decode_payload(token)
 
             email: EmailStr | None = payload.get("sub")
             user_id: UUID | None = payload.get("id")
@@ -102,13 +125,17 @@ class TokenManager:
                     detail=f"Invalid token purpose. Expected: {required_purpose}, got: {purpose}"
                 )
 
-            return TokenClaims(
+            claims = TokenClaims(
                 email=email,
                 id=user_id,
                 role=role,
                 purpose=purpose,
                 token_version=token_version
             )
+            expires_at = payload.get("exp")
+            if self.verified_cache is not None and isinstance(expires_at, (int, float)):
+                self.verified_cache.set(token, required_purpose, claims, float(expires_at))
+            return claims
 
 
         except JWTError as jwt_error:
@@ -124,6 +151,20 @@ class TokenManager:
                 detail=f"Token decoding error: {str(e)}"
             )
 
+    def _decode_payload(self, token: str) -> dict[str, Any]:
+        """Verify the signature and registered claims (exp) with the configured backend."""
+        if self.backend == "pyjwt":
+            try:
+                return pyjwt.decode(token, self.settings.SECRET_KEY, algorithms=[self.settings.ALGORITHM])
+            except pyjwt.PyJWTError as jwt_error:
+                # Same error surface as python-jose, so callers see one exception type.
+                raise JWTError(str(jwt_error)) from jwt_error
+        return jwt.decode(
+            token,
+            self.settings.SECRET_KEY,
+            algorithms=[self.settings.ALGORITHM]
+        )
+
     def validate_token(self, token: str, required_purpose: str = "access") -> bool:
         """
         Validate a token without decoding all data.
@@ -10,14 +10,12 @@ Every log record emitted anywhere in the request lifecycle will automatically
 carry request_id and service fields via the _ContextFilter in logger_manager.
 """
 import logging
-import time
-import uuid
 from contextvars import ContextVar
 
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from shared.middleware.request_context import bind_request_context
 
 # These are read by _ContextFilter in logger_manager so that every log line
 # produced during a request automatically includes request_id + service.
@@ -29,65 +27,67 @@ _logger = logging.getLogger(__name__)
 _SKIP_PATHS = frozenset({"/health", "/metrics", "/docs", "/openapi.json", "/redoc"})
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, service_name: str) -> None:
-        super().__init__(app)
+class LoggingMiddleware:
+    """
+    Pure ASGI logging layer. Binds the shared RequestContext, so inner middleware
+    reuse its request id, timer and response status.
+    """
+    def __init__(self, app: ASGIApp, service_name: str) -> None:
+        self.app: ASGIApp = app
         self.service_name: str = service_name
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        if request.url.path in _SKIP_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # Propagate an incoming correlation ID or generate a new one.
-        request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
+        context, send = bind_request_context(scope, send)
+        context.add_response_header("X-Request-ID", context.request_id)
 
         # Bind to context so all loggers pick it up automatically.
-        req_token = REQUEST_ID_CTX_VAR.set(request_id)
+        req_token = REQUEST_ID_CTX_VAR.set(context.request_id)
         svc_token = SERVICE_NAME_CTX_VAR.set(self.service_name)
 
-        start = time.perf_counter()
+        client = scope.get("client")
         _logger.info(
             "request started",
             extra={
-                "http_method": request.method,
-                "http_path": request.url.path,
-                "client_ip": request.client.host if request.client else "-",
+                "http_method": scope["method"],
+                "http_path": scope["path"],
+                "client_ip": client[0] if client else "-",
             },
         )
 
         try:
-            response: Response = await call_next(request)
+            await self.app(scope, receive, send)
         except Exception:
-            duration_ms = round((time.perf_counter() - start) * 1000, 2)
             _logger.exception(
                 "request failed with unhandled exception",
                 extra={
-                    "http_method": request.method,
-                    "http_path": request.url.path,
-                    "duration_ms": duration_ms,
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "duration_ms": round(context.elapsed * 1000, 2),
                 },
             )
             raise
+        else:
+            status_code = context.status_code or 500
+            level = logging.WARNING if status_code >= 400 else logging.INFO
+            _logger.log(
+                level,
+                "request completed",
+                extra={
+                    "http_method": scope["method"],
+                    "http_path": scope["path"],
+                    "http_status": status_code,
+                    "duration_ms": round(context.elapsed * 1000, 2),
+                },
+            )
         finally:
             REQUEST_ID_CTX_VAR.reset(req_token)
             SERVICE_NAME_CTX_VAR.reset(svc_token)
 
-        duration_ms = round((time.perf_counter() - start) * 1000, 2)
-        level = logging.WARNING if response.status_code >= 400 else logging.INFO
-        _logger.log(
-            level,
-            "request completed",
-            extra={
-                "http_method": request.method,
-                "http_path": request.url.path,
-                "http_status": response.status_code,
-                "duration_ms": duration_ms,
-            },
-        )
-
-        response.headers["X-Request-ID"] = request_id
-        return response
-
 
 def add_logging_middleware(app: FastAPI, service_name: str) -> None:
     """Register the logging middleware as the outermost layer on *app*."""
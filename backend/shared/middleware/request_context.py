@@ -0,0 +1,66 @@
+"""
+Per-request context shared by the pure ASGI middleware of a service.
+
+The outermost middleware binds one RequestContext to the ASGI scope and wraps
+``send`` once. That wrapper records the response status and appends any headers
+queued by inner layers, so those layers read the outcome from the context after
+the app returns instead of each wrapping ``send`` (or buffering the response)
+themselves.
+"""
+import uuid
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from starlette.datastructures import Headers
+from starlette.types import Message, Scope, Send
+
+
+REQUEST_CONTEXT_SCOPE_KEY: str = "request.context"
+
+
+@dataclass(slots=True)
+class RequestContext:
+    """What the middleware layers of one request share."""
+    request_id: str
+    started_at: float = field(default_factory=perf_counter)
+    # Set when the response starts; None while no response has been sent.
+    status_code: int | None = None
+    # Headers appended to the response start message by the bound send wrapper.
+    response_headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+
+    @property
+    def elapsed(self) -> float:
+        return perf_counter() - self.started_at
+
+    def add_response_header(self, name: str, value: str) -> None:
+        self.response_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+
+def get_request_context(scope: Scope) -> RequestContext | None:
+    context = scope.get(REQUEST_CONTEXT_SCOPE_KEY)
+    return context if isinstance(context, RequestContext) else None
+
+
+def bind_request_context(scope: Scope, send: Send) -> tuple[RequestContext, Send]:
+    """
+    Return the request's context and the ``send`` the caller should use.
+
+    The first layer to call this creates the context (taking the request id from
+    X-Request-ID when present) and gets a wrapped ``send``; later layers get the
+    same context and their ``send`` back unchanged.
+    """
+    context = get_request_context(scope)
+    if context is not None:
+        return context, send
+
+    context = RequestContext(request_id=Headers(scope=scope).get("x-request-id") or str(uuid.uuid4()))
+    scope[REQUEST_CONTEXT_SCOPE_KEY] = context
+
+    async def send_wrapper(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            context.status_code = message["status"]
+            if context.response_headers:
+                message = {**message, "headers": [*message.get("headers", []), *context.response_headers]}
+        await send(message)
+
+    return context, send_wrapper
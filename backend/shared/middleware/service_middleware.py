@@ -0,0 +1,78 @@
+"""
+Pure ASGI building blocks for the per-service middleware in each main.py.
+
+Usage:
+
+    app.add_middleware(RequestMetricsMiddleware, observe=request_metrics_helper.observe,
+                       skip_path=internal_access_helper.is_internal_path)
+    app.add_middleware(RequestGuardMiddleware, guard=host_validation)
+
+Unlike ``@app.middleware("http")`` layers, these don't run the rest of the stack
+in a separate task or re-stream the response through a memory channel.
+"""
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from shared.middleware.request_context import bind_request_context
+
+
+# Records one finished request: (request, response status code, duration in seconds).
+ObserveCallable = Callable[[Request, int, float], None]
+# Returns a response to short-circuit the request with, or None to let it through.
+GuardCallable = Callable[[Request], Awaitable[Response | None]]
+
+
+class RequestMetricsMiddleware:
+    """Times each HTTP request and hands its status and duration to *observe*."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        observe: ObserveCallable,
+        skip_path: Callable[[str], bool] | None = None,
+    ) -> None:
+        self.app: ASGIApp = app
+        self.observe: ObserveCallable = observe
+        self.skip_path: Callable[[str], bool] | None = skip_path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.skip_path is not None and self.skip_path(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+
+        context, send = bind_request_context(scope, send)
+        start = context.elapsed
+        await self.app(scope, receive, send)
+        self.observe(Request(scope), context.status_code or 500, context.elapsed - start)
+
+
+class RequestGuardMiddleware:
+    """
+    Runs *guard* before the app. A returned response (or a raised HTTPException,
+    rendered the way FastAPI renders it) answers the request without calling the app.
+    """
+
+    def __init__(self, app: ASGIApp, guard: GuardCallable) -> None:
+        self.app: ASGIApp = app
+        self.guard: GuardCallable = guard
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            response = await self.guard(Request(scope, receive))
+        except HTTPException as exc:
+            response = JSONResponse(
+                status_code=exc.status_code,
+                content={"detail": exc.detail},
+                headers=exc.headers,
+            )
+        if response is None:
+            await self.app(scope, receive, send)
+        else:
+            await response(scope, receive, send)
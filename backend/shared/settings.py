@@ -157,6 +157,10 @@ class Settings(BaseSettings):
     RESET_TOKEN_EXPIRY_MINUTES: int
     VERIFICATION_TOKEN_EXPIRY_MINUTES: int
     CRYPT_CONTEXT_SCHEME: str
+    # Per-worker cache of verified JWTs (0 disables it) and the decoding backend;
+    # "pyjwt" requires the optional PyJWT package.
+    JWT_VERIFIED_CACHE_SIZE: int = Field(default=10_000, ge=0)
+    JWT_BACKEND: Literal["jose", "pyjwt"] = "jose"
 
     # Stripe
     STRIPE_TEST_SECRET_KEY: str
@@ -235,6 +239,71 @@ class Settings(BaseSettings):
             return self.ARTWORK_SIGNING_SECRET.get_secret_value()
         return self.SECRET_KEY
 
+    # API gateway in-process (L1) response cache, sized per worker
+    API_GATEWAY_LOCAL_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024, ge=0)
+    API_GATEWAY_LOCAL_CACHE_MAX_ENTRY_BYTES: int = Field(default=1024 * 1024, ge=0)
+    # Single-flight cache fills: how long the cross-worker fill lock lives and how
+    # long other requests wait for the filler before forwarding on their own.
+    API_GATEWAY_COALESCE_LOCK_TTL_MS: int = Field(default=5000, ge=1)
+    API_GATEWAY_COALESCE_WAIT_SECONDS: float = Field(default=3.0, gt=0)
+    # Larger upstream bodies are streamed straight through to the client and not cached.
+    API_GATEWAY_CACHE_MAX_BODY_BYTES: int = Field(default=2 * 1024 * 1024, ge=0)
+    # Cache-key cardinality: distinct keys and query values per namespace are counted in
+    # Redis and re-read every REFRESH_SECONDS (gateway_cache_*_cardinality). A query
+    # parameter with more distinct values than the cap stops being cached; 0 = no cap.
+    API_GATEWAY_CACHE_CARDINALITY_REFRESH_SECONDS: float = Field(default=60.0, gt=0)
+    API_GATEWAY_CACHE_PARAM_CARDINALITY_CAP: int = Field(default=0, ge=0)
+    # Gateway response compression, in order of preference. "br" and "zstd" need the
+    # optional brotli / zstandard packages and are skipped without them. Smaller bodies
+    # go out uncompressed; cached bodies are compressed once, when the entry is filled.
+    API_GATEWAY_COMPRESSION_ENCODINGS: list[str] = Field(default_factory=lambda: ["br", "zstd", "gzip"])
+    API_GATEWAY_COMPRESSION_MIN_BYTES: int = Field(default=1024, ge=0)
+    # Batch endpoint (/batch): sub-requests per call, and the upstream timeout of a
+    # sub-request that does not set its own.
+    API_GATEWAY_BATCH_MAX_REQUESTS: int = Field(default=20, ge=1)
+    API_GATEWAY_BATCH_TIMEOUT_SECONDS: float = Field(default=5.0, gt=0)
+    # Media proxy (/media) disk cache, sized per worker; each worker keeps its files in its
+    # own directory under API_GATEWAY_MEDIA_CACHE_DIR. Cached files are revalidated with
+    # product-service (If-None-Match) once they are older than the revalidate interval.
+    # MAX_BYTES=0 disables the cache; media is then only streamed through.
+    API_GATEWAY_MEDIA_CACHE_DIR: str = "/tmp/api-gateway-media"
+    API_GATEWAY_MEDIA_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024, ge=0)
+    API_GATEWAY_MEDIA_CACHE_MAX_ENTRY_BYTES: int = Field(default=20 * 1024 * 1024, ge=0)
+    API_GATEWAY_MEDIA_CACHE_REVALIDATE_SECONDS: float = Field(default=300.0, ge=0)
+
+    # API gateway load balancing: active health checks and passive outlier ejection
+    API_GATEWAY_HEALTH_CHECK_INTERVAL_SECONDS: float = Field(default=10.0, gt=0)
+    API_GATEWAY_HEALTH_CHECK_TIMEOUT_SECONDS: float = Field(default=2.0, gt=0)
+    API_GATEWAY_OUTLIER_FAILURE_THRESHOLD: int = Field(default=5, ge=1)
+    API_GATEWAY_OUTLIER_EJECTION_SECONDS: float = Field(default=30.0, ge=0)
+    API_GATEWAY_OUTLIER_MAX_EJECTION_RATIO: float = Field(default=0.5, ge=0, le=1)
+    # Upstream instance discovery: a JSON file {"service-name": ["http://host:port", ...]}
+    # and/or DNS SRV record names per service, e.g. {"product-service": "_http._tcp.product-service"}.
+    API_GATEWAY_SERVICE_DISCOVERY_FILE: str | None = None
+    API_GATEWAY_SERVICE_SRV_RECORDS: dict[str, str] = Field(default_factory=dict)
+    API_GATEWAY_SERVICE_DISCOVERY_REFRESH_SECONDS: float = Field(default=30.0, gt=0)
+    # API gateway resilience: per-instance circuit breakers and per-service bulkheads.
+    # Fast-failed requests get 503 with Retry-After.
+    API_GATEWAY_CIRCUIT_FAILURE_THRESHOLD: int = Field(default=5, ge=1)
+    API_GATEWAY_CIRCUIT_RECOVERY_SECONDS: float = Field(default=15.0, gt=0)
+    API_GATEWAY_CIRCUIT_HALF_OPEN_PROBES: int = Field(default=1, ge=1)
+    # Concurrent upstream requests per service; each service's connection pool is sized to match.
+    API_GATEWAY_BULKHEAD_MAX_CONCURRENCY: int = Field(default=50, ge=1)
+    API_GATEWAY_BULKHEAD_SERVICE_LIMITS: dict[str, int] = Field(default_factory=dict)
+    API_GATEWAY_BULKHEAD_QUEUE_TIMEOUT_SECONDS: float = Field(default=0.5, ge=0)
+    # Per-service upstream connection pools. A service's pool size defaults to its bulkhead
+    # limit; override it from gateway_upstream_pool_peak_in_use. Keep the keep-alive expiry
+    # below the services' own keep-alive timeout (gunicorn --keep-alive) so the gateway
+    # never reuses a connection the service is closing. Services listed for h2c must accept
+    # HTTP/2 over cleartext; without the h2 package they fall back to HTTP/1.1.
+    API_GATEWAY_UPSTREAM_POOL_SIZES: dict[str, int] = Field(default_factory=dict)
+    API_GATEWAY_UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = Field(default=60.0, gt=0)
+    API_GATEWAY_UPSTREAM_H2C_SERVICES: list[str] = Field(default_factory=list)
+    # Global gateway rate limit: tokens each worker leases from Redis per round trip,
+    # and how many client keys it keeps leases for.
+    API_GATEWAY_RATE_LIMIT_LEASE_SIZE: int = Field(default=100, ge=1)
+    API_GATEWAY_RATE_LIMIT_LEASE_MAX_KEYS: int = Field(default=10_000, ge=1)
+
     # Other
     SECRET_ROLE: str
     POLLING_INTERVAL_FROM_DB: int | float
@@ -1,5 +1,13 @@
 """Test helpers that avoid duplication across service conftest files."""
 
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
 from shared.settings import get_settings
 
 
@@ -14,3 +22,38 @@ def allow_testserver_host() -> None:
     settings = get_settings()
     if "testserver" not in settings.ALLOWED_HOSTS:
         settings.ALLOWED_HOSTS.append("testserver")
+
+
+@contextmanager
+def count_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """
+    Collect the SQL statements *engine* sends to the database inside the block.
+
+    Each executemany call and each insertmanyvalues page counts as one statement,
+    which makes the count a deterministic stand-in for database round trips.
+    """
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def skip_benchmarks_unless_enabled(items: list[pytest.Item]) -> None:
+    """
+    Skip tests marked ``benchmark`` unless RUN_BENCHMARKS=1 is set.
+
+    Wall-clock comparisons depend on the machine and its load, so they stay out
+    of the pass/fail suite and run on request (``RUN_BENCHMARKS=1 pytest -s``).
+    """
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="benchmark; set RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,181 @@
+"""
+Binary cache entry format for cached HTTP responses.
+
+Layout (big-endian):
+
+    magic  version  status  stored_at  etag_len  content_type_len  variant_count
+    2s     B        H       d          B         H                 B
+
+    | etag | content_type | variant_count × (name_len B, body_len I, name) | variant bodies | body
+
+The body is the upstream response bytes, stored untouched, so a cache hit
+never has to decode or re-encode JSON. Variants are the same body pre-compressed
+with a content coding (gzip, br, zstd), so a hit never compresses either.
+The fixed header and the ETag come first, so conditional requests can be
+answered from the first METADATA_READ_BYTES bytes.
+"""
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from struct import Struct
+from time import time
+
+from shared.utils.compression import compress
+
+
+_MAGIC: bytes = b"GC"
+_VERSION: int = 2
+_HEADER: Struct = Struct(">2sBHdBHB")
+_VARIANT: Struct = Struct(">BI")
+
+# Enough bytes to cover the fixed header plus the longest ETag the header can describe.
+METADATA_READ_BYTES: int = _HEADER.size + 255
+
+
+class CacheEntryFormatError(ValueError):
+    """Raised when bytes read from the cache are not a valid cache entry."""
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for *body*: a quoted 128-bit BLAKE2b content hash."""
+    return f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str | None) -> bool:
+    """Weak comparison of an If-None-Match header value against *etag* (RFC 9110 §13.1.2)."""
+    if not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _unpack_header(data: bytes) -> tuple[int, float, int, int, int]:
+    """Validate the fixed header and return (status_code, stored_at, etag_len, content_type_len, variant_count)."""
+    if len(data) < _HEADER.size:
+        raise CacheEntryFormatError("Cache entry is shorter than its header")
+
+    magic, version, status_code, stored_at, etag_len, content_type_len, variant_count = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION:
+        raise CacheEntryFormatError(f"Unsupported cache entry format: {magic!r} v{version}")
+    return status_code, stored_at, etag_len, content_type_len, variant_count
+
+
+@dataclass(slots=True)
+class CacheEntryMetadata:
+    """The parts of a cache entry needed to answer a conditional request, without its body."""
+    status_code: int
+    etag: str
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time() - self.stored_at)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CacheEntryMetadata":
+        """Parse the metadata from (at least) the first METADATA_READ_BYTES bytes of an entry."""
+        status_code, stored_at, etag_len, _, _ = _unpack_header(data)
+        etag_end = _HEADER.size + etag_len
+        if len(data) < etag_end:
+            raise CacheEntryFormatError("Cache entry header is truncated")
+        return cls(
+            status_code=status_code,
+            etag=data[_HEADER.size:etag_end].decode("ascii"),
+            stored_at=stored_at,
+        )
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status_code: int
+    content_type: str
+    etag: str
+    stored_at: float
+    body: bytes
+    # Content coding → the body compressed with it, in the server's order of preference.
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def from_upstream(
+        cls,
+        body: bytes,
+        status_code: int,
+        content_type: str | None,
+        encodings: Iterable[str] = (),
+    ) -> "CachedResponse":
+        """Build an entry for a freshly fetched response, computing its ETag and *encodings* once."""
+        return cls(
+            status_code=status_code,
+            content_type=content_type or "application/json",
+            etag=compute_etag(body),
+            stored_at=time(),
+            body=body,
+            encoded={encoding: compress(body, encoding) for encoding in encodings},
+        )
+
+    @property
+    def age(self) -> float:
+        """Seconds since the entry was fetched from upstream."""
+        return max(0.0, time() - self.stored_at)
+
+    @property
+    def metadata(self) -> CacheEntryMetadata:
+        return CacheEntryMetadata(status_code=self.status_code, etag=self.etag, stored_at=self.stored_at)
+
+    @property
+    def size(self) -> int:
+        variants = sum(_VARIANT.size + len(name) + len(body) for name, body in self.encoded.items())
+        return _HEADER.size + len(self.etag) + len(self.content_type) + variants + len(self.body)
+
+    def to_bytes(self) -> bytes:
+        etag = self.etag.encode("ascii")
+        content_type = self.content_type.encode("latin-1")
+        header = _HEADER.pack(
+            _MAGIC, _VERSION, self.status_code, self.stored_at, len(etag), len(content_type), len(self.encoded),
+        )
+        parts = [header, etag, content_type]
+        for name, body in self.encoded.items():
+            encoded_name = name.encode("ascii")
+            parts.append(_VARIANT.pack(len(encoded_name), len(body)))
+            parts.append(encoded_name)
+        parts.extend(self.encoded.values())
+        parts.append(self.body)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        status_code, stored_at, etag_len, content_type_len, variant_count = _unpack_header(data)
+        etag_end = _HEADER.size + etag_len
+        offset = etag_end + content_type_len
+        if len(data) < offset:
+            raise CacheEntryFormatError("Cache entry header is truncated")
+
+        variants: list[tuple[str, int]] = []
+        for _ in range(variant_count):
+            if len(data) < offset + _VARIANT.size:
+                raise CacheEntryFormatError("Cache entry variant table is truncated")
+            name_len, body_len = _VARIANT.unpack_from(data, offset)
+            offset += _VARIANT.size
+            variants.append((data[offset:offset + name_len].decode("ascii"), body_len))
+            offset += name_len
+
+        encoded: dict[str, bytes] = {}
+        for name, body_len in variants:
+            encoded[name] = data[offset:offset + body_len]
+            offset += body_len
+        if len(data) < offset:
+            raise CacheEntryFormatError("Cache entry variants are truncated")
+
+        return cls(
+            status_code=status_code,
+            content_type=data[etag_end:etag_end + content_type_len].decode("latin-1"),
+            etag=data[_HEADER.size:etag_end].decode("ascii"),
+            stored_at=stored_at,
+            body=data[offset:],
+            encoded=encoded,
+        )
@@ -0,0 +1,78 @@
+"""
+Cache-key canonicalization for query strings.
+
+Two requests that the upstream answers identically should share one cache entry.
+For routes with a query schema, QueryNormalizer validates the query with the same
+pydantic model the service uses and keeps only what changes the result: unknown
+parameters and parameters equal to their default are dropped, and values are
+written in one canonical form (``limit=050`` → ``limit=50``, ``price=10.50`` →
+``price=10.5``, ``Brand=ACME`` → ``brand=acme`` for ILIKE fields).
+"""
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from hashlib import sha256
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+
+# Query strings longer than this are replaced by their digest in the cache key.
+MAX_KEY_QUERY_LENGTH: int = 256
+
+
+def canonical_path(path: str) -> str:
+    """*path* without a trailing slash (the root stays "/")."""
+    return path.rstrip("/") or "/"
+
+
+def key_query(params: list[tuple[str, str]]) -> str:
+    """The query part of a cache key: ``k=v&...`` in the given order, hashed when long."""
+    query = "&".join(f"{name}={value}" for name, value in params)
+    if len(query) > MAX_KEY_QUERY_LENGTH:
+        return f"sha256-{sha256(query.encode()).hexdigest()}"
+    return query
+
+
+def _canonical_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, Decimal):
+        # normalize() drops trailing zeros; "f" keeps it out of exponent notation (1E+1).
+        return format(value.normalize(), "f")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+class QueryNormalizer:
+    """Canonical query parameters of one route, driven by its pydantic query *schema*."""
+
+    def __init__(self, schema: type[BaseModel]) -> None:
+        self.schema: type[BaseModel] = schema
+        self.case_insensitive: frozenset[str] = getattr(schema, "CASE_INSENSITIVE_FIELDS", frozenset())
+
+    def normalize(self, query_params: Mapping[str, str]) -> list[tuple[str, str]] | None:
+        """
+        Sorted (name, value) pairs identifying the result of *query_params*, or None
+        when they do not validate (the upstream rejects them, so they are keyed as-is).
+        """
+        try:
+            filters = self.schema.model_validate(
+                {name: query_params[name] for name in query_params if name in self.schema.model_fields}
+            )
+        except ValidationError:
+            return None
+
+        params: list[tuple[str, str]] = []
+        for name, value in sorted(filters.model_dump(exclude_defaults=True).items()):
+            if value is None:
+                continue
+            canonical = _canonical_value(value)
+            if name in self.case_insensitive:
+                canonical = canonical.lower()
+            params.append((name, canonical))
+        return params
@@ -0,0 +1,136 @@
+"""
+HTTP content codings for response bodies: gzip, br and zstd.
+
+gzip is always available. br and zstd are offered only when the optional
+``brotli`` / ``zstandard`` packages are installed; encodings without a codec are
+dropped by supported_encodings().
+
+Bodies compressed once and stored (cache fills) use higher levels than bodies
+compressed per request while they stream.
+"""
+import gzip
+import zlib
+from collections.abc import Callable, Iterable, Sequence
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; "br" is not offered without it
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional; "zstd" is not offered without it
+    zstandard = None
+
+
+GZIP: str = "gzip"
+BROTLI: str = "br"
+ZSTD: str = "zstd"
+
+_STREAM_LEVELS: dict[str, int] = {GZIP: 6, BROTLI: 4, ZSTD: 3}
+_STORED_LEVELS: dict[str, int] = {GZIP: 9, BROTLI: 9, ZSTD: 12}
+
+# Media types worth compressing. Images, video and archives are already compressed.
+_COMPRESSIBLE_TYPES: tuple[str, ...] = (
+    "text/",
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def _has_codec(encoding: str) -> bool:
+    if encoding == GZIP:
+        return True
+    if encoding == BROTLI:
+        return brotli is not None
+    if encoding == ZSTD:
+        return zstandard is not None
+    return False
+
+
+def supported_encodings(preferred: Iterable[str]) -> tuple[str, ...]:
+    """The encodings of *preferred* (in the server's order of preference) that have a codec here."""
+    return tuple(dict.fromkeys(e.strip().lower() for e in preferred if _has_codec(e.strip().lower())))
+
+
+def is_compressible(content_type: str | None) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+def negotiate_encoding(accept_encoding: str | None, offered: Sequence[str]) -> str | None:
+    """
+    Pick the coding of *offered* to answer an Accept-Encoding header with (RFC 9110 §12.5.3),
+    or None for the identity body. The highest q-value wins; ties go to the order of *offered*.
+    """
+    if not accept_encoding or not offered:
+        return None
+
+    qvalues: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+
+    wildcard = qvalues.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in offered:
+        q = qvalues.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a whole body at the stored level of *encoding* (for bodies compressed once and kept)."""
+    level = _STORED_LEVELS[encoding]
+    if encoding == GZIP:
+        # mtime=0 so the same body always compresses to the same bytes.
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if encoding == BROTLI and brotli is not None:
+        return brotli.compress(body, quality=level)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unsupported content coding: {encoding}")
+
+
+class StreamEncoder:
+    """Incremental compressor for one streamed response body."""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding: str = encoding
+        level = _STREAM_LEVELS[encoding]
+        self._compress: Callable[[bytes], bytes]
+        self._finish: Callable[[], bytes]
+        if encoding == GZIP:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress, self._finish = compressor.compress, compressor.flush
+        elif encoding == BROTLI and brotli is not None:
+            compressor = brotli.Compressor(quality=level)
+            self._compress, self._finish = compressor.process, compressor.finish
+        elif encoding == ZSTD and zstandard is not None:
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress, self._finish = compressor.compress, compressor.flush
+        else:
+            raise ValueError(f"Unsupported content coding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
@@ -23,6 +23,7 @@ class FilterParser:
             - sort_by: sorting field
             - sort_order: asc/desc
             - offset: pagination offset
+            - cursor: keyset pagination cursor (replaces offset when set)
             - limit: pagination limit
             - search_term: search string
             - date_filters: dict of date range filters
@@ -45,6 +46,7 @@ class FilterParser:
             "sort_by": filters_dict.get("sort_by"),
             "sort_order": filters_dict.get("sort_order"),
             "offset": filters_dict.get("offset"),
+            "cursor": filters_dict.get("cursor"),
             "limit": filters_dict.get("limit"),
             "search_term": filters_dict.get("search_term"),
             "date_filters": {
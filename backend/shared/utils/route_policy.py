@@ -0,0 +1,169 @@
+"""
+Precompiled per-route policy: authentication, caching and cache invalidation.
+
+Route rules are compiled once into a segment trie. A single lookup per request
+answers whether the route is public for a method, whether it may be cached, its
+fresh/stale TTLs and the namespaces a mutation on it invalidates.
+
+Pattern syntax:
+
+    /api/v1/products        the route itself and everything below it
+    /api/v1/activate/       only routes strictly below it (not the route itself)
+    /api/v1/*/images        "*" matches exactly one path segment
+
+When several rules match, the most specific one wins, per policy field: the
+deepest match, and at equal depth the one with more literal segments.
+"""
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+
+# Request scope key the resolved RoutePolicy is stored under, so every middleware
+# layer of a request reuses one lookup.
+ROUTE_POLICY_SCOPE_KEY: str = "gateway.route_policy"
+
+# Stands for "every HTTP method" in a rule's public methods.
+ALL_METHODS: str = "*"
+
+
+@dataclass(frozen=True, slots=True)
+class RoutePolicy:
+    """Everything the gateway layers need to know about one request path."""
+    public_methods: frozenset[str]
+    cacheable: bool
+    ttl: int
+    stale_ttl: int
+    invalidation_namespaces: tuple[str, ...]
+
+    def is_public(self, method: str) -> bool:
+        return ALL_METHODS in self.public_methods or method in self.public_methods
+
+
+@dataclass(slots=True)
+class _Rules:
+    """Policy fields set by the rules of one trie node; None means "not set here"."""
+    public_methods: frozenset[str] | None = None
+    skip_cache: bool | None = None
+    ttls: tuple[int, int] | None = None
+    namespaces: tuple[str, ...] | None = None
+
+
+@dataclass(slots=True)
+class _Node:
+    children: dict[str, "_Node"] = field(default_factory=dict)
+    wildcard: "_Node | None" = None
+    # Rules for this route and everything below it.
+    rules: _Rules = field(default_factory=_Rules)
+    # Rules for routes strictly below this one (patterns with a trailing slash).
+    descendant_rules: _Rules = field(default_factory=_Rules)
+
+
+_FIELDS: tuple[str, ...] = ("public_methods", "skip_cache", "ttls", "namespaces")
+
+
+class RoutePolicyMatcher:
+    """Segment trie of route rules, compiled once and queried with match()."""
+
+    def __init__(self, default_ttl: int = 300, default_stale_ttl: int = 900) -> None:
+        self.default_ttl: int = default_ttl
+        self.default_stale_ttl: int = default_stale_ttl
+        self._root: _Node = _Node()
+
+    @classmethod
+    def build(
+        cls,
+        api_version: str,
+        public_endpoints: Mapping[str, Iterable[str] | None] | None = None,
+        cache_ttls: Iterable[tuple[str, int, int]] = (),
+        invalidation_namespaces: Iterable[tuple[str, Iterable[str]]] = (),
+        skip_cache_paths: Iterable[str] = (),
+        default_ttl: int = 300,
+        default_stale_ttl: int = 900,
+    ) -> "RoutePolicyMatcher":
+        """
+        Compile the gateway's rule tables. Public endpoints are full paths (None = all
+        methods); cache, invalidation and skip rules are relative to *api_version*.
+        Skip rules also apply at the root, so e.g. /health is never cached either way.
+        """
+        matcher = cls(default_ttl=default_ttl, default_stale_ttl=default_stale_ttl)
+        prefix = api_version.rstrip("/")
+        for pattern, methods in (public_endpoints or {}).items():
+            matcher.add(pattern, public_methods=frozenset(methods) if methods is not None else frozenset({ALL_METHODS}))
+        for pattern, ttl, stale_ttl in cache_ttls:
+            matcher.add(f"{prefix}/{pattern.lstrip('/')}", ttls=(ttl, stale_ttl))
+        for pattern, namespaces in invalidation_namespaces:
+            matcher.add(f"{prefix}/{pattern.lstrip('/')}", namespaces=tuple(namespaces))
+        for pattern in skip_cache_paths:
+            matcher.add(pattern, skip_cache=True)
+            matcher.add(f"{prefix}/{pattern.lstrip('/')}", skip_cache=True)
+        return matcher
+
+    def add(self, pattern: str, **rules: Any) -> None:
+        """Set policy fields (public_methods, skip_cache, ttls, namespaces) for *pattern*."""
+        node = self._root
+        for segment in self._split(pattern):
+            if segment == "*":
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+        target = node.descendant_rules if pattern.endswith("/") and pattern != "/" else node.rules
+        for name, value in rules.items():
+            if name not in _FIELDS:
+                raise ValueError(f"Unknown route rule field: {name}")
+            setattr(target, name, value)
+
+    def match(self, path: str) -> RoutePolicy:
+        """Resolve the policy of *path* in one walk of the trie."""
+        segments = self._split(path)
+        best: dict[str, tuple[tuple[int, int], Any]] = {}
+        self._collect(self._root, segments, 0, 0, best)
+
+        def pick(name: str, default: Any) -> Any:
+            found = best.get(name)
+            return default if found is None else found[1]
+
+        ttl, stale_ttl = pick("ttls", (self.default_ttl, self.default_stale_ttl))
+        return RoutePolicy(
+            public_methods=pick("public_methods", frozenset()),
+            cacheable=not pick("skip_cache", False),
+            ttl=ttl,
+            stale_ttl=stale_ttl,
+            invalidation_namespaces=pick("namespaces", ()),
+        )
+
+    def _collect(
+        self,
+        node: _Node,
+        segments: list[str],
+        depth: int,
+        literals: int,
+        best: dict[str, tuple[tuple[int, int], Any]],
+    ) -> None:
+        # Descendant-only rules rank just above the node's own rules (depth counts double).
+        self._offer(node.rules, (depth * 2, literals), best)
+        if depth == len(segments):
+            return
+        self._offer(node.descendant_rules, (depth * 2 + 1, literals), best)
+
+        child = node.children.get(segments[depth])
+        if child is not None:
+            self._collect(child, segments, depth + 1, literals + 1, best)
+        if node.wildcard is not None:
+            self._collect(node.wildcard, segments, depth + 1, literals, best)
+
+    @staticmethod
+    def _offer(rules: _Rules, rank: tuple[int, int], best: dict[str, tuple[tuple[int, int], Any]]) -> None:
+        for name in _FIELDS:
+            value = getattr(rules, name)
+            if value is None:
+                continue
+            current = best.get(name)
+            if current is None or rank > current[0]:
+                best[name] = (rank, value)
+
+    @staticmethod
+    def _split(path: str) -> list[str]:
+        return [segment for segment in path.split("/") if segment]
@@ -23,14 +23,14 @@ class RequestMetricsHelper:
         )
         self._initialized = True
 
-    def observe(self, request, response, duration: float) -> None:
+    def observe(self, request, status_code: int, duration: float) -> None:
         if not self._initialized:
             self.initialize()
         endpoint = request.url.path
         self.http_request_duration_seconds.labels(
             method=request.method,
             endpoint=endpoint,
-            status_code=str(response.status_code),
+            status_code=str(status_code),
         ).observe(duration)
 
 
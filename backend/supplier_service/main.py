@@ -2,7 +2,6 @@ import os
 from collections.abc import AsyncIterator
 from datetime import datetime
 from contextlib import asynccontextmanager
-from time import perf_counter
 
 from uvicorn import run
 from fastapi.middleware.cors import CORSMiddleware
@@ -18,6 +17,7 @@ from models import Base
 from service_layer.cj_api_client import CJDropshippingAPIError
 from shared.exceptions.base_exceptions import BaseAPIException, RateLimitExceededError
 from shared.middleware.logging_middleware import add_logging_middleware
+from shared.middleware.service_middleware import RequestMetricsMiddleware
 from shared.telemetry import setup_tracing
 from resources import logger, settings, supplier_api_runtime
 from utils.seed_database import seed_default_supplier_config
@@ -59,14 +59,12 @@ app = FastAPI(
 Instrumentator().instrument(app)
 
 
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    """Records request latency into a multiprocess-safe histogram."""
-    start = perf_counter()
-    response = await call_next(request)
-    duration = perf_counter() - start
-    logger.debug(f"{request.method} {request.url.path} - {response.status_code} ({duration:.4f}s)")
-    return response
+def log_request_timing(request: Request, status_code: int, duration: float) -> None:
+    """Logs request latency at debug level."""
+    logger.debug(f"{request.method} {request.url.path} - {status_code} ({duration:.4f}s)")
+
+
+app.add_middleware(RequestMetricsMiddleware, observe=log_request_timing)
 
 
 @app.get("/health", tags=["Health Check"])
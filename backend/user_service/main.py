@@ -3,13 +3,12 @@ from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 import os
 import ipaddress
-from time import perf_counter
 
 from uvicorn import run
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, Response as PlainResponse
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, Response, HTTPException
 from pydantic import ValidationError
 from fastapi.exceptions import ResponseValidationError, RequestValidationError
 from prometheus_client import CollectorRegistry, generate_latest, multiprocess, REGISTRY
@@ -18,6 +17,7 @@ from routes.user_routes import user_routes
 from models import Base
 from shared.exceptions.base_exceptions import (BaseAPIException, RateLimitExceededError)
 from shared.middleware.logging_middleware import add_logging_middleware
+from shared.middleware.service_middleware import RequestGuardMiddleware, RequestMetricsMiddleware
 from shared.telemetry import setup_tracing
 from resources import get_user_api_resources, logger, settings, user_api_runtime
 from helpers.internal_access_helper import internal_access_helper
@@ -55,22 +55,14 @@ app = FastAPI(
 setup_tracing(app, service_name="user-service")
 
 # Single custom instrumentation path; avoids double-counting requests.
-@app.middleware("http")
-async def metrics_middleware(request: Request, call_next):
-    """Records request latency into a multiprocess-safe histogram."""
-    # Skip internal paths — no value in tracking /metrics scraping itself
-    if internal_access_helper.is_internal_path(request.url.path):
-        return await call_next(request)
-
-    start = perf_counter()
-    response = await call_next(request)
-    duration = perf_counter() - start
-
-    request_metrics_helper.observe(request=request, response=response, duration=duration)
-    return response
-
-@app.middleware("http")
-async def host_validation_middleware(request: Request, call_next):
+app.add_middleware(
+    RequestMetricsMiddleware,
+    observe=request_metrics_helper.observe,
+    skip_path=internal_access_helper.is_internal_path,
+)
+
+
+async def host_validation(request: Request) -> Response | None:
     """
     Validates the HTTP Host header against ALLOWED_HOSTS to prevent DNS-rebinding
     attacks.
@@ -80,7 +72,7 @@ async def host_validation_middleware(request: Request, call_next):
     """
     host = request.url.hostname
     if host and host.lower() in {allowed.lower() for allowed in settings.ALLOWED_HOSTS}:
-        return await call_next(request)
+        return None
 
     peer = request.client.host if request.client else "unknown"
     trusted_proxy = False
@@ -98,6 +90,10 @@ async def host_validation_middleware(request: Request, call_next):
         headers={"X-Error": "Invalid Host header"},
     )
 
+
+app.add_middleware(RequestGuardMiddleware, guard=host_validation)
+
+
 @app.get("/health/live", tags=["Health Check"])
 async def health_live():
     """Liveness only: the process can answer requests."""
@@ -76,7 +76,11 @@ def create_user_api_resources(
             ),
         ),
         password_manager=PasswordManager(settings=app_settings),
-        token_manager=TokenManager(settings=app_settings),
+        token_manager=TokenManager(
+            settings=app_settings,
+            verified_cache_size=app_settings.JWT_VERIFIED_CACHE_SIZE,
+            backend=app_settings.JWT_BACKEND,
+        ),
     )
 
 
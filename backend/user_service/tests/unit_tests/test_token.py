@@ -6,6 +6,7 @@ without a live environment or .env file.
 """
 from datetime import timedelta
 from time import time
+from unittest.mock import patch
 
 import pytest
 from fastapi import HTTPException
@@ -153,3 +154,47 @@ class TestValidateToken:
             purpose="access",
         )
         assert token_manager.validate_token(token, required_purpose="refresh") is False
+
+
+class TestVerifiedTokenCache:
+    def _make_token(self, manager: TokenManager, minutes: int = 30) -> str:
+        token, _ = manager.create_access_token(
+            email=test_settings.TEST_EMAIL,
+            user_id=test_settings.TEST_USER_ID,
+            role=test_settings.TEST_USER_ROLE,
+            expires_delta=timedelta(minutes=minutes),
+        )
+        return token
+
+    def test_second_decode_is_served_from_cache(self) -> None:
+        manager = TokenManager(settings=test_settings, verified_cache_size=10)
+        token = self._make_token(manager)
+
+        first = manager.decode_token(token)
+        with patch.object(manager, "_decode_payload", side_effect=AssertionError("verified twice")):
+            second = manager.decode_token(token)
+
+        assert second is first
+
+    def test_cache_is_keyed_by_purpose(self) -> None:
+        manager = TokenManager(settings=test_settings, verified_cache_size=10)
+        token = self._make_token(manager)
+        manager.decode_token(token)
+
+        with pytest.raises(HTTPException) as exc_info:
+            manager.decode_token(token, required_purpose="refresh")
+        assert exc_info.value.status_code == 401
+
+    def test_cached_entry_expires_with_the_token(self) -> None:
+        manager = TokenManager(settings=test_settings, verified_cache_size=10)
+        token = self._make_token(manager)
+        manager.decode_token(token)
+
+        with patch("shared.managers.token_cache.time", return_value=time() + 31 * 60):
+            assert manager.verified_cache.get(token, "access") is None
+
+    def test_cache_is_bounded(self) -> None:
+        manager = TokenManager(settings=test_settings, verified_cache_size=2)
+        for minutes in (10, 20, 30):
+            manager.decode_token(self._make_token(manager, minutes=minutes))
+        assert len(manager.verified_cache) == 2